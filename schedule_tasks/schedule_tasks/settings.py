@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 from celery.schedules import crontab
@@ -51,6 +52,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "timers.middleware.ServerTimingMiddleware",
+    "timers.middleware.SamplingProfilerMiddleware",
+    "timers.middleware.ApiMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -79,6 +83,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "schedule_tasks.wsgi.application"
+ASGI_APPLICATION = "schedule_tasks.asgi.application"
 
 
 # Database
@@ -95,6 +100,46 @@ DATABASES = {
     }
 }
 
+# Connection pool (psycopg 3), used by the ASGI web service: with async views many more
+# requests are in flight per replica than there are threads, so connections are pooled
+# instead of opened per request. Enabled by setting DATABASE_POOL_MAX_SIZE.
+if os.environ.get("DATABASE_POOL_MAX_SIZE"):
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DATABASE_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ["DATABASE_POOL_MAX_SIZE"]),
+            "timeout": 10,
+        }
+    }
+
+
+# Read replicas (streaming replicas of the primary, same credentials): set
+# DATABASE_REPLICA_HOSTS to a comma-separated list of hosts to add the replica_1, replica_2...
+# aliases. Timer status reads are routed to them (timers.routers.ReadReplicaRouter); in tests
+# they mirror the default database.
+for _index, _host in enumerate(
+    filter(None, os.environ.get("DATABASE_REPLICA_HOSTS", "").split(",")), 1
+):
+    DATABASES[f"replica_{_index}"] = {
+        **DATABASES["default"],
+        "HOST": _host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["timers.routers.ReadReplicaRouter"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Shared by the web and Celery worker replicas, e.g. for the timer state cache and the metrics.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://redis:6379/1",
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -167,8 +212,175 @@ CELERY_BEAT_SCHEDULE = {
         "task": "timers.tasks.check_expired_timers",
         "schedule": crontab(minute="*/1"),  # Every minute
     },
+    "promote-timers": {
+        "task": "timers.tasks.promote_timers",
+        "schedule": 10.0,  # Every 10 seconds, see TIMERS_PROMOTION_HORIZON_SECONDS
+    },
+    "maintain-timer-partitions": {
+        "task": "timers.tasks.maintain_timer_partitions",
+        "schedule": crontab(hour=3, minute=0),  # Every night
+    },
 }
 
+
+# Timers settings
+
+# Maximum number of timers accepted by a single POST /timers/batch or /timers/status request.
+TIMERS_BATCH_MAX_SIZE = 1000
+
+# The expired-timer sweep reads due timers in keyset pages of this many rows,
+# and enqueues at most TIMERS_SWEEP_MAX_PER_RUN timers per run.
+TIMERS_SWEEP_PAGE_SIZE = 500
+TIMERS_SWEEP_MAX_PER_RUN = 10000
+
+# Number of due timers handed to each fire_webhooks_batch task by the sweep
+TIMERS_SWEEP_BATCH_SIZE = 100
+
+# Expired-timer sweep:
+# - "beat": the check_expired_timers task runs every minute from Celery beat.
+# - "loop": the sweep_timers service sleeps until the next pending timer is due (at most
+#   TIMERS_SWEEPER_MAX_SLEEP_SECONDS), is woken up through Redis when a timer due sooner is
+#   created, and sweeps the timers due for more than TIMERS_SWEEPER_GRACE_SECONDS (the
+#   others are left to their countdown messages). check_expired_timers then does nothing.
+TIMERS_SWEEPER = os.environ.get("TIMERS_SWEEPER", "beat")
+TIMERS_SWEEPER_MAX_SLEEP_SECONDS = 60
+TIMERS_SWEEPER_GRACE_SECONDS = 0.5
+
+# A worker claims a timer before firing its webhook. A claim that is still not
+# finalized after this many seconds is considered stale and can be reclaimed.
+TIMERS_CLAIM_LEASE_SECONDS = 300
+
+# How new timers are handed to the Celery workers:
+# - "countdown": publish a countdown (ETA) message per timer when it is created.
+# - "dispatcher": only persist the timer, the dispatch_timers service loads it into
+#   a timing wheel and publishes it once it is due.
+# - "outbox": insert a TimerOutbox entry in the same transaction as the timer, the
+#   relay_outbox service publishes the countdown messages in batches.
+TIMERS_SCHEDULER = os.environ.get("TIMERS_SCHEDULER", "countdown")
+
+# Two-tier scheduling ("countdown" and "outbox" schedulers): when a timer is created, it is
+# only handed to the broker if it is due within TIMERS_PROMOTION_HORIZON_SECONDS. The others
+# are only persisted, and the promote_timers task (every 10 seconds) publishes them in indexed
+# batches of at most TIMERS_PROMOTION_MAX_PER_RUN as they enter the horizon, so the broker
+# holds near-term messages only. Off by default: 0 hands every timer to the broker when it
+# is created, e.g. set it to 300 once the promote_timers beat task runs.
+TIMERS_PROMOTION_HORIZON_SECONDS = int(
+    os.environ.get("TIMERS_PROMOTION_HORIZON_SECONDS", 0)
+)
+TIMERS_PROMOTION_MAX_PER_RUN = 50000
+
+# Maximum number of outbox entries published per relay transaction
+TIMERS_OUTBOX_BATCH_SIZE = 1000
+
+# How long the outbox relay waits when the outbox is empty, in seconds
+TIMERS_OUTBOX_POLL_SECONDS = 0.2
+
+# Retention (timers.partitions): fired, dead-lettered and cancelled timers scheduled more than
+# TIMERS_RETENTION_DAYS days ago are archived to gzip-compressed JSON Lines files in
+# TIMERS_ARCHIVE_DIR and removed, whole monthly partitions at a time on PostgreSQL, else in
+# transactions of TIMERS_RETENTION_BATCH_SIZE timers. The next TIMERS_PARTITION_MONTHS_AHEAD
+# monthly partitions are kept created. Runs nightly (maintain_timer_partitions task).
+TIMERS_RETENTION_DAYS = 30
+TIMERS_RETENTION_BATCH_SIZE = 5000
+TIMERS_PARTITION_MONTHS_AHEAD = 3
+TIMERS_ARCHIVE_DIR = os.environ.get(
+    "TIMERS_ARCHIVE_DIR", str(BASE_DIR / "archive")
+)
+
+# Database aliases serving the timer status reads (GET /timer/<id> cache misses and the
+# gauges of /metrics), see DATABASE_REPLICA_HOSTS. A timer not found on a replica is looked up
+# again on the primary, in case it was created within the replication lag.
+TIMERS_READ_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+
+# Admission control of POST /timer and /timers/batch (timers.admission):
+# - every client (TIMERS_RATE_LIMIT_CLIENT_HEADER API key if it is one of the comma-separated
+#   TIMERS_RATE_LIMIT_API_KEYS, else source IP address: the header is not trusted) may create
+#   TIMERS_RATE_LIMIT_PER_SECOND timers per second, in bursts of up to TIMERS_RATE_LIMIT_BURST,
+#   through token buckets in Redis; excess requests get 429 with Retry-After. 0 disables it.
+# - while more than TIMERS_ADMISSION_MAX_OVERDUE pending timers are due, or more than
+#   TIMERS_ADMISSION_MAX_PENDING timers are pending, every creation gets 503 with Retry-After.
+#   The backlog is counted at most every TIMERS_ADMISSION_CHECK_SECONDS. 0 disables a limit.
+# Behind a reverse proxy, the source IP address is the proxy's: use API keys.
+TIMERS_RATE_LIMIT_PER_SECOND = float(
+    os.environ.get("TIMERS_RATE_LIMIT_PER_SECOND", 0)
+)
+TIMERS_RATE_LIMIT_BURST = 1000
+TIMERS_RATE_LIMIT_CLIENT_HEADER = "X-Api-Key"
+TIMERS_RATE_LIMIT_API_KEYS = frozenset(
+    filter(None, os.environ.get("TIMERS_RATE_LIMIT_API_KEYS", "").split(","))
+)
+TIMERS_ADMISSION_MAX_OVERDUE = 50000
+TIMERS_ADMISSION_MAX_PENDING = 0
+TIMERS_ADMISSION_CHECK_SECONDS = 5
+
+# Timer completion stream (GET /timers/events, timers.events): the workers publish the fire
+# event of every timer on Redis pub/sub when TIMERS_FIRE_EVENTS is set, and the stream sends a
+# keepalive comment after TIMERS_EVENTS_KEEPALIVE_SECONDS without events.
+TIMERS_FIRE_EVENTS = os.environ.get("TIMERS_FIRE_EVENTS") == "1"
+TIMERS_EVENTS_KEEPALIVE_SECONDS = 15
+
+# Redis used by the timers app besides the Celery broker (dispatcher inbox, ...)
+TIMERS_REDIS_URL = "redis://redis:6379/0"
+
+# Timing-wheel dispatcher (python manage.py dispatch_timers)
+TIMERS_DISPATCHER_TICK_SECONDS = 0.1
+TIMERS_DISPATCHER_HORIZON_SECONDS = 300
+TIMERS_DISPATCHER_REFILL_SECONDS = 5
+TIMERS_DISPATCHER_MAX_LOADED = 1000000
+
+# Webhook delivery engine: connect/read timeouts in seconds, the maximum number of
+# concurrent deliveries per worker process, and the idle keep-alive connections kept open.
+TIMERS_DELIVERY_CONNECT_TIMEOUT = 3.0
+TIMERS_DELIVERY_READ_TIMEOUT = 10.0
+TIMERS_DELIVERY_MAX_IN_FLIGHT = 1000
+TIMERS_DELIVERY_MAX_KEEPALIVE = 200
+
+# Per-destination-host delivery lanes, shared by all workers through TIMERS_REDIS_URL:
+# at most TIMERS_LANE_MAX_CONCURRENCY deliveries in flight per host, and a circuit
+# breaker that opens for TIMERS_LANE_OPEN_SECONDS after TIMERS_LANE_FAILURE_THRESHOLD
+# failures within TIMERS_LANE_FAILURE_WINDOW_SECONDS, then lets one probe through.
+TIMERS_LANE_MAX_CONCURRENCY = 50
+TIMERS_LANE_FAILURE_THRESHOLD = 5
+TIMERS_LANE_FAILURE_WINDOW_SECONDS = 60
+TIMERS_LANE_OPEN_SECONDS = 30
+
+# Failed deliveries are retried with exponential backoff and jitter, starting at
+# TIMERS_RETRY_BASE_SECONDS and capped at TIMERS_RETRY_MAX_SECONDS. A timer is
+# dead-lettered once TIMERS_MAX_ATTEMPTS attempts have failed.
+TIMERS_RETRY_BASE_SECONDS = 10
+TIMERS_RETRY_MAX_SECONDS = 3600
+TIMERS_MAX_ATTEMPTS = 10
+
+# GET /timer/<id> reads the (scheduled_time, is_fired) state of a timer through the
+# cache. Entries are written on create, overwritten when the timer fires, and evicted
+# after this many seconds.
+TIMERS_STATE_CACHE_TTL = 3600
+
+# Timer id scheme:
+# - "uuid4": random ids.
+# - "uuid7": time-ordered ids, new rows append to the right edge of the primary key index.
+# - "fire_time": time-ordered ids embedding the fire time of timers created through the
+#   API, so GET /timer/<id> can compute time_left with a primary-key existence check.
+TIMERS_ID_SCHEME = "uuid7"
+
+# Serve POST /timer and GET /timer/<id> with the native async views (timers.async_views).
+# Only useful under an ASGI server, see the web-asgi service in docker-compose.yml.
+TIMERS_ASYNC_API = os.environ.get("TIMERS_ASYNC_API") == "1"
+
+# Validate "set timer" payloads with the lightweight TimerPayload validator and parse/render
+# JSON with orjson (timers.fastpath). Invalid payloads still go through TimerSerializer, so
+# error responses are unchanged. Compare both paths with: python manage.py benchmark_validation
+TIMERS_FAST_PATH = os.environ.get("TIMERS_FAST_PATH") == "1"
+
+# Fraction of the requests and Celery tasks profiled with cProfile (0 disables the profiler),
+# and the directory receiving the .prof stats files.
+TIMERS_PROFILE_SAMPLE_RATE = float(
+    os.environ.get("TIMERS_PROFILE_SAMPLE_RATE", 0)
+)
+TIMERS_PROFILE_DIR = os.environ.get(
+    "TIMERS_PROFILE_DIR", str(BASE_DIR / "profiles")
+)
+
 """
 # Celery Beat schedule
 from celery import Celery
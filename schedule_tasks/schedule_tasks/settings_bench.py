@@ -0,0 +1,55 @@
+"""
+Django settings for the benchmark_timers command.
+
+Runs the whole service in one process without outside services: a SQLite database, the
+in-memory Celery broker (consumed by the in-process worker of the benchmark) and a local
+memory cache.
+
+Usage: python manage.py benchmark_timers --settings=schedule_tasks.settings_bench
+"""
+
+import os
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+# django.test.Client sends requests to "testserver"
+ALLOWED_HOSTS = ["localhost", "127.0.0.1", "testserver"]
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ.get(
+            "TIMERS_BENCH_DB",
+            os.path.join(tempfile.gettempdir(), "timers_bench.sqlite3"),
+        ),
+        "OPTIONS": {
+            # Writers queue up instead of failing with "database is locked"
+            "timeout": 30,
+            "transaction_mode": "IMMEDIATE",
+        },
+    }
+}
+
+# No read replica in the benchmark
+TIMERS_READ_REPLICAS = []
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+CELERY_BROKER_URL = "memory://"
+# The in-memory transport polls its queues, once per second by default
+CELERY_BROKER_TRANSPORT_OPTIONS = {"polling_interval": 0.01}
+CELERY_RESULT_BACKEND = "cache+memory://"
+CELERY_TASK_IGNORE_RESULT = True
+
+TIMERS_SCHEDULER = "countdown"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "root": {"level": "WARNING"},
+}
@@ -0,0 +1,291 @@
+# timers/admission.py
+# Admission control of the timer creation endpoints: per-client rate limits and backlog shedding.
+import hashlib
+import logging
+import math
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.utils import timezone
+
+from .metrics import ADMISSION_REJECTIONS
+from .models import Timer
+from .redis_client import get_redis
+from .routers import replica_reads
+
+logger = logging.getLogger(__name__)
+
+# Whether the backlog is over the admission limits, recomputed every TIMERS_ADMISSION_CHECK_SECONDS
+BACKLOG_KEY = "timers:admission:overloaded"
+
+# Refills the bucket of KEYS[1] at ARGV[1] tokens per second up to ARGV[2] tokens, then takes
+# ARGV[3] tokens if there are enough. Returns {1, "0"} when taken, {0, seconds until there are
+# enough} otherwise. Runs atomically in Redis, on the Redis clock, so every web replica shares
+# the same buckets.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(now - updated_at, 0) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tokens, "updated_at", now)
+redis.call("EXPIRE", KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+
+@dataclass(frozen=True)
+class AdmissionDecision:
+    """
+    Result of asking to create timers.
+
+    Attributes:
+        allowed (bool): Whether the timers may be created.
+        retry_after (float): When not allowed, how many seconds to wait before trying again.
+        status_code (int): When not allowed, the HTTP status of the response: 429 when the
+            client exceeded its rate, 503 when the service sheds load.
+        error (str): When not allowed, the error message of the response.
+    """
+
+    allowed: bool
+    retry_after: float = 0.0
+    status_code: int = 200
+    error: str = ""
+
+    @property
+    def retry_after_header(self) -> str:
+        """
+        Returns the value of the Retry-After header: whole seconds, at least 1.
+        """
+        return str(max(math.ceil(self.retry_after), 1))
+
+
+ADMITTED = AdmissionDecision(True)
+
+
+def client_digest(client: str) -> str:
+    """
+    Returns a fixed-length digest of a client identity, used in Redis keys and channels and
+    stored on the timers the client creates.
+
+    Args:
+        client (str): The client identity, see client_key().
+
+    Returns:
+        str: The digest, 32 hexadecimal characters.
+    """
+    return hashlib.sha256(client.encode()).hexdigest()[:32]
+
+
+def assign_client(timers: Iterable[Timer], request: HttpRequest) -> None:
+    """
+    Records the client of a creation request on its unsaved timers.
+
+    Args:
+        timers (Iterable[Timer]): The unsaved timers.
+        request (HttpRequest): The creation request.
+
+    Returns:
+        None
+    """
+    client = client_digest(client_key(request))
+    for timer in timers:
+        timer.client = client
+
+
+def api_key(request: HttpRequest) -> Optional[str]:
+    """
+    Returns the API key of a request (the TIMERS_RATE_LIMIT_CLIENT_HEADER header), if it is one
+    of the TIMERS_RATE_LIMIT_API_KEYS. Anyone can send the header: unknown keys are ignored, so
+    that a client cannot get a fresh rate limit, or the timers of another client, by making up
+    or guessing keys.
+
+    Args:
+        request (HttpRequest): The request.
+
+    Returns:
+        Optional[str]: The API key, or None if it is missing or unknown.
+    """
+    key = request.headers.get(settings.TIMERS_RATE_LIMIT_CLIENT_HEADER)
+    if key and key in settings.TIMERS_RATE_LIMIT_API_KEYS:
+        return key
+    return None
+
+
+def client_key(request: HttpRequest) -> str:
+    """
+    Returns the identity the rate limit of a request is keyed on: its API key (see api_key()),
+    or its source IP address.
+
+    Args:
+        request (HttpRequest): The request.
+
+    Returns:
+        str: The client identity, e.g. "key:..." or "ip:10.0.0.1".
+    """
+    key = api_key(request)
+    if key:
+        return f"key:{key}"
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+class TokenBucketLimiter:
+    """
+    Per-client token buckets kept in Redis (TIMERS_REDIS_URL).
+
+    Every client may create rate timers per second on average, and up to burst timers at once.
+    A batch request takes one token per timer, so batching does not bypass the limit.
+    The limiter fails open: if Redis is unreachable, requests are let through.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """
+        Args:
+            rate (float): The refill rate of each bucket, in timers per second.
+            burst (int): The capacity of each bucket, in timers.
+        """
+        self.rate = rate
+        self.burst = burst
+
+    @classmethod
+    def from_settings(cls) -> "TokenBucketLimiter":
+        """
+        Creates the limiter configured by the TIMERS_RATE_LIMIT_* settings.
+
+        Returns:
+            TokenBucketLimiter: The limiter.
+        """
+        return cls(
+            rate=settings.TIMERS_RATE_LIMIT_PER_SECOND,
+            burst=settings.TIMERS_RATE_LIMIT_BURST,
+        )
+
+    @staticmethod
+    def _key(client: str) -> str:
+        # Bounded key length whatever the API key
+        return f"timers:ratelimit:{client_digest(client)}"
+
+    def take(self, client: str, cost: int = 1) -> AdmissionDecision:
+        """
+        Takes cost tokens from the bucket of client.
+
+        Args:
+            client (str): The client identity, see client_key().
+            cost (int): The number of timers to create. Capped at burst, so that a batch of
+                any accepted size can get through a full bucket.
+
+        Returns:
+            AdmissionDecision: Whether the timers may be created, and if not, when to retry.
+        """
+        cost = min(max(cost, 1), self.burst)
+        try:
+            script = get_redis().register_script(TOKEN_BUCKET_SCRIPT)
+            allowed, retry_after = script(
+                keys=[self._key(client)], args=[self.rate, self.burst, cost]
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Rate limiter unavailable, admitting request: {e}")
+            return ADMITTED
+        if allowed:
+            return ADMITTED
+        return AdmissionDecision(
+            False,
+            retry_after=float(retry_after),
+            status_code=429,
+            error="Too many timers created, slow down.",
+        )
+
+
+def _bounded_count(queryset, limit: int) -> int:
+    # COUNT over at most limit + 1 index entries, however large the backlog is
+    with replica_reads():
+        return queryset.order_by()[: limit + 1].count()
+
+
+def backlog_overloaded() -> bool:
+    """
+    Indicates whether the backlog of timers exceeds the admission limits: more than
+    TIMERS_ADMISSION_MAX_OVERDUE pending timers are due (the workers are not keeping up), or
+    more than TIMERS_ADMISSION_MAX_PENDING timers are pending. A limit of 0 is not checked.
+
+    The answer is cached for TIMERS_ADMISSION_CHECK_SECONDS, so the counts (bounded by the
+    limits, on a read replica when configured) run at most once per interval per cache, not
+    once per request.
+
+    Returns:
+        bool: True if new timers should be refused.
+    """
+    overloaded = cache.get(BACKLOG_KEY)
+    if overloaded is not None:
+        return overloaded
+    pending = Timer.objects.filter(
+        is_fired=False, is_dead_lettered=False, is_cancelled=False
+    )
+    max_overdue = settings.TIMERS_ADMISSION_MAX_OVERDUE
+    max_pending = settings.TIMERS_ADMISSION_MAX_PENDING
+    overloaded = bool(
+        max_overdue
+        and _bounded_count(
+            pending.filter(next_attempt_at__lte=timezone.now()), max_overdue
+        )
+        > max_overdue
+    ) or bool(
+        max_pending and _bounded_count(pending, max_pending) > max_pending
+    )
+    if overloaded:
+        logger.warning(
+            "Timer backlog over the admission limits, shedding load."
+        )
+    cache.set(
+        BACKLOG_KEY,
+        overloaded,
+        timeout=settings.TIMERS_ADMISSION_CHECK_SECONDS,
+    )
+    return overloaded
+
+
+def admit(request: HttpRequest, cost: int = 1) -> AdmissionDecision:
+    """
+    Decides whether a request may create cost timers: first the global backlog limits
+    (status 503), then the rate limit of the client (status 429). Rejections are counted in
+    the timers_admission_rejections_total metric.
+
+    Args:
+        request (HttpRequest): The timer creation request.
+        cost (int): The number of timers in the request.
+
+    Returns:
+        AdmissionDecision: Whether the timers may be created, and if not, the response to send.
+    """
+    if backlog_overloaded():
+        ADMISSION_REJECTIONS.inc(reason="overloaded")
+        return AdmissionDecision(
+            False,
+            retry_after=settings.TIMERS_ADMISSION_CHECK_SECONDS,
+            status_code=503,
+            error="Too many timers pending, retry later.",
+        )
+    if not settings.TIMERS_RATE_LIMIT_PER_SECOND:
+        return ADMITTED
+    decision = TokenBucketLimiter.from_settings().take(
+        client_key(request), cost
+    )
+    if not decision.allowed:
+        ADMISSION_REJECTIONS.inc(reason="rate_limited")
+    return decision
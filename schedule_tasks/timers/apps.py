@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class TimersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "timers"
+
+    def ready(self) -> None:
+        """
+        Hooks the sampling profiler (see TIMERS_PROFILE_SAMPLE_RATE) into the Celery tasks,
+        and flushes the metrics of the Celery pool processes when they exit.
+        """
+        from celery.signals import (task_postrun, task_prerun,
+                                    worker_process_shutdown)
+
+        from .metrics import flush_metrics_on_shutdown
+        from .timing import profile_task_end, profile_task_start
+
+        task_prerun.connect(profile_task_start, weak=False)
+        task_postrun.connect(profile_task_end, weak=False)
+        worker_process_shutdown.connect(flush_metrics_on_shutdown, weak=False)
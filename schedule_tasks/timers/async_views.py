@@ -0,0 +1,212 @@
+# timers/async_views.py
+# Native async versions of the "set timer" and "get timer" endpoints, served over ASGI.
+import json
+import logging
+from uuid import UUID
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (HttpRequest, HttpResponse, JsonResponse,
+                         StreamingHttpResponse)
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import (require_GET, require_http_methods,
+                                          require_POST)
+from rest_framework import status
+
+from .admission import admit, api_key, assign_client, client_digest, client_key
+from .events import stream_fired_events
+from .fastpath import validate_timer
+from .scheduling import acreate_timers
+from .state_cache import acache_timer_state, aget_timer_state
+from .timing import stage
+from .views import TimerDetailView, get_time_left
+
+logger = logging.getLogger(__name__)
+
+_detail_view = TimerDetailView.as_view()
+
+
+@csrf_exempt
+@require_POST
+async def create_timer(request: HttpRequest) -> JsonResponse:
+    """
+    Async version of TimerView.post: /timer
+
+    The timer is validated with TimerSerializer or the fast path (pure CPU work), inserted with the async ORM
+    and published to the broker without pinning a thread for the whole request, so an ASGI
+    worker keeps serving other requests while this one waits on the database and the broker.
+    Requests and responses are the same as with TimerView.
+
+    Args:
+        request (HttpRequest): The HTTP request object containing the timer data as JSON.
+
+    Returns:
+        JsonResponse: The id of the created timer and the amount of time left until it
+                      expires (status 201), or the validation errors (status 400), or the
+                      admission control refusal (status 429 or 503, with Retry-After).
+    """
+    with stage("admit"):
+        decision = await sync_to_async(admit)(request)
+    if not decision.allowed:
+        response = JsonResponse(
+            {"error": decision.error}, status=decision.status_code
+        )
+        response["Retry-After"] = decision.retry_after_header
+        return response
+
+    loads = orjson.loads if settings.TIMERS_FAST_PATH else json.loads
+    try:
+        data = loads(request.body)
+    except ValueError as e:
+        return JsonResponse(
+            {"detail": f"JSON parse error - {e}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    with stage("validate"):
+        timer, errors = validate_timer(data)
+    if timer is None:
+        return JsonResponse(errors, status=status.HTTP_400_BAD_REQUEST)
+
+    assign_client([timer], request)
+    await acreate_timers([timer])
+    with stage("cache"):
+        await acache_timer_state(
+            timer.id, timer.scheduled_time, timer.is_fired
+        )
+
+    with stage("render"):
+        return JsonResponse(
+            {
+                "id": str(timer.id),
+                "time_left": get_time_left(
+                    timer.scheduled_time, timer.is_fired
+                ),
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+@csrf_exempt
+@require_http_methods(["GET", "DELETE", "PATCH"])
+async def timer_detail(request: HttpRequest, timer_id: UUID) -> HttpResponse:
+    """
+    Async version of TimerDetailView.get: /timer/{timer_uuid}
+
+    The state of the timer is read through the timer state cache, with the async cache and
+    ORM APIs. Cancellations and reschedules (DELETE and PATCH) are rare next to status reads
+    and run in a transaction, so they are handed to TimerDetailView in a thread.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        timer_id (UUID): The ID of the timer to be retrieved.
+
+    Returns:
+        HttpResponse: The timer's ID and time left, or an error message with status 404 if
+                      the timer is not found.
+    """
+    if request.method != "GET":
+        return await sync_to_async(_detail_view)(request, timer_id=timer_id)
+    state = await aget_timer_state(timer_id)
+    if state is None:
+        return JsonResponse(
+            {"error": "Timer not found"}, status=status.HTTP_404_NOT_FOUND
+        )
+    scheduled_time, is_fired = state
+    with stage("render"):
+        return JsonResponse(
+            {
+                "id": str(timer_id),
+                "time_left": get_time_left(scheduled_time, is_fired),
+            }
+        )
+
+
+@require_GET
+async def timer_events(request: HttpRequest) -> HttpResponse:
+    """
+    Streams timer completion events as Server-Sent Events: /timers/events
+
+    Replaces polling GET /timer/{timer_uuid} until time_left is 0. The fire events are
+    published by the Celery workers on Redis pub/sub (see timers.events), so any web replica
+    can serve any subscriber. Each event carries the payload of GET /timer/{timer_uuid}.
+    Only served under ASGI (web-asgi service), where each open stream holds a Redis
+    connection: a WSGI server buffers the whole stream before sending it, and would hold one of
+    its threads until the stream ends, so WSGI requests get status 501.
+
+    - GET /timers/events?ids=<uuid>,<uuid>... streams the fire events of these timers
+      (already fired ones right away, "not_found" events for unknown ones) and ends once all
+      of them have fired, or were cancelled ("cancelled" event) or dead-lettered
+      ("dead_lettered" event).
+    - GET /timers/events with the TIMERS_RATE_LIMIT_CLIENT_HEADER API key streams the fire
+      events of every timer created with that key, until the client disconnects. The key must
+      be one of the TIMERS_RATE_LIMIT_API_KEYS.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The text/event-stream response, or an error message with status 400 if
+                      the ids are invalid, more than TIMERS_BATCH_MAX_SIZE, or missing without
+                      an API key, with status 403 if the API key is unknown, or with status
+                      501 if the request is not served over ASGI.
+
+    Sample Example: GET request: http://localhost:8000/timers/events?ids=766cb2bb-5854-4b39-aea6-7343e9916b13
+
+    Sample stream:
+        event: fired
+        data: {"id": "766cb2bb-5854-4b39-aea6-7343e9916b13", "time_left": 0}
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {
+                "error": "The event stream is only served by the ASGI application."
+            },
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+    timer_ids = None
+    client = None
+    ids = request.GET.get("ids", "")
+    if ids:
+        try:
+            timer_ids = list(
+                dict.fromkeys(UUID(value) for value in ids.split(","))
+            )
+        except ValueError:
+            return JsonResponse(
+                {"error": "ids must be comma-separated timer ids."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(timer_ids) > settings.TIMERS_BATCH_MAX_SIZE:
+            return JsonResponse(
+                {
+                    "error": f"At most {settings.TIMERS_BATCH_MAX_SIZE} timers can be watched."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+    else:
+        if not request.headers.get(settings.TIMERS_RATE_LIMIT_CLIENT_HEADER):
+            return JsonResponse(
+                {
+                    "error": f"Pass ids, or the {settings.TIMERS_RATE_LIMIT_CLIENT_HEADER} "
+                    "header to watch all the timers of a client."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if api_key(request) is None:
+            return JsonResponse(
+                {"error": "Unknown API key."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        client = client_digest(client_key(request))
+
+    response = StreamingHttpResponse(
+        stream_fired_events(timer_ids, client),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # Disables response buffering in nginx
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,307 @@
+# timers/benchmark.py
+# End-to-end load and fire-precision benchmark, run by the benchmark_timers command.
+import json
+import math
+import threading
+import time
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import orjson
+from django.test import Client
+from rest_framework.renderers import JSONRenderer
+
+from .fastpath import OrjsonRenderer, TimerPayload
+from .models import Timer
+from .serializers import TimerSerializer, build_timer
+
+
+def percentiles(samples: Sequence[float]) -> Dict[str, Optional[float]]:
+    """
+    Summarizes samples with the nearest-rank percentiles used in the benchmark report.
+
+    Args:
+        samples (Sequence[float]): The samples, in any order.
+
+    Returns:
+        Dict[str, Optional[float]]: The p50, p95, p99 and max of the samples, None if there are none.
+    """
+    ordered = sorted(samples)
+    summary: Dict[str, Optional[float]] = {}
+    for name, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+        summary[name] = (
+            ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+            if ordered
+            else None
+        )
+    summary["max"] = ordered[-1] if ordered else None
+    return summary
+
+
+class WebhookReceiver:
+    """
+    In-process HTTP server standing in for the webhook receivers.
+
+    It answers every POST with 204 and records when the webhook of each timer id was received,
+    so the benchmark can compute the fire lateness without any outside service.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """
+        Binds the server. Port 0 picks a free port.
+
+        Args:
+            host (str): The address to listen on.
+            port (int): The port to listen on.
+        """
+        self.received: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                received_at = time.time()
+                length = int(self.headers.get("Content-Length", 0))
+                timer_id = json.loads(self.rfile.read(length))["id"]
+                with receiver._lock:
+                    # Keep the first delivery, retries do not count
+                    receiver.received.setdefault(timer_id, received_at)
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        """
+        Returns the webhook URL of the receiver.
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/webhook"
+
+    def __enter__(self) -> "WebhookReceiver":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count(self) -> int:
+        """
+        Returns the number of timers whose webhook was received.
+        """
+        with self._lock:
+            return len(self.received)
+
+
+class TimerLoadGenerator:
+    """
+    Drives POST /timer and GET /timer/<id> through the full Django request handler from a pool
+    of client threads, and records the latency of every request.
+    """
+
+    def __init__(self, concurrency: int) -> None:
+        """
+        Args:
+            concurrency (int): The number of client threads sending requests.
+        """
+        self.concurrency = concurrency
+        self._local = threading.local()
+
+    def _client(self) -> Client:
+        # django.test.Client is not thread-safe: one per client thread
+        if not hasattr(self._local, "client"):
+            self._local.client = Client()
+        return self._local.client
+
+    def _create(
+        self, url: str, delay_seconds: int
+    ) -> Tuple[float, Optional[str]]:
+        start = time.perf_counter()
+        response = self._client().post(
+            "/timer",
+            {"hours": 0, "minutes": 0, "seconds": delay_seconds, "url": url},
+            content_type="application/json",
+        )
+        latency = time.perf_counter() - start
+        if response.status_code != 201:
+            return latency, None
+        return latency, response.json()["id"]
+
+    def _get(self, timer_id: str) -> Tuple[float, bool]:
+        start = time.perf_counter()
+        response = self._client().get(f"/timer/{timer_id}")
+        return time.perf_counter() - start, response.status_code == 200
+
+    def run_creates(
+        self, count: int, url: str, delay_seconds: int
+    ) -> Tuple[dict, List[str]]:
+        """
+        Creates count timers firing after delay_seconds.
+
+        Args:
+            count (int): The number of timers to create.
+            url (str): The webhook URL of the timers.
+            delay_seconds (int): The duration of the timers, in seconds.
+
+        Returns:
+            Tuple[dict, List[str]]: The request statistics and the ids of the created timers.
+        """
+        start = time.perf_counter()
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            results = list(
+                executor.map(
+                    lambda _: self._create(url, delay_seconds), range(count)
+                )
+            )
+        elapsed = time.perf_counter() - start
+        ids = [timer_id for _, timer_id in results if timer_id is not None]
+        return (
+            self._stats(
+                [latency for latency, _ in results], count - len(ids), elapsed
+            ),
+            ids,
+        )
+
+    def run_gets(self, timer_ids: List[str], per_timer: int) -> dict:
+        """
+        Sends per_timer GET requests for every timer.
+
+        Args:
+            timer_ids (List[str]): The ids of the timers to query.
+            per_timer (int): The number of requests per timer.
+
+        Returns:
+            dict: The request statistics.
+        """
+        start = time.perf_counter()
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            results = list(executor.map(self._get, timer_ids * per_timer))
+        elapsed = time.perf_counter() - start
+        errors = sum(1 for _, ok in results if not ok)
+        return self._stats(
+            [latency for latency, _ in results], errors, elapsed
+        )
+
+    @staticmethod
+    def _stats(latencies: List[float], errors: int, elapsed: float) -> dict:
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "seconds": round(elapsed, 3),
+            "requests_per_second": (
+                round(len(latencies) / elapsed, 1) if elapsed else None
+            ),
+            "latency_ms": {
+                name: None if value is None else round(value * 1000, 3)
+                for name, value in percentiles(latencies).items()
+            },
+        }
+
+
+def fire_lateness(received: Dict[str, float], timer_ids: List[str]) -> dict:
+    """
+    Computes how late the webhooks of timer_ids were received: receipt time minus scheduled_time.
+
+    Args:
+        received (Dict[str, float]): The receipt time of each webhook, as a Unix timestamp.
+        timer_ids (List[str]): The ids of the timers created by the benchmark.
+
+    Returns:
+        dict: The number of fired and missing webhooks, and the lateness percentiles in milliseconds.
+    """
+    scheduled = dict(
+        Timer.objects.filter(id__in=timer_ids).values_list(
+            "id", "scheduled_time"
+        )
+    )
+    lateness = [
+        received[str(timer_id)] - scheduled_time.timestamp()
+        for timer_id, scheduled_time in scheduled.items()
+        if str(timer_id) in received
+    ]
+    return {
+        "fired": len(lateness),
+        "missing": len(timer_ids) - len(lateness),
+        "lateness_ms": {
+            name: None if value is None else round(value * 1000, 3)
+            for name, value in percentiles(lateness).items()
+        },
+    }
+
+
+def _serializer_path(body: bytes) -> bytes:
+    serializer = TimerSerializer(data=json.loads(body))
+    if serializer.is_valid():
+        timer = serializer.build_timer(serializer.validated_data)
+        data = {"id": timer.id, "time_left": 0}
+    else:
+        data = serializer.errors
+    return JSONRenderer().render(data)
+
+
+def _fast_path(body: bytes) -> bytes:
+    data = orjson.loads(body)
+    payload = TimerPayload.parse(data)
+    if payload is not None:
+        timer = build_timer(payload.validated_data())
+        return OrjsonRenderer().render({"id": timer.id, "time_left": 0})
+    serializer = TimerSerializer(data=data)
+    serializer.is_valid()
+    return OrjsonRenderer().render(serializer.errors)
+
+
+def compare_validation_paths(iterations: int) -> dict:
+    """
+    Micro-benchmarks the parse, validate and render steps of POST /timer, without the database,
+    through TimerSerializer with the default JSON parser/renderer and through the fast path.
+
+    Args:
+        iterations (int): The number of payloads processed per path and case.
+
+    Returns:
+        dict: The microseconds per payload of both paths and the speedup, for a valid and an
+        invalid payload.
+    """
+    cases = {
+        "valid": {
+            "hours": 0,
+            "minutes": 1,
+            "seconds": 30,
+            "url": "https://example.com/hook",
+        },
+        "invalid": {
+            "hours": -1,
+            "minutes": 1,
+            "seconds": 30,
+            "url": "not a url",
+        },
+    }
+    results = {}
+    for name, payload in cases.items():
+        body = json.dumps(payload).encode()
+        timings = {
+            path: timeit.timeit(lambda: function(body), number=iterations)
+            / iterations
+            * 1e6
+            for path, function in (
+                ("serializer", _serializer_path),
+                ("fast_path", _fast_path),
+            )
+        }
+        results[name] = {
+            "serializer_us": round(timings["serializer"], 2),
+            "fast_path_us": round(timings["fast_path"], 2),
+            "speedup": round(timings["serializer"] / timings["fast_path"], 2),
+        }
+    return results
@@ -0,0 +1,194 @@
+# timers/delivery.py
+# Asynchronous, connection-pooled webhook delivery engine.
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+import httpx
+from django.conf import settings
+
+
+@dataclass(frozen=True)
+class DeliveryResult:
+    """
+    Outcome of one webhook delivery.
+
+    Attributes:
+        timer_id (str): The id of the timer whose webhook was delivered.
+        status_code (Optional[int]): The HTTP status of the response, None if no response was received.
+        latency (float): The duration of the POST request, in seconds.
+        error (str): The error message of a failed delivery, empty on success.
+    """
+
+    timer_id: str
+    status_code: Optional[int]
+    latency: float
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        """
+        Returns True if the receiver answered with a 2xx status.
+        """
+        return not self.error
+
+    @property
+    def host_healthy(self) -> bool:
+        """
+        Returns False if the failure points at the receiving host: no response, 429 or a 5xx status.
+        """
+        return (
+            self.status_code is not None
+            and self.status_code < 500
+            and self.status_code != 429
+        )
+
+
+class WebhookDeliveryEngine:
+    """
+    Sends webhooks concurrently over keep-alive connection pools.
+
+    The engine wraps a single httpx.AsyncClient, so connections (and their TLS sessions) to a
+    receiver are reused across deliveries. Every request has connect and read timeouts, and a
+    semaphore caps the number of requests in flight across all receivers. Redirects are
+    followed, and the status of the final response decides the outcome.
+
+    It can be driven directly from asyncio code (a standalone delivery worker), or from
+    synchronous code such as a Celery task through deliver_webhooks().
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        connect_timeout: float,
+        read_timeout: float,
+        max_keepalive_connections: int,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        """
+        Creates the engine and its connection pool.
+
+        Args:
+            max_in_flight (int): The maximum number of concurrent deliveries.
+            connect_timeout (float): The timeout for establishing a connection, in seconds.
+            read_timeout (float): The timeout for receiving the response, in seconds.
+            max_keepalive_connections (int): The number of idle connections kept open.
+            transport (Optional[httpx.AsyncBaseTransport]): A custom transport, e.g. for tests.
+        """
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                read_timeout, connect=connect_timeout, pool=None
+            ),
+            limits=httpx.Limits(
+                max_connections=max_in_flight,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            transport=transport,
+            # Like requests.post, which delivered the webhooks before
+            follow_redirects=True,
+        )
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+
+    @classmethod
+    def from_settings(cls) -> "WebhookDeliveryEngine":
+        """
+        Creates an engine configured by the TIMERS_DELIVERY_* settings.
+
+        Returns:
+            WebhookDeliveryEngine: The engine.
+        """
+        return cls(
+            max_in_flight=settings.TIMERS_DELIVERY_MAX_IN_FLIGHT,
+            connect_timeout=settings.TIMERS_DELIVERY_CONNECT_TIMEOUT,
+            read_timeout=settings.TIMERS_DELIVERY_READ_TIMEOUT,
+            max_keepalive_connections=settings.TIMERS_DELIVERY_MAX_KEEPALIVE,
+        )
+
+    async def deliver(self, timer_id: str, url: str) -> DeliveryResult:
+        """
+        Sends a POST request to url with the timer id in the payload as a JSON object.
+
+        Args:
+            timer_id (str): The id of the timer.
+            url (str): The webhook URL of the timer.
+
+        Returns:
+            DeliveryResult: The outcome of the delivery. Errors are reported, not raised.
+        """
+        async with self._in_flight:
+            start = time.perf_counter()
+            try:
+                response = await self._client.post(url, json={"id": timer_id})
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                return DeliveryResult(
+                    timer_id,
+                    e.response.status_code,
+                    time.perf_counter() - start,
+                    str(e),
+                )
+            except httpx.HTTPError as e:
+                return DeliveryResult(
+                    timer_id,
+                    None,
+                    time.perf_counter() - start,
+                    f"{type(e).__name__}: {e}",
+                )
+            return DeliveryResult(
+                timer_id, response.status_code, time.perf_counter() - start
+            )
+
+    async def deliver_many(
+        self, jobs: Iterable[Tuple[str, str]]
+    ) -> List[DeliveryResult]:
+        """
+        Delivers many webhooks concurrently, within the in-flight limit.
+
+        Args:
+            jobs (Iterable[Tuple[str, str]]): (timer id, url) pairs.
+
+        Returns:
+            List[DeliveryResult]: The outcomes, in the order of jobs.
+        """
+        return await asyncio.gather(
+            *(self.deliver(timer_id, url) for timer_id, url in jobs)
+        )
+
+    async def aclose(self) -> None:
+        """
+        Closes the pooled connections.
+        """
+        await self._client.aclose()
+
+
+# One event loop and engine per process and thread, so that pooled connections are reused
+# across Celery tasks but never shared with a forked child or another thread.
+_local = threading.local()
+
+
+def _get_engine() -> Tuple[asyncio.AbstractEventLoop, WebhookDeliveryEngine]:
+    """
+    Returns the event loop and engine of the calling process and thread, creating them if needed.
+    """
+    if getattr(_local, "pid", None) != os.getpid():
+        _local.pid = os.getpid()
+        _local.loop = asyncio.new_event_loop()
+        _local.engine = WebhookDeliveryEngine.from_settings()
+    return _local.loop, _local.engine
+
+
+def deliver_webhooks(jobs: Iterable[Tuple[str, str]]) -> List[DeliveryResult]:
+    """
+    Delivers webhooks from synchronous code, e.g. a Celery task.
+
+    Args:
+        jobs (Iterable[Tuple[str, str]]): (timer id, url) pairs.
+
+    Returns:
+        List[DeliveryResult]: The outcomes, in the order of jobs.
+    """
+    loop, engine = _get_engine()
+    return loop.run_until_complete(engine.deliver_many(jobs))
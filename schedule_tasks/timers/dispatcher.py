@@ -0,0 +1,227 @@
+# timers/dispatcher.py
+# Timing-wheel dispatcher: keeps the timers due soon in memory and hands them to the
+# Celery workers only once they are due, instead of publishing countdown (ETA) messages.
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+import redis
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from kombu.exceptions import OperationalError
+
+from .models import Timer
+from .redis_client import get_redis
+from .tasks import fire_webhook, iter_due_timer_keys
+from .wheel import HierarchicalTimingWheel
+
+logger = logging.getLogger(__name__)
+
+# Redis list through which the API tells the dispatcher about newly created timers
+INBOX_KEY = "timers:dispatcher:inbox"
+
+
+def notify_dispatcher(timers: Iterable[Timer]) -> None:
+    """
+    Tells the dispatcher about newly created timers, with a single RPUSH.
+
+    Each entry is "<timer id> <due Unix timestamp>". Entries that are lost (e.g. the
+    dispatcher is restarting) are harmless: the dispatcher also loads every pending timer
+    from the database as it enters the loading horizon.
+
+    Args:
+        timers (Iterable[Timer]): The saved timers.
+
+    Returns:
+        None
+    """
+    entries = [
+        f"{timer.id} {timer.next_attempt_at.timestamp()}" for timer in timers
+    ]
+    if entries:
+        get_redis().rpush(INBOX_KEY, *entries)
+
+
+class TimerDispatcher:
+    """
+    Loads the pending timers due within a horizon into a hierarchical timing wheel and
+    publishes a fire_webhook task for each of them as soon as it is due.
+
+    Only the timers due within TIMERS_DISPATCHER_HORIZON_SECONDS are held in memory, and the
+    Celery workers only ever receive due timers, so neither side keeps long-lived ETA messages.
+    All state is rebuilt from the database when the dispatcher starts.
+    """
+
+    def __init__(
+        self,
+        tick_seconds: float,
+        horizon_seconds: float,
+        refill_seconds: float,
+        max_loaded: int,
+    ) -> None:
+        """
+        Creates a dispatcher with an empty wheel.
+
+        Args:
+            tick_seconds (float): The resolution of the timing wheel.
+            horizon_seconds (float): How far ahead timers are loaded from the database.
+            refill_seconds (float): How often the horizon is extended.
+            max_loaded (int): The maximum number of timers held in the wheel.
+        """
+        self.horizon_seconds = horizon_seconds
+        self.refill_seconds = refill_seconds
+        self.max_loaded = max_loaded
+        self.wheel = HierarchicalTimingWheel(tick_seconds, start=time.time())
+        # Due time of every loaded timer
+        self._loaded: Dict[uuid.UUID, float] = {}
+        self._loaded_until: Optional[datetime] = None
+
+    def _insert(self, timer_id: uuid.UUID, expires_at: float) -> bool:
+        """
+        Inserts a timer in the wheel unless it is already there with the same due time or the
+        wheel is full. A rescheduled timer is inserted again at its new due time; the entry of
+        its previous schedule stays in the wheel and claims nothing once dispatched.
+
+        Returns:
+            bool: Whether the timer was inserted.
+        """
+        if timer_id in self._loaded:
+            if self._loaded[timer_id] == expires_at:
+                return False
+        elif len(self._loaded) >= self.max_loaded:
+            return False
+        self.wheel.insert(timer_id, expires_at)
+        self._loaded[timer_id] = expires_at
+        return True
+
+    def load_window(self, current_time: float) -> int:
+        """
+        Loads the pending timers due before current_time + horizon that are not loaded yet.
+
+        The first call loads everything due before the horizon, including overdue timers. Later
+        calls only read the slice of the index between the previous horizon and the new one.
+
+        Args:
+            current_time (float): The current time, as a Unix timestamp.
+
+        Returns:
+            int: The number of timers inserted in the wheel.
+        """
+        until = datetime.fromtimestamp(
+            current_time + self.horizon_seconds, tz=timezone.utc
+        )
+        capacity = self.max_loaded - len(self._loaded)
+        rows = 0
+        inserted = 0
+        last_time = self._loaded_until
+        for due_time, timer_id in iter_due_timer_keys(
+            until,
+            page_size=settings.TIMERS_SWEEP_PAGE_SIZE,
+            limit=capacity,
+            due_from=self._loaded_until,
+        ):
+            rows += 1
+            inserted += self._insert(timer_id, due_time.timestamp())
+            last_time = due_time
+
+        if rows >= capacity:
+            # The wheel is full: resume from the last loaded time on the next refill
+            self._loaded_until = last_time
+            logger.warning(
+                f"Dispatcher wheel is full ({len(self._loaded)} timers)."
+            )
+        else:
+            self._loaded_until = until
+        return inserted
+
+    def drain_inbox(self, max_entries: int = 10000) -> int:
+        """
+        Inserts the newly created timers announced through notify_dispatcher.
+
+        Timers due after the loaded horizon are skipped, the next load_window picks them up.
+
+        Args:
+            max_entries (int): The maximum number of entries read from the inbox.
+
+        Returns:
+            int: The number of timers inserted in the wheel.
+        """
+        entries = get_redis().lpop(INBOX_KEY, max_entries) or []
+        if self._loaded_until is None:
+            return 0
+        horizon = self._loaded_until.timestamp()
+        inserted = 0
+        for entry in entries:
+            timer_id, timestamp = entry.decode().split()
+            expires_at = float(timestamp)
+            if expires_at < horizon:
+                inserted += self._insert(uuid.UUID(timer_id), expires_at)
+        return inserted
+
+    def dispatch(self, current_time: float) -> List[uuid.UUID]:
+        """
+        Publishes a fire_webhook task for every timer that is due at current_time.
+
+        All messages are published over a single producer. The task claims the timer before
+        delivering it, so a timer that was fired meanwhile by another path is skipped. If the
+        publish fails, the timers are put back in the wheel and handed out on the next tick.
+
+        Args:
+            current_time (float): The current time, as a Unix timestamp.
+
+        Returns:
+            List[uuid.UUID]: The ids of the timers handed to the workers.
+        """
+        due = self.wheel.advance_to(current_time)
+        if not due:
+            return due
+        expired = []
+        for timer_id in due:
+            # Keep the newer due time of a timer rescheduled after it was loaded
+            if self._loaded.get(timer_id, current_time) <= current_time:
+                self._loaded.pop(timer_id, None)
+                expired.append(timer_id)
+        try:
+            with fire_webhook.app.producer_or_acquire() as producer:
+                for timer_id in due:
+                    fire_webhook.apply_async(
+                        (str(timer_id),), producer=producer
+                    )
+        except (OperationalError, redis.RedisError):
+            # Timers published twice are harmless, fire_webhook claims them first
+            for timer_id in expired:
+                self._insert(timer_id, current_time)
+            raise
+        logger.info(f"Dispatched {len(due)} due timer(s).")
+        return due
+
+    def run(self) -> None:
+        """
+        Runs the dispatcher loop until interrupted. Database, Redis and broker errors are
+        logged and the tick is retried after a second, with fresh database connections.
+
+        Returns:
+            None
+        """
+        tick_seconds = self.wheel.tick_seconds
+        next_refill = 0.0
+        while True:
+            current_time = time.time()
+            try:
+                if current_time >= next_refill:
+                    loaded = self.load_window(current_time)
+                    if loaded:
+                        logger.info(f"Dispatcher loaded {loaded} timer(s).")
+                    next_refill = current_time + self.refill_seconds
+                self.drain_inbox()
+                self.dispatch(current_time)
+            except (DatabaseError, redis.RedisError, OperationalError) as e:
+                # An outage must not stop the dispatcher: with TIMERS_SCHEDULER = "dispatcher"
+                # nothing else hands the due timers to the workers.
+                logger.error(f"Dispatch failed: {e}, retrying.")
+                close_old_connections()
+                time.sleep(1.0)
+                continue
+            time.sleep(max(tick_seconds - (time.time() - current_time), 0))
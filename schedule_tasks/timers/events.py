@@ -0,0 +1,191 @@
+# timers/events.py
+# Timer completion events, fanned out to the web replicas through Redis pub/sub.
+import json
+import logging
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set
+from uuid import UUID
+
+import redis
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Timer
+from .redis_client import get_async_redis, get_redis
+from .state_cache import get_timer_states
+
+logger = logging.getLogger(__name__)
+
+
+def timer_channel(timer_id: UUID) -> str:
+    """
+    Returns the pub/sub channel receiving the fire event of a timer.
+    """
+    return f"timers:events:timer:{timer_id}"
+
+
+def client_channel(client: str) -> str:
+    """
+    Returns the pub/sub channel receiving the fire events of all the timers of a client.
+
+    Args:
+        client (str): The client digest, see timers.admission.client_digest.
+    """
+    return f"timers:events:client:{client}"
+
+
+def publish_fired(timers: Iterable[Timer]) -> None:
+    """
+    Publishes the fire event of timers that were just marked as fired, on the channel of each
+    timer and on the channel of its client, with a single pipelined round trip.
+
+    Does nothing unless TIMERS_FIRE_EVENTS is set. Events are best effort: a Redis failure is
+    logged and does not fail the delivery, and subscribers that miss an event still get the
+    state of their timers when they (re)subscribe.
+
+    Args:
+        timers (Iterable[Timer]): The fired timers.
+
+    Returns:
+        None
+    """
+    publish_events(timers, "fired")
+
+
+def publish_events(timers: Iterable[Timer], event: str) -> None:
+    """
+    Publishes an event of timers like publish_fired(). Besides "fired", the events of the
+    timers that will never fire ("cancelled" and "dead_lettered") end the streams watching them.
+
+    Args:
+        timers (Iterable[Timer]): The timers.
+        event (str): The event type, "fired", "cancelled" or "dead_lettered".
+
+    Returns:
+        None
+    """
+    if not settings.TIMERS_FIRE_EVENTS:
+        return
+    pipeline = get_redis().pipeline(transaction=False)
+    published = 0
+    for timer in timers:
+        if event == "fired":
+            message = json.dumps({"id": str(timer.id), "time_left": 0})
+        else:
+            message = json.dumps({"id": str(timer.id), "event": event})
+        pipeline.publish(timer_channel(timer.id), message)
+        if timer.client:
+            pipeline.publish(client_channel(timer.client), message)
+        published += 1
+    if not published:
+        return
+    try:
+        pipeline.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to publish {published} {event} event(s): {e}")
+
+
+def get_ended_timers(timer_ids: Iterable[UUID]) -> Dict[UUID, str]:
+    """
+    Returns the timers among timer_ids that will never fire, with one query.
+
+    Args:
+        timer_ids (Iterable[UUID]): The ids of the timers.
+
+    Returns:
+        Dict[UUID, str]: The event type of every cancelled or dead-lettered timer, "cancelled"
+        or "dead_lettered".
+    """
+    return {
+        timer_id: "cancelled" if is_cancelled else "dead_lettered"
+        for timer_id, is_cancelled in Timer.objects.filter(
+            Q(is_cancelled=True) | Q(is_dead_lettered=True),
+            id__in=list(timer_ids),
+        ).values_list("id", "is_cancelled")
+    }
+
+
+def format_event(event: str, data: Dict) -> bytes:
+    """
+    Formats a Server-Sent Event.
+
+    Args:
+        event (str): The event type, "fired", "cancelled", "dead_lettered" or "not_found".
+        data (Dict): The event payload, serialized as JSON.
+
+    Returns:
+        bytes: The event, terminated by a blank line.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+async def stream_fired_events(
+    timer_ids: Optional[List[UUID]] = None, client: Optional[str] = None
+) -> AsyncIterator[bytes]:
+    """
+    Streams the fire events of a set of timers, or of all the timers of a client, as
+    Server-Sent Events.
+
+    Subscribes to the Redis channels first, then reads the current state of the requested
+    timers, so a timer that fires in between is reported either way: the timers that already
+    fired, were cancelled or dead-lettered (and the unknown ones) are reported right away. A
+    stream of timer ids ends once none of them is pending anymore; a client stream lasts until
+    the client disconnects. A comment line is sent every TIMERS_EVENTS_KEEPALIVE_SECONDS of
+    silence, so proxies keep the connection open.
+
+    Args:
+        timer_ids (Optional[List[UUID]]): The timers to watch.
+        client (Optional[str]): The client digest whose timers are watched, when timer_ids is None.
+
+    Returns:
+        AsyncIterator[bytes]: The events.
+    """
+    connection = get_async_redis()
+    pubsub = connection.pubsub()
+    try:
+        if timer_ids is not None:
+            await pubsub.subscribe(*(timer_channel(i) for i in timer_ids))
+            states = await sync_to_async(get_timer_states)(timer_ids)
+            # Cancelled timers are left out of the states, dead-lettered ones look pending
+            ended = await sync_to_async(get_ended_timers)(
+                timer_id
+                for timer_id in timer_ids
+                if timer_id not in states or not states[timer_id][1]
+            )
+            pending: Optional[Set[str]] = set()
+            for timer_id in timer_ids:
+                state = states.get(timer_id)
+                if timer_id in ended:
+                    yield format_event(ended[timer_id], {"id": str(timer_id)})
+                elif state is None:
+                    yield format_event(
+                        "not_found",
+                        {"id": str(timer_id), "error": "Timer not found"},
+                    )
+                elif state[1]:
+                    yield format_event(
+                        "fired", {"id": str(timer_id), "time_left": 0}
+                    )
+                else:
+                    pending.add(str(timer_id))
+        else:
+            await pubsub.subscribe(client_channel(client))
+            pending = None
+
+        while pending is None or pending:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=settings.TIMERS_EVENTS_KEEPALIVE_SECONDS,
+            )
+            if message is None:
+                yield b": keepalive\n\n"
+                continue
+            data = json.loads(message["data"])
+            if pending is not None:
+                if data["id"] not in pending:
+                    continue
+                pending.discard(data["id"])
+            yield format_event(data.pop("event", "fired"), data)
+    finally:
+        await pubsub.aclose()
+        await connection.aclose()
@@ -0,0 +1,187 @@
+# timers/fastpath.py
+# Lightweight validation and orjson parsing/rendering for the timer endpoints (TIMERS_FAST_PATH).
+from typing import Any, Optional, Tuple
+
+import orjson
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import URLValidator
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer
+
+from .models import Timer
+from .serializers import TimerSerializer, build_timer
+
+# Same limit as Timer.url
+URL_MAX_LENGTH = 200
+# Larger durations are left to TimerSerializer, which rejects integers too long to convert
+MAX_FAST_VALUE = 2**31
+# Recurring timers are left to TimerSerializer
+RECURRENCE_FIELDS = (
+    "interval_seconds",
+    "cron",
+    "repeat_until",
+    "max_occurrences",
+)
+
+_validate_url = URLValidator()
+
+
+class TimerPayload:
+    """
+    Validated "set timer" payload of a one-shot timer: hours, minutes, seconds and url.
+
+    parse() only accepts the payloads that TimerSerializer accepts with the same validated
+    values, through a handful of type and range checks. Anything else, including every invalid
+    payload, is left to TimerSerializer, so error responses stay identical to the serializer's.
+    """
+
+    __slots__ = ("hours", "minutes", "seconds", "url")
+
+    def __init__(
+        self, hours: int, minutes: int, seconds: int, url: str
+    ) -> None:
+        self.hours = hours
+        self.minutes = minutes
+        self.seconds = seconds
+        self.url = url
+
+    @classmethod
+    def parse(cls, data: Any) -> Optional["TimerPayload"]:
+        """
+        Validates a request body.
+
+        Args:
+            data (Any): The parsed request body.
+
+        Returns:
+            Optional[TimerPayload]: The payload, or None if it has to go through TimerSerializer.
+        """
+        if type(data) is not dict:
+            return None
+        if any(field in data for field in RECURRENCE_FIELDS):
+            return None
+        hours = data.get("hours")
+        minutes = data.get("minutes")
+        seconds = data.get("seconds")
+        url = data.get("url")
+        # Exact types only: bool is an int subclass, and strings or floats are coerced by
+        # the serializer, so they take the slow path.
+        if not (
+            type(hours) is int
+            and type(minutes) is int
+            and type(seconds) is int
+            and type(url) is str
+        ):
+            return None
+        if not (
+            0 <= hours < MAX_FAST_VALUE
+            and 0 <= minutes < MAX_FAST_VALUE
+            and 0 <= seconds < MAX_FAST_VALUE
+        ):
+            return None
+        if hours == 0 and minutes == 0 and seconds == 0:
+            return None
+        # The serializer trims whitespace and accepts internationalized URLs: slow path
+        if (
+            not url
+            or len(url) > URL_MAX_LENGTH
+            or not url.isascii()
+            or "\x00" in url
+            or url != url.strip()
+        ):
+            return None
+        try:
+            _validate_url(url)
+        except DjangoValidationError:
+            return None
+        return cls(hours, minutes, seconds, url)
+
+    def validated_data(self) -> dict:
+        """
+        Returns the payload in the shape of TimerSerializer.validated_data, for build_timer().
+        """
+        return {
+            "url": self.url,
+            "hours": self.hours,
+            "minutes": self.minutes,
+            "seconds": self.seconds,
+        }
+
+
+def validate_timer(data: Any) -> Tuple[Optional[Timer], Optional[dict]]:
+    """
+    Validates a "set timer" payload and builds the unsaved timer.
+
+    With TIMERS_FAST_PATH, payloads accepted by TimerPayload skip TimerSerializer; all the
+    others, and every payload without the fast path, are validated by TimerSerializer.
+
+    Args:
+        data (Any): The parsed request body.
+
+    Returns:
+        Tuple[Optional[Timer], Optional[dict]]: The unsaved timer and None, or None and the
+        serializer errors.
+    """
+    if settings.TIMERS_FAST_PATH:
+        payload = TimerPayload.parse(data)
+        if payload is not None:
+            return build_timer(payload.validated_data()), None
+    serializer = TimerSerializer(data=data)
+    if not serializer.is_valid():
+        return None, serializer.errors
+    return serializer.build_timer(serializer.validated_data), None
+
+
+class OrjsonParser(BaseParser):
+    """
+    JSON parser using orjson, with the error message of rest_framework.parsers.JSONParser.
+    """
+
+    media_type = "application/json"
+
+    def parse(self, stream, media_type=None, parser_context=None) -> Any:
+        try:
+            return orjson.loads(stream.read() if stream is not None else b"")
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class OrjsonRenderer(BaseRenderer):
+    """
+    JSON renderer using orjson. The output is compact, like the default
+    rest_framework.renderers.JSONRenderer, and UTC datetimes end in "Z".
+    """
+
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(
+        self, data, accepted_media_type=None, renderer_context=None
+    ) -> bytes:
+        if data is None:
+            return b""
+        return orjson.dumps(data, option=orjson.OPT_UTC_Z)
+
+
+class FastPathMixin:
+    """
+    APIView mixin switching the parsers and renderers to orjson when TIMERS_FAST_PATH is set.
+    Only the JSON parser is replaced: form and multipart bodies are still accepted.
+    """
+
+    def get_parsers(self) -> list:
+        parsers = super().get_parsers()
+        if settings.TIMERS_FAST_PATH:
+            return [
+                OrjsonParser() if isinstance(parser, JSONParser) else parser
+                for parser in parsers
+            ]
+        return parsers
+
+    def get_renderers(self) -> list:
+        if settings.TIMERS_FAST_PATH:
+            return [OrjsonRenderer()]
+        return super().get_renderers()
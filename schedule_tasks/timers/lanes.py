@@ -0,0 +1,245 @@
+# timers/lanes.py
+# Per-destination-host delivery lanes with concurrency caps and circuit breakers.
+import logging
+import math
+import uuid
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import redis
+from django.conf import settings
+
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# How long an open (or half-open) circuit is remembered when its host receives no more deliveries
+TRIPPED_TTL_SECONDS = 24 * 3600
+
+# Asks for a delivery slot. KEYS: open, tripped, probe, slots; ARGV: max_concurrency,
+# lease_seconds, open_seconds, slot. Returns {allowed, seconds to wait when not allowed,
+# probe}. The slots sorted set maps every delivery in flight to the expiry of its lease (on
+# the Redis clock): the leases of workers that died mid-delivery are pruned here, so their
+# slots are given back after lease_seconds.
+ACQUIRE_SCRIPT = """
+local lease = tonumber(ARGV[2])
+local open_ms = redis.call("PTTL", KEYS[1])
+if open_ms > 0 then
+    return {0, tostring(open_ms / 1000), 0}
+end
+local probe = 0
+if redis.call("EXISTS", KEYS[2]) == 1 then
+    -- Half-open: only the delivery that wins the probe slot may proceed
+    if not redis.call("SET", KEYS[3], ARGV[4], "NX", "PX", math.ceil(lease * 1000)) then
+        return {0, ARGV[3], 0}
+    end
+    probe = 1
+end
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+redis.call("ZREMRANGEBYSCORE", KEYS[4], "-inf", now)
+if redis.call("ZCARD", KEYS[4]) >= tonumber(ARGV[1]) then
+    if probe == 1 then
+        redis.call("DEL", KEYS[3])
+    end
+    return {0, "1", 0}
+end
+redis.call("ZADD", KEYS[4], now + lease, ARGV[4])
+redis.call("EXPIRE", KEYS[4], math.ceil(lease) + 1)
+return {1, "0", probe}
+"""
+
+# Gives a delivery slot back and records the outcome of the delivery. KEYS: slots, tripped,
+# probe, failures, open; ARGV: slot, healthy, probe, failure_threshold, failure_window,
+# open_seconds, TRIPPED_TTL_SECONDS. Returns 1 if the circuit was tripped.
+RELEASE_SCRIPT = """
+redis.call("ZREM", KEYS[1], ARGV[1])
+if ARGV[2] == "1" then
+    if ARGV[3] == "1" then
+        -- The probe succeeded: close the circuit
+        redis.call("DEL", KEYS[2], KEYS[3], KEYS[4])
+    end
+    return 0
+end
+local failures = redis.call("INCR", KEYS[4])
+if failures == 1 then
+    redis.call("EXPIRE", KEYS[4], ARGV[5])
+end
+if ARGV[3] == "1" or failures >= tonumber(ARGV[4]) then
+    redis.call("SET", KEYS[5], 1, "PX", ARGV[6])
+    redis.call("SET", KEYS[2], 1, "EX", ARGV[7])
+    redis.call("DEL", KEYS[4], KEYS[3])
+    return 1
+end
+return 0
+"""
+
+
+@dataclass(frozen=True)
+class LaneDecision:
+    """
+    Result of asking a host lane for a delivery slot.
+
+    Attributes:
+        allowed (bool): Whether the delivery may proceed.
+        retry_after (float): When not allowed, how many seconds to wait before trying again.
+        probe (bool): Whether the delivery is the half-open probe of a tripped circuit.
+        slot (str): When allowed, the slot to give back with release().
+    """
+
+    allowed: bool
+    retry_after: float = 0.0
+    probe: bool = False
+    slot: str = ""
+
+
+class HostLanes:
+    """
+    Delivery lanes keyed on the host of the webhook URL.
+
+    Every lane caps the number of deliveries in flight to its host, and has a circuit breaker:
+    after failure_threshold failures within failure_window seconds the circuit opens and the
+    host's timers are parked for open_seconds. Then a single probe delivery is let through
+    (half-open); if it succeeds the circuit closes, otherwise it opens again.
+
+    The lane state lives in Redis (TIMERS_REDIS_URL), so it is shared by all worker replicas,
+    and is updated by Lua scripts: one atomic round trip per acquire() and per release().
+    The lanes fail open: if Redis is unreachable, deliveries proceed without a slot.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        failure_threshold: int,
+        failure_window: float,
+        open_seconds: float,
+        lease_seconds: float,
+    ) -> None:
+        """
+        Args:
+            max_concurrency (int): The maximum number of deliveries in flight per host.
+            failure_threshold (int): The number of failures that opens the circuit.
+            failure_window (float): The window in which failures are counted, in seconds.
+            open_seconds (float): How long the circuit stays open before a probe, in seconds.
+            lease_seconds (float): How long a slot or probe slot that is never released is kept, in seconds.
+        """
+        self.max_concurrency = max_concurrency
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.open_seconds = open_seconds
+        self.lease_seconds = lease_seconds
+
+    @classmethod
+    def from_settings(cls) -> "HostLanes":
+        """
+        Creates the lanes configured by the TIMERS_LANE_* settings.
+
+        Returns:
+            HostLanes: The lanes.
+        """
+        return cls(
+            max_concurrency=settings.TIMERS_LANE_MAX_CONCURRENCY,
+            failure_threshold=settings.TIMERS_LANE_FAILURE_THRESHOLD,
+            failure_window=settings.TIMERS_LANE_FAILURE_WINDOW_SECONDS,
+            open_seconds=settings.TIMERS_LANE_OPEN_SECONDS,
+            lease_seconds=2
+            * (
+                settings.TIMERS_DELIVERY_CONNECT_TIMEOUT
+                + settings.TIMERS_DELIVERY_READ_TIMEOUT
+            ),
+        )
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """
+        Returns the lane key of a webhook URL: its lower-cased host and port.
+
+        Args:
+            url (str): The webhook URL.
+
+        Returns:
+            str: The host, followed by ":<port>" when the URL has an explicit port.
+        """
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        return f"{host}:{parts.port}" if parts.port else host
+
+    @staticmethod
+    def _key(host: str, name: str) -> str:
+        return f"timers:lane:{host}:{name}"
+
+    def acquire(self, host: str) -> LaneDecision:
+        """
+        Asks the lane of host for a delivery slot.
+
+        Args:
+            host (str): The lane key, see host_of().
+
+        Returns:
+            LaneDecision: Whether the delivery may proceed, and if not, when to retry.
+        """
+        slot = uuid.uuid4().hex
+        try:
+            script = get_redis().register_script(ACQUIRE_SCRIPT)
+            allowed, retry_after, probe = script(
+                keys=[
+                    self._key(host, "open"),
+                    self._key(host, "tripped"),
+                    self._key(host, "probe"),
+                    self._key(host, "slots"),
+                ],
+                args=[
+                    self.max_concurrency,
+                    self.lease_seconds,
+                    self.open_seconds,
+                    slot,
+                ],
+            )
+        except redis.RedisError as e:
+            logger.warning(
+                f"Delivery lanes unavailable, delivering to {host} without a slot: {e}"
+            )
+            return LaneDecision(True)
+        if not allowed:
+            return LaneDecision(False, retry_after=float(retry_after))
+        return LaneDecision(True, probe=bool(probe), slot=slot)
+
+    def release(
+        self, host: str, healthy: bool, probe: bool = False, slot: str = ""
+    ) -> None:
+        """
+        Returns the delivery slot taken with acquire() and records the outcome of the delivery.
+
+        Args:
+            host (str): The lane key, see host_of().
+            healthy (bool): False if the host failed (no response, timeout or 5xx status).
+            probe (bool): The probe flag of the LaneDecision returned by acquire().
+            slot (str): The slot of the LaneDecision returned by acquire().
+
+        Returns:
+            None
+        """
+        try:
+            script = get_redis().register_script(RELEASE_SCRIPT)
+            script(
+                keys=[
+                    self._key(host, "slots"),
+                    self._key(host, "tripped"),
+                    self._key(host, "probe"),
+                    self._key(host, "failures"),
+                    self._key(host, "open"),
+                ],
+                args=[
+                    slot,
+                    int(healthy),
+                    int(probe),
+                    self.failure_threshold,
+                    math.ceil(self.failure_window),
+                    math.ceil(self.open_seconds * 1000),
+                    TRIPPED_TTL_SECONDS,
+                ],
+            )
+        except redis.RedisError as e:
+            logger.warning(
+                f"Delivery lanes unavailable, failed to release a slot of {host}: {e}"
+            )
@@ -0,0 +1,133 @@
+# timers/management/commands/benchmark_timers.py
+import json
+import platform
+import subprocess
+import time
+
+from celery.contrib.testing.worker import start_worker
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from schedule_tasks.celery import app
+from timers.benchmark import TimerLoadGenerator, WebhookReceiver, fire_lateness
+
+
+class Command(BaseCommand):
+    """
+    Runs the end-to-end load and fire-precision benchmark.
+
+    Usage: python manage.py benchmark_timers --settings=schedule_tasks.settings_bench
+    The command starts an in-process webhook receiver and Celery worker, creates timers through
+    POST /timer, polls them through GET /timer/<id>, waits for their webhooks and writes the
+    requests/sec, p50/p95/p99 latencies and fire lateness to a JSON file, so results can be
+    compared between commits.
+    """
+
+    help = "Benchmarks the timer API and the precision of webhook firing."
+
+    def add_arguments(self, parser) -> None:
+        """
+        Adds the benchmark parameters.
+        """
+        parser.add_argument(
+            "--timers",
+            type=int,
+            default=1000,
+            help="Number of timers to create.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=16,
+            help="Number of concurrent API clients.",
+        )
+        parser.add_argument(
+            "--gets-per-timer",
+            type=int,
+            default=5,
+            help="Number of GET /timer/<id> requests per timer.",
+        )
+        parser.add_argument(
+            "--delay",
+            type=int,
+            default=5,
+            help="Duration of the timers, in seconds.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Concurrency of the in-process Celery worker.",
+        )
+        parser.add_argument(
+            "--wait",
+            type=float,
+            default=60,
+            help="How long to wait for the webhooks after the timers are due, in seconds.",
+        )
+        parser.add_argument(
+            "--output",
+            default="benchmark-results.json",
+            help="Path of the JSON results file.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Runs the benchmark and writes the results file.
+        """
+        call_command("migrate", verbosity=0)
+        generator = TimerLoadGenerator(options["concurrency"])
+
+        with WebhookReceiver() as receiver, start_worker(
+            app,
+            pool="threads",
+            concurrency=options["workers"],
+            perform_ping_check=False,
+            shutdown_timeout=30,
+        ):
+            create_stats, timer_ids = generator.run_creates(
+                options["timers"], receiver.url, options["delay"]
+            )
+            get_stats = generator.run_gets(
+                timer_ids, options["gets_per_timer"]
+            )
+
+            deadline = time.time() + options["delay"] + options["wait"]
+            while receiver.count() < len(timer_ids) and time.time() < deadline:
+                time.sleep(0.1)
+            fire_stats = fire_lateness(receiver.received, timer_ids)
+
+        results = {
+            "commit": self._commit(),
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "parameters": {
+                name: options[name]
+                for name in (
+                    "timers",
+                    "concurrency",
+                    "gets_per_timer",
+                    "delay",
+                    "workers",
+                )
+            },
+            "create": create_stats,
+            "get": get_stats,
+            "fire": fire_stats,
+        }
+        with open(options["output"], "w") as f:
+            json.dump(results, f, indent=2)
+        self.stdout.write(json.dumps(results, indent=2))
+        self.stdout.write(f"Results written to {options['output']}")
+
+    @staticmethod
+    def _commit() -> str:
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
@@ -0,0 +1,43 @@
+# timers/management/commands/benchmark_validation.py
+import json
+
+from django.core.management.base import BaseCommand
+
+from timers.benchmark import compare_validation_paths
+
+
+class Command(BaseCommand):
+    """
+    Compares the CPU cost of TimerSerializer with the default JSON parser/renderer against the
+    fast path (TimerPayload and orjson, see TIMERS_FAST_PATH).
+
+    Usage: python manage.py benchmark_validation --iterations 20000
+    """
+
+    help = "Micro-benchmarks the serializer and fast-path validation of POST /timer."
+
+    def add_arguments(self, parser) -> None:
+        """
+        Adds the benchmark parameters.
+        """
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=10000,
+            help="Number of payloads processed per path.",
+        )
+        parser.add_argument(
+            "--output",
+            default="",
+            help="Optional path of a JSON results file.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Runs the micro-benchmark and prints the results.
+        """
+        results = compare_validation_paths(options["iterations"])
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+        self.stdout.write(json.dumps(results, indent=2))
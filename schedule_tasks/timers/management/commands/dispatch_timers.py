@@ -0,0 +1,56 @@
+# timers/management/commands/dispatch_timers.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from timers.dispatcher import TimerDispatcher
+
+
+class Command(BaseCommand):
+    """
+    Runs the timing-wheel dispatcher service.
+
+    Usage: python manage.py dispatch_timers
+    Set TIMERS_SCHEDULER = "dispatcher" so that the API stops publishing countdown messages
+    and announces new timers to this service instead.
+    """
+
+    help = "Loads pending timers into a timing wheel and hands them to the Celery workers when due."
+
+    def add_arguments(self, parser) -> None:
+        """
+        Adds the optional overrides of the TIMERS_DISPATCHER_* settings.
+        """
+        parser.add_argument(
+            "--tick",
+            type=float,
+            default=settings.TIMERS_DISPATCHER_TICK_SECONDS,
+            help="Resolution of the timing wheel, in seconds.",
+        )
+        parser.add_argument(
+            "--horizon",
+            type=float,
+            default=settings.TIMERS_DISPATCHER_HORIZON_SECONDS,
+            help="How far ahead timers are loaded from the database, in seconds.",
+        )
+        parser.add_argument(
+            "--refill",
+            type=float,
+            default=settings.TIMERS_DISPATCHER_REFILL_SECONDS,
+            help="How often the loading horizon is extended, in seconds.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Starts the dispatcher loop. The wheel is rebuilt from the database on every start.
+        """
+        dispatcher = TimerDispatcher(
+            tick_seconds=options["tick"],
+            horizon_seconds=options["horizon"],
+            refill_seconds=options["refill"],
+            max_loaded=settings.TIMERS_DISPATCHER_MAX_LOADED,
+        )
+        self.stdout.write("Timer dispatcher started.")
+        try:
+            dispatcher.run()
+        except KeyboardInterrupt:
+            self.stdout.write("Timer dispatcher stopped.")
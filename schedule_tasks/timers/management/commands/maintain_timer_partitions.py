@@ -0,0 +1,54 @@
+# timers/management/commands/maintain_timer_partitions.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from timers.partitions import maintain_partitions
+
+
+class Command(BaseCommand):
+    """
+    Runs the maintenance of the timers table once: creates the upcoming monthly partitions,
+    then archives and removes the old finished timers.
+
+    Usage: python manage.py maintain_timer_partitions --retention-days 30
+    The same maintenance runs nightly as the maintain_timer_partitions Celery task.
+    """
+
+    help = "Creates the upcoming timer partitions and archives the old finished timers."
+
+    def add_arguments(self, parser) -> None:
+        """
+        Adds the optional overrides of the retention settings.
+        """
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=settings.TIMERS_PARTITION_MONTHS_AHEAD,
+            help="Number of future monthly partitions kept created.",
+        )
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=settings.TIMERS_RETENTION_DAYS,
+            help="Age after which fired, dead-lettered and cancelled timers are archived, in days.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.TIMERS_RETENTION_BATCH_SIZE,
+            help="Number of timers deleted per transaction outside whole partitions.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Runs the maintenance and reports what was done.
+        """
+        result = maintain_partitions(
+            months_ahead=options["months_ahead"],
+            retention_days=options["retention_days"],
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(
+            f"{result['created']} partition(s) created, {result['dropped']} dropped, "
+            f"{result['timers']} timer(s) archived to {settings.TIMERS_ARCHIVE_DIR}."
+        )
@@ -0,0 +1,47 @@
+# timers/management/commands/relay_outbox.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from timers.outbox import OutboxRelay
+
+
+class Command(BaseCommand):
+    """
+    Runs the transactional outbox relay.
+
+    Usage: python manage.py relay_outbox
+    Set TIMERS_SCHEDULER = "outbox" so that the API writes TimerOutbox entries instead of
+    publishing to the broker on the request path.
+    """
+
+    help = "Publishes the timers of the transactional outbox to the broker in batches."
+
+    def add_arguments(self, parser) -> None:
+        """
+        Adds the optional overrides of the TIMERS_OUTBOX_* settings.
+        """
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.TIMERS_OUTBOX_BATCH_SIZE,
+            help="Maximum number of timers published per transaction.",
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=settings.TIMERS_OUTBOX_POLL_SECONDS,
+            help="How long to wait when the outbox is empty, in seconds.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Starts the relay loop.
+        """
+        relay = OutboxRelay(
+            batch_size=options["batch_size"], poll_seconds=options["poll"]
+        )
+        self.stdout.write("Outbox relay started.")
+        try:
+            relay.run()
+        except KeyboardInterrupt:
+            self.stdout.write("Outbox relay stopped.")
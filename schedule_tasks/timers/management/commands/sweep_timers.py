@@ -0,0 +1,48 @@
+# timers/management/commands/sweep_timers.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from timers.sweeper import TimerSweeper
+
+
+class Command(BaseCommand):
+    """
+    Runs the event-driven expired-timer sweeper.
+
+    Usage: python manage.py sweep_timers
+    Set TIMERS_SWEEPER = "loop" on the web, worker and beat services as well, so that the API
+    wakes the sweeper up and the every-minute check_expired_timers task stands down.
+    """
+
+    help = "Fires missed timers as soon as they are due, sleeping until the next one in between."
+
+    def add_arguments(self, parser) -> None:
+        """
+        Adds the optional overrides of the TIMERS_SWEEPER_* settings.
+        """
+        parser.add_argument(
+            "--max-sleep",
+            type=float,
+            default=settings.TIMERS_SWEEPER_MAX_SLEEP_SECONDS,
+            help="Longest sleep between two sweeps, in seconds.",
+        )
+        parser.add_argument(
+            "--grace",
+            type=float,
+            default=settings.TIMERS_SWEEPER_GRACE_SECONDS,
+            help="How long a due timer is left to its countdown message, in seconds.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Starts the sweeper loop.
+        """
+        sweeper = TimerSweeper(
+            max_sleep_seconds=options["max_sleep"],
+            grace_seconds=options["grace"],
+        )
+        self.stdout.write("Timer sweeper started.")
+        try:
+            sweeper.run()
+        except KeyboardInterrupt:
+            self.stdout.write("Timer sweeper stopped.")
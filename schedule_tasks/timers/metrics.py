@@ -0,0 +1,427 @@
+# timers/metrics.py
+# Prometheus-style metrics, aggregated across processes in the Django cache.
+import atexit
+import itertools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Timer
+from .routers import replica_reads
+
+logger = logging.getLogger(__name__)
+
+# Sums are stored as integers (cache counters only support integer increments), in micro-units
+SUM_SCALE = 1_000_000
+
+# How often the increments buffered by a process are written to the cache, in seconds
+FLUSH_INTERVAL_SECONDS = 1.0
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LATENESS_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+SWEEP_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx", "error")
+
+
+def status_class(status_code: Optional[int]) -> str:
+    """
+    Returns the status class label of an HTTP status, "error" if no response was received.
+
+    Args:
+        status_code (Optional[int]): The HTTP status.
+
+    Returns:
+        str: "1xx" to "5xx", or "error".
+    """
+    if status_code is None or not 100 <= status_code < 600:
+        return "error"
+    return f"{status_code // 100}xx"
+
+
+# Increments not written to the cache yet, by cache key
+_pending: Dict[str, int] = defaultdict(int)
+_pending_lock = threading.Lock()
+# Background thread flushing the buffer of this process, started by the first observation
+_flusher: Optional[threading.Thread] = None
+
+
+def _increment(key: str, delta: int = 1) -> None:
+    # Observations only add to the buffer of the process and never touch the cache, so a cache
+    # outage cannot fail the code being measured (e.g. a delivery between its POST and the
+    # recording of its outcome); the buffer is flushed by a background thread
+    global _flusher
+    with _pending_lock:
+        _pending[key] += delta
+        if _flusher is None:
+            _flusher = threading.Thread(
+                target=_flush_periodically, name="metrics-flusher", daemon=True
+            )
+            _flusher.start()
+
+
+def _flush_periodically() -> None:
+    while True:
+        time.sleep(FLUSH_INTERVAL_SECONDS)
+        flush_metrics()
+
+
+def flush_metrics() -> None:
+    """
+    Writes the increments buffered by this process to the cache, once per key. Runs every
+    FLUSH_INTERVAL_SECONDS in a background thread, before every scrape, and when the process
+    exits (including Celery pool processes, see worker_process_shutdown), so a scrape lags
+    the other processes by at most FLUSH_INTERVAL_SECONDS.
+
+    Never raises: if the cache is unavailable, the increments not written yet are put back
+    in the buffer for the next flush.
+
+    Returns:
+        None
+    """
+    with _pending_lock:
+        pending = dict(_pending)
+        _pending.clear()
+    items = list(pending.items())
+    for index, (key, delta) in enumerate(items):
+        try:
+            try:
+                cache.incr(key, delta)
+            except ValueError:
+                # First increment: create the counter, unless another process just did
+                if not cache.add(key, delta, timeout=None):
+                    cache.incr(key, delta)
+        except Exception as e:
+            logger.warning(
+                f"Failed to flush metrics, retrying at the next flush: {e}"
+            )
+            with _pending_lock:
+                for unflushed, unflushed_delta in items[index:]:
+                    _pending[unflushed] += unflushed_delta
+            return
+
+
+def flush_metrics_on_shutdown(**kwargs) -> None:
+    """
+    worker_process_shutdown signal handler: flushes the metrics of a Celery pool process,
+    which exits without running the atexit handlers.
+    """
+    flush_metrics()
+
+
+def _reset_after_fork() -> None:
+    # A forked child (e.g. a Celery prefork worker) must not flush the buffer of its parent,
+    # and does not inherit its flusher thread
+    global _pending_lock, _flusher
+    _pending_lock = threading.Lock()
+    _pending.clear()
+    _flusher = None
+
+
+atexit.register(flush_metrics)
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{name}="{value}"' for name, value in labels.items())
+        + "}"
+    )
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    """
+    Base class of the metrics. Label values are declared up front, so all the cache keys of a
+    metric are known and a scrape reads them with a single get_many().
+    """
+
+    type = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Optional[Dict[str, Sequence[str]]] = None,
+    ) -> None:
+        """
+        Args:
+            name (str): The metric name.
+            documentation (str): The HELP text.
+            labels (Optional[Dict[str, Sequence[str]]]): The possible values of every label.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels or {}
+        REGISTRY.append(self)
+
+    def _label_sets(self) -> Iterator[Dict[str, str]]:
+        names = list(self.labels)
+        for values in itertools.product(*(self.labels[n] for n in names)):
+            yield dict(zip(names, values))
+
+    def _check_labels(self, labels: Dict[str, str]) -> None:
+        for name, values in self.labels.items():
+            if labels.get(name) not in values:
+                raise ValueError(
+                    f"Invalid value {labels.get(name)!r} for label {name} of {self.name}."
+                )
+
+    def _key(self, labels: Dict[str, str], suffix: str) -> str:
+        label_part = ",".join(labels[name] for name in self.labels)
+        return f"timers:metrics:{self.name}:{label_part}:{suffix}"
+
+    def keys(self) -> List[str]:
+        """
+        Returns the cache keys holding the values of the metric.
+        """
+        raise NotImplementedError
+
+    def render(self, values: Dict[str, int]) -> List[str]:
+        """
+        Returns the exposition lines of the metric, given the values read from the cache.
+        """
+        raise NotImplementedError
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+
+
+class Counter(_Metric):
+    """
+    Monotonic counter.
+    """
+
+    type = "counter"
+
+    def inc(self, amount: int = 1, **labels: str) -> None:
+        """
+        Adds amount to the counter.
+
+        Args:
+            amount (int): The increment.
+            **labels (str): The label values.
+
+        Returns:
+            None
+        """
+        self._check_labels(labels)
+        _increment(self._key(labels, "total"), amount)
+
+    def keys(self) -> List[str]:
+        return [self._key(labels, "total") for labels in self._label_sets()]
+
+    def render(self, values: Dict[str, int]) -> List[str]:
+        lines = self._header()
+        for labels in self._label_sets():
+            value = values.get(self._key(labels, "total"), 0)
+            lines.append(f"{self.name}{_format_labels(labels)} {value}")
+        return lines
+
+
+class Histogram(_Metric):
+    """
+    Histogram with fixed buckets. An observation increments one bucket and the sum; the
+    cumulative bucket counts and the total count are computed when the metrics are scraped.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        labels: Optional[Dict[str, Sequence[str]]] = None,
+    ) -> None:
+        """
+        Args:
+            name (str): The metric name.
+            documentation (str): The HELP text.
+            buckets (Sequence[float]): The upper bounds of the buckets, in increasing order.
+            labels (Optional[Dict[str, Sequence[str]]]): The possible values of every label.
+        """
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labels)
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Records one observation.
+
+        Args:
+            value (float): The observed value.
+            **labels (str): The label values.
+
+        Returns:
+            None
+        """
+        self._check_labels(labels)
+        index = bisect_left(self.buckets, value)
+        _increment(self._key(labels, str(index)))
+        _increment(self._key(labels, "sum"), round(value * SUM_SCALE))
+
+    def keys(self) -> List[str]:
+        keys = []
+        for labels in self._label_sets():
+            keys.extend(
+                self._key(labels, str(index))
+                for index in range(len(self.buckets) + 1)
+            )
+            keys.append(self._key(labels, "sum"))
+        return keys
+
+    def render(self, values: Dict[str, int]) -> List[str]:
+        lines = self._header()
+        for labels in self._label_sets():
+            cumulative = 0
+            bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+            for index, bound in enumerate(bounds):
+                cumulative += values.get(self._key(labels, str(index)), 0)
+                lines.append(
+                    f"{self.name}_bucket{_format_labels({**labels, 'le': bound})} {cumulative}"
+                )
+            total = values.get(self._key(labels, "sum"), 0) / SUM_SCALE
+            lines.append(
+                f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}"
+            )
+            lines.append(
+                f"{self.name}_count{_format_labels(labels)} {cumulative}"
+            )
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    Gauge computed when the metrics are scraped.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self, name: str, documentation: str, collect: Callable[[], float]
+    ) -> None:
+        """
+        Args:
+            name (str): The metric name.
+            documentation (str): The HELP text.
+            collect (Callable[[], float]): Returns the current value.
+        """
+        self.collect = collect
+        super().__init__(name, documentation)
+
+    def keys(self) -> List[str]:
+        return []
+
+    def render(self, values: Dict[str, int]) -> List[str]:
+        return self._header() + [
+            f"{self.name} {_format_value(self.collect())}"
+        ]
+
+
+REGISTRY: List[_Metric] = []
+
+
+def _pending_timers():
+    return Timer.objects.filter(
+        is_fired=False, is_dead_lettered=False, is_cancelled=False
+    )
+
+
+def _count_on_replica(queryset) -> int:
+    # The gauges tolerate replication lag, keep their full counts off the primary
+    with replica_reads():
+        return queryset.count()
+
+
+FIRE_LATENESS = Histogram(
+    "timers_fire_lateness_seconds",
+    "Time between the scheduled time of a timer and the successful delivery of its webhook.",
+    LATENESS_BUCKETS,
+)
+WEBHOOK_DURATION = Histogram(
+    "timers_webhook_duration_seconds",
+    "Duration of webhook POST requests, by response status class.",
+    LATENCY_BUCKETS,
+    labels={"status_class": STATUS_CLASSES},
+)
+FIRE_OUTCOMES = Counter(
+    "timers_fire_outcomes_total",
+    "Number of fire_webhook runs, by outcome.",
+    labels={"outcome": ("fired", "retried", "dead_lettered", "parked")},
+)
+ADMISSION_REJECTIONS = Counter(
+    "timers_admission_rejections_total",
+    "Number of timer creation requests refused by admission control, by reason.",
+    labels={"reason": ("rate_limited", "overloaded")},
+)
+SWEEP_FOUND = Histogram(
+    "timers_sweep_found",
+    "Number of due timers found per run of check_expired_timers.",
+    SWEEP_BUCKETS,
+)
+SWEEP_ENQUEUED = Histogram(
+    "timers_sweep_enqueued",
+    "Number of timers enqueued per run of check_expired_timers.",
+    SWEEP_BUCKETS,
+)
+API_REQUEST_DURATION = Histogram(
+    "timers_api_request_duration_seconds",
+    "Duration of timer API requests, by view and response status class.",
+    LATENCY_BUCKETS,
+    labels={
+        "view": (
+            "create_timer",
+            "create_timers_batch",
+            "timer_detail",
+            "timer_status_batch",
+        ),
+        "status_class": STATUS_CLASSES,
+    },
+)
+PENDING_TIMERS = Gauge(
+    "timers_pending",
+    "Number of timers that have not been fired, dead-lettered or cancelled.",
+    lambda: _count_on_replica(_pending_timers()),
+)
+OVERDUE_TIMERS = Gauge(
+    "timers_overdue",
+    "Number of pending timers whose next attempt is due.",
+    lambda: _count_on_replica(
+        _pending_timers().filter(next_attempt_at__lte=timezone.now())
+    ),
+)
+
+
+def render_metrics() -> str:
+    """
+    Renders all the metrics in the Prometheus text exposition format.
+
+    Returns:
+        str: The exposition.
+    """
+    flush_metrics()
+    keys: List[str] = []
+    for metric in REGISTRY:
+        keys.extend(metric.keys())
+    values = cache.get_many(keys)
+
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render(values))
+    return "\n".join(lines) + "\n"
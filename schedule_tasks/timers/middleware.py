@@ -0,0 +1,177 @@
+# timers/middleware.py
+# Request instrumentation middleware of the timer API.
+import json
+import logging
+import time
+from typing import Callable, Dict
+
+from asgiref.sync import (iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.http import HttpRequest, HttpResponse
+
+from .metrics import API_REQUEST_DURATION, status_class
+from .timing import (record_stage, save_profile, should_profile, start_profile,
+                     start_stages, stop_stages)
+
+logger = logging.getLogger(__name__)
+
+# The views whose latency is recorded, by URL name (see timers/urls.py)
+INSTRUMENTED_VIEWS = API_REQUEST_DURATION.labels["view"]
+
+
+class HybridMiddleware:
+    """
+    Base class of the middlewares below, which serve both the sync (WSGI) and the async (ASGI)
+    views. Subclasses implement handle() and ahandle().
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.ahandle(request)
+        return self.handle(request)
+
+    def handle(self, request: HttpRequest) -> HttpResponse:
+        raise NotImplementedError
+
+    async def ahandle(self, request: HttpRequest) -> HttpResponse:
+        raise NotImplementedError
+
+
+class ApiMetricsMiddleware(HybridMiddleware):
+    """
+    Records the duration of the timer API requests in the timers_api_request_duration_seconds
+    histogram, labelled with the URL name of the view and the status class of the response.
+
+    Works with both the sync (WSGI) and the async (ASGI) views; in the async case the metric is
+    recorded off the event loop.
+    """
+
+    def handle(self, request: HttpRequest) -> HttpResponse:
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - start)
+        return response
+
+    async def ahandle(self, request: HttpRequest) -> HttpResponse:
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        await sync_to_async(self._record, thread_sensitive=False)(
+            request, response, time.perf_counter() - start
+        )
+        return response
+
+    @staticmethod
+    def _record(
+        request: HttpRequest, response: HttpResponse, duration: float
+    ) -> None:
+        match = getattr(request, "resolver_match", None)
+        if match is None or match.url_name not in INSTRUMENTED_VIEWS:
+            return
+        API_REQUEST_DURATION.observe(
+            duration,
+            view=match.url_name,
+            status_class=status_class(response.status_code),
+        )
+
+
+class ServerTimingMiddleware(HybridMiddleware):
+    """
+    Records the duration of the stages of every request (validate, db, cache, enqueue, render,
+    see timers.timing.stage) and reports them in a Server-Timing header, so they show up in the
+    network panel of the browser, and in one structured (JSON) log line per request.
+
+    The render stage of DRF and template responses is timed here, around response.render().
+    """
+
+    def handle(self, request: HttpRequest) -> HttpResponse:
+        token = start_stages()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            stages = stop_stages(token)
+        return self._report(
+            request, response, stages, time.perf_counter() - start
+        )
+
+    async def ahandle(self, request: HttpRequest) -> HttpResponse:
+        token = start_stages()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stages = stop_stages(token)
+        return self._report(
+            request, response, stages, time.perf_counter() - start
+        )
+
+    def process_template_response(
+        self, request: HttpRequest, response: HttpResponse
+    ) -> HttpResponse:
+        # Called right before the response is rendered
+        start = time.perf_counter()
+
+        def rendered(response: HttpResponse) -> None:
+            record_stage("render", time.perf_counter() - start)
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    @staticmethod
+    def _report(
+        request: HttpRequest,
+        response: HttpResponse,
+        stages: Dict[str, float],
+        total: float,
+    ) -> HttpResponse:
+        timings = {name: round(d * 1000, 3) for name, d in stages.items()}
+        timings["total"] = round(total * 1000, 3)
+        response["Server-Timing"] = ", ".join(
+            f"{name};dur={duration}" for name, duration in timings.items()
+        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                json.dumps(
+                    {
+                        "event": "request_timing",
+                        "method": request.method,
+                        "path": request.path,
+                        "status": response.status_code,
+                        "stages_ms": timings,
+                    }
+                )
+            )
+        return response
+
+
+class SamplingProfilerMiddleware(HybridMiddleware):
+    """
+    Profiles a TIMERS_PROFILE_SAMPLE_RATE fraction of the requests with cProfile and dumps the
+    stats of each one to TIMERS_PROFILE_DIR. Disabled when the rate is 0 (the default).
+
+    Only sync requests are profiled: a profiler on the event loop thread of an ASGI server
+    would mix the stacks of all the concurrent requests.
+    """
+
+    def handle(self, request: HttpRequest) -> HttpResponse:
+        profile = start_profile() if should_profile() else None
+        if profile is None:
+            return self.get_response(request)
+        try:
+            return self.get_response(request)
+        finally:
+            match = getattr(request, "resolver_match", None)
+            view = match.url_name if match and match.url_name else "other"
+            path = save_profile(profile, f"{request.method}-{view}")
+            logger.info(f"Profiled {request.method} {request.path}: {path}")
+
+    async def ahandle(self, request: HttpRequest) -> HttpResponse:
+        return await self.get_response(request)
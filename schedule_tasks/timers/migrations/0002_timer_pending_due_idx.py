@@ -0,0 +1,21 @@
+# Generated by Django 5.1.5 on 2026-10-17 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("timers", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="timer",
+            index=models.Index(
+                condition=models.Q(("is_fired", False)),
+                fields=["scheduled_time", "id"],
+                name="timer_pending_due_idx",
+            ),
+        ),
+    ]
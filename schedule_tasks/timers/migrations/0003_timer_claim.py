@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-17 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("timers", "0002_timer_pending_due_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="timer",
+            name="claim_token",
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="timer",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.1.5 on 2026-10-17 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_next_attempt_at(apps, schema_editor) -> None:
+    """
+    Existing timers are due for their first attempt at their scheduled_time.
+    """
+    Timer = apps.get_model("timers", "Timer")
+    Timer.objects.filter(next_attempt_at__isnull=True).update(
+        next_attempt_at=F("scheduled_time")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("timers", "0003_timer_claim"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="timer",
+            name="attempts",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="timer",
+            name="is_dead_lettered",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name="timer",
+            name="next_attempt_at",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            backfill_next_attempt_at, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name="timer",
+            name="next_attempt_at",
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.RemoveIndex(
+            model_name="timer",
+            name="timer_pending_due_idx",
+        ),
+        migrations.AddIndex(
+            model_name="timer",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_dead_lettered", False), ("is_fired", False)
+                ),
+                fields=["next_attempt_at", "id"],
+                name="timer_next_attempt_idx",
+            ),
+        ),
+        migrations.CreateModel(
+            name="DeliveryAttempt",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("attempt", models.PositiveIntegerField()),
+                (
+                    "status_code",
+                    models.PositiveSmallIntegerField(blank=True, null=True),
+                ),
+                ("latency", models.FloatField()),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "timer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="delivery_attempts",
+                        to="timers.timer",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.5 on 2026-10-17 03:06
+
+from django.db import migrations, models
+
+import timers.ids
+
+
+class Migration(migrations.Migration):
+    """
+    New timers get time-ordered ids (see TIMERS_ID_SCHEME). The column type is unchanged, so
+    existing uuid4 ids stay valid as they are: they are held by clients and are not rewritten.
+    """
+
+    dependencies = [
+        ("timers", "0004_delivery_attempts_and_backoff"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="timer",
+            name="id",
+            field=models.UUIDField(
+                default=timers.ids.new_timer_id,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
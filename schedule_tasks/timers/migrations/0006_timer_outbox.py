@@ -0,0 +1,38 @@
+# Generated by Django 5.1.5 on 2026-10-17 03:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("timers", "0005_timer_time_ordered_ids"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TimerOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("due_at", models.DateTimeField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "timer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="outbox_entries",
+                        to="timers.timer",
+                    ),
+                ),
+            ],
+        ),
+    ]
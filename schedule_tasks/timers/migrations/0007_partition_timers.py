@@ -0,0 +1,183 @@
+# Generated by Django 5.1.5 on 2026-10-17 03:21
+
+from datetime import datetime, timezone
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Monthly partitions created after the legacy one, the following ones are created by the
+# maintain_timer_partitions task (timers.partitions.ensure_partitions).
+INITIAL_MONTHS = 3
+
+
+def _next_attempt_index() -> models.Index:
+    # The index of migration 0004, generated by Django the same way, so the predicate text of
+    # the partitioned index matches the one of the legacy table exactly: PostgreSQL only
+    # attaches an existing partition index whose definition (predicate included) is identical
+    return models.Index(
+        condition=models.Q(("is_dead_lettered", False), ("is_fired", False)),
+        fields=["next_attempt_at", "id"],
+        name="timer_next_attempt_idx",
+    )
+
+
+def _month_start(value: datetime, months: int = 0) -> datetime:
+    value = value.astimezone(timezone.utc)
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_timers_table(apps, schema_editor) -> None:
+    """
+    Turns timers_timer into a table partitioned by range of scheduled_time (PostgreSQL only).
+
+    The existing table is kept as it is and attached as the timers_timer_legacy partition,
+    covering every time up to the end of the month of its last timer (or of the current
+    month), so no row is copied. Monthly partitions follow, plus a DEFAULT partition for
+    timers scheduled past the last one.
+
+    Attaching is not free on a large table: PostgreSQL has to prove that every row fits the
+    partition bound, and every index of the partitioned table needs a matching index on the
+    partition (for the primary key, one backing a constraint). All of them are prepared
+    before the ATTACH: a validated CHECK constraint implying the bound, a (id, scheduled_time)
+    primary key built from a unique index, and the legacy timer_next_attempt_idx, which is
+    identical to the partitioned one. So the ATTACH itself neither scans the table nor builds
+    an index, and both legacy indexes are then attached explicitly: that fails the migration
+    rather than leaving a duplicate index behind if they did not match. The validation and the
+    index build still read the whole table, and the migration runs in one transaction holding
+    the lock taken by the renames until it commits: on a large table, migrate in a
+    maintenance window.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Timer = apps.get_model("timers", "Timer")
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT MAX(scheduled_time), now() FROM timers_timer")
+        last_scheduled, current_time = cursor.fetchone()
+    legacy_end = _month_start(
+        max(last_scheduled or current_time, current_time), 1
+    )
+
+    for sql in (
+        "ALTER TABLE timers_timer RENAME TO timers_timer_legacy",
+        "ALTER INDEX timer_next_attempt_idx RENAME TO timers_timer_legacy_next_attempt_idx",
+        # The primary key of a partition has to include the partition key, like the one of
+        # the partitioned table
+        (
+            "CREATE UNIQUE INDEX timers_timer_legacy_pkey "
+            "ON timers_timer_legacy (id, scheduled_time)"
+        ),
+        "ALTER TABLE timers_timer_legacy DROP CONSTRAINT timers_timer_pkey",
+        (
+            "ALTER TABLE timers_timer_legacy ADD CONSTRAINT timers_timer_legacy_pkey "
+            "PRIMARY KEY USING INDEX timers_timer_legacy_pkey"
+        ),
+        (
+            "CREATE TABLE timers_timer (LIKE timers_timer_legacy INCLUDING DEFAULTS "
+            "INCLUDING CONSTRAINTS) PARTITION BY RANGE (scheduled_time)"
+        ),
+        (
+            "ALTER TABLE timers_timer ADD CONSTRAINT timers_timer_pkey "
+            "PRIMARY KEY (id, scheduled_time)"
+        ),
+    ):
+        schema_editor.execute(sql)
+    schema_editor.execute(
+        _next_attempt_index().create_sql(Timer, schema_editor)
+    )
+    # Proves the partition bound ahead of the ATTACH, which then skips its own scan
+    schema_editor.execute(
+        "ALTER TABLE timers_timer_legacy ADD CONSTRAINT timers_timer_legacy_bound "
+        "CHECK (scheduled_time < %s) NOT VALID",
+        [legacy_end],
+    )
+    schema_editor.execute(
+        "ALTER TABLE timers_timer_legacy VALIDATE CONSTRAINT timers_timer_legacy_bound"
+    )
+    schema_editor.execute(
+        "ALTER TABLE timers_timer ATTACH PARTITION timers_timer_legacy "
+        "FOR VALUES FROM (MINVALUE) TO (%s)",
+        [legacy_end],
+    )
+    for sql in (
+        # No-ops when the ATTACH already adopted them, errors if it built other indexes
+        "ALTER INDEX timers_timer_pkey ATTACH PARTITION timers_timer_legacy_pkey",
+        (
+            "ALTER INDEX timer_next_attempt_idx "
+            "ATTACH PARTITION timers_timer_legacy_next_attempt_idx"
+        ),
+        # Redundant with the partition bound from now on
+        "ALTER TABLE timers_timer_legacy DROP CONSTRAINT timers_timer_legacy_bound",
+    ):
+        schema_editor.execute(sql)
+    for months in range(INITIAL_MONTHS):
+        start = _month_start(legacy_end, months)
+        schema_editor.execute(
+            f"CREATE TABLE timers_timer_p{start.year:04d}_{start.month:02d} "
+            "PARTITION OF timers_timer FOR VALUES FROM (%s) TO (%s)",
+            [start, _month_start(start, 1)],
+        )
+    schema_editor.execute(
+        "CREATE TABLE timers_timer_default PARTITION OF timers_timer DEFAULT"
+    )
+
+
+def unpartition_timers_table(apps, schema_editor) -> None:
+    """
+    Copies the partitioned timers table back into a plain table (PostgreSQL only).
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for sql in (
+        (
+            "CREATE TABLE timers_timer_plain (LIKE timers_timer INCLUDING DEFAULTS "
+            "INCLUDING CONSTRAINTS)"
+        ),
+        "INSERT INTO timers_timer_plain SELECT * FROM timers_timer",
+        "DROP TABLE timers_timer",
+        "ALTER TABLE timers_timer_plain RENAME TO timers_timer",
+        "ALTER TABLE timers_timer ADD CONSTRAINT timers_timer_pkey PRIMARY KEY (id)",
+    ):
+        schema_editor.execute(sql)
+    schema_editor.execute(
+        _next_attempt_index().create_sql(
+            apps.get_model("timers", "Timer"), schema_editor
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    """
+    Partitions the timers table by month of scheduled_time, so the retention job can archive
+    and drop old months whole (see timers.partitions). The foreign keys referencing the timers
+    table lose their database constraint first: PostgreSQL only lets a foreign key reference
+    the full (id, scheduled_time) key of a partitioned table.
+    """
+
+    dependencies = [
+        ("timers", "0006_timer_outbox"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="deliveryattempt",
+            name="timer",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="delivery_attempts",
+                to="timers.timer",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="timeroutbox",
+            name="timer",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="outbox_entries",
+                to="timers.timer",
+            ),
+        ),
+        migrations.RunPython(partition_timers_table, unpartition_timers_table),
+    ]
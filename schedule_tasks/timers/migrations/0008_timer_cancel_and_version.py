@@ -0,0 +1,44 @@
+# Generated by Django 5.1.5 on 2026-10-17 03:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("timers", "0007_partition_timers"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="timer",
+            name="timer_next_attempt_idx",
+        ),
+        migrations.AddField(
+            model_name="timer",
+            name="is_cancelled",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name="timer",
+            name="version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="timeroutbox",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="timer",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_cancelled", False),
+                    ("is_dead_lettered", False),
+                    ("is_fired", False),
+                ),
+                fields=["next_attempt_at", "id"],
+                name="timer_next_attempt_idx",
+            ),
+        ),
+    ]
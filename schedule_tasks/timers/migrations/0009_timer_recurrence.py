@@ -0,0 +1,38 @@
+# Generated by Django 5.1.5 on 2026-10-17 03:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("timers", "0008_timer_cancel_and_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="timer",
+            name="cron",
+            field=models.CharField(blank=True, default="", max_length=100),
+        ),
+        migrations.AddField(
+            model_name="timer",
+            name="interval_seconds",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="timer",
+            name="max_occurrences",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="timer",
+            name="occurrences",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="timer",
+            name="repeat_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.5 on 2026-10-17 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("timers", "0009_timer_recurrence"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="timer",
+            name="client",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=64
+            ),
+        ),
+    ]
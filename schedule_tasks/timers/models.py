@@ -1,8 +1,65 @@
 # Create your models here.
 # timers/models.py
 import uuid
+from datetime import datetime, timedelta
+from typing import Optional
 
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from .ids import new_timer_id
+
+
+class TimerQuerySet(models.QuerySet):
+    """
+    QuerySet for Timer, providing the atomic claim step used before a webhook is fired.
+    """
+
+    def claimable(
+        self, current_time: datetime, lease_seconds: float
+    ) -> "TimerQuerySet":
+        """
+        Restricts the queryset to unfired, not dead-lettered, not cancelled timers that no worker
+        currently owns.
+
+        A claim older than lease_seconds is considered stale (the worker holding it died or
+        hung), so its timer can be claimed again.
+
+        Args:
+            current_time (datetime): The reference time for the lease check.
+            lease_seconds (float): How long a claim stays valid.
+
+        Returns:
+            TimerQuerySet: The filtered queryset.
+        """
+        return self.filter(
+            is_fired=False, is_dead_lettered=False, is_cancelled=False
+        ).filter(
+            Q(claimed_at__isnull=True)
+            | Q(claimed_at__lt=current_time - timedelta(seconds=lease_seconds))
+        )
+
+    def claim(self, lease_seconds: float) -> Optional[uuid.UUID]:
+        """
+        Atomically claims the claimable timers of this queryset for the calling worker.
+
+        The claim is a single conditional UPDATE, so when several workers (or the countdown task
+        and the sweeper) race for the same timer, the database lets exactly one of them win.
+        The claimed rows are the ones whose claim_token equals the returned token.
+
+        Args:
+            lease_seconds (float): How long the claim stays valid before it can be reclaimed.
+
+        Returns:
+            Optional[uuid.UUID]: The claim token, or None if no timer could be claimed.
+        """
+        current_time = timezone.now()
+        token = uuid.uuid4()
+        claimed = self.claimable(current_time, lease_seconds).update(
+            claimed_at=current_time, claim_token=token
+        )
+        return token if claimed else None
 
 
 class Timer(models.Model):
@@ -11,15 +68,93 @@ class Timer(models.Model):
 
     Attributes:
         id (UUID): The unique identifier of the timer (refers to the id attribute of the Timer instance).
+            Time-ordered (UUIDv7) by default, see TIMERS_ID_SCHEME.
         url (str): The URL to be called when the timer fires.
         scheduled_time (datetime): The time when the timer is scheduled to fire.
         is_fired (bool): Indicates whether the timer's webhook has been fired.
+        claimed_at (datetime): When a worker claimed the timer for delivery, None when unclaimed.
+        claim_token (UUID): Identifies the claim of the worker currently delivering the timer.
+        attempts (int): The number of failed or successful delivery attempts made so far.
+        next_attempt_at (datetime): When the next delivery attempt is due. Equal to scheduled_time
+            until a delivery fails, then pushed back with exponential backoff.
+        is_dead_lettered (bool): Indicates that delivery was given up after TIMERS_MAX_ATTEMPTS attempts.
+        is_cancelled (bool): Indicates that the timer was cancelled (DELETE /timer/<id>). The row is
+            kept as a tombstone until the retention job archives it.
+        version (int): Incremented every time the timer is rescheduled or cancelled. Countdown
+            messages carry the version they were published for, so fire_webhook ignores the
+            messages of a previous schedule without any broker-side revocation.
+        interval_seconds (int): Makes the timer recurring: it fires again every interval_seconds
+            after its first occurrence. None for a one-shot timer.
+        cron (str): Makes the timer recurring on a cron expression (see timers.recurrence),
+            empty for a one-shot timer. A timer has an interval or a cron expression, not both.
+        repeat_until (datetime): A recurring timer does not fire after this time. None for no limit.
+        max_occurrences (int): A recurring timer stops after this many deliveries. None for no limit.
+        occurrences (int): The number of occurrences delivered so far. A recurring timer keeps a
+            single row: each delivery moves scheduled_time to the next occurrence, and is_fired
+            is only set once the last occurrence was delivered.
+        client (str): Digest of the API client that created the timer (see
+            timers.admission.client_digest), whose completion stream receives its fire event.
     """
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(
+        primary_key=True, default=new_timer_id, editable=False
+    )
     url = models.URLField()
     scheduled_time = models.DateTimeField()
     is_fired = models.BooleanField(default=False)
+    claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    claim_token = models.UUIDField(null=True, blank=True, editable=False)
+    attempts = models.PositiveIntegerField(default=0, editable=False)
+    next_attempt_at = models.DateTimeField(editable=False)
+    is_dead_lettered = models.BooleanField(default=False, editable=False)
+    is_cancelled = models.BooleanField(default=False, editable=False)
+    version = models.PositiveIntegerField(default=0, editable=False)
+    interval_seconds = models.PositiveIntegerField(null=True, blank=True)
+    cron = models.CharField(max_length=100, blank=True, default="")
+    repeat_until = models.DateTimeField(null=True, blank=True)
+    max_occurrences = models.PositiveIntegerField(null=True, blank=True)
+    occurrences = models.PositiveIntegerField(default=0, editable=False)
+    client = models.CharField(
+        max_length=64, blank=True, default="", editable=False
+    )
+
+    objects = TimerQuerySet.as_manager()
+
+    class Meta:
+        """
+        Meta class defines the indexes of the timers table.
+        The partial index only covers timers that are still pending, so the expired-timer
+        sweep stays an index range scan however many fired timers accumulate.
+
+        On PostgreSQL the table is partitioned by month of scheduled_time (migration 0007,
+        timers.partitions), with a (id, scheduled_time) primary key: PostgreSQL requires the
+        partition key in every unique constraint. The ids are unique UUIDs all the same.
+        """
+
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at", "id"],
+                name="timer_next_attempt_idx",
+                condition=models.Q(
+                    is_fired=False, is_dead_lettered=False, is_cancelled=False
+                ),
+            ),
+        ]
+
+    def save(self, *args, **kwargs) -> None:
+        """
+        Saves the timer. The first delivery attempt of a new timer is due at its scheduled_time.
+        """
+        if self.next_attempt_at is None:
+            self.next_attempt_at = self.scheduled_time
+        super().save(*args, **kwargs)
+
+    @property
+    def is_recurring(self) -> bool:
+        """
+        Indicates whether the timer fires more than once (interval_seconds or cron).
+        """
+        return bool(self.interval_seconds or self.cron)
 
     def __str__(self) -> str:
         """
@@ -29,3 +164,73 @@ class Timer(models.Model):
         Example: " Assuming you have a Timer object with id=12345-67890 and is_fired=True, calling str(time_instance) will return Timer 12345-67890 - Fired: True"
         """
         return f"Timer_id {self.id} - Fired_status: {self.is_fired}"
+
+
+class DeliveryAttempt(models.Model):
+    """
+    DeliveryAttempt model recording one attempt to deliver the webhook of a timer.
+
+    Attributes:
+        timer (Timer): The timer whose webhook was delivered. Not enforced by a foreign key
+            constraint, which cannot reference the partitioned timers table.
+        attempt (int): The attempt number, starting at 1.
+        status_code (int): The HTTP status of the response, None if no response was received.
+        latency (float): The duration of the POST request, in seconds.
+        error (str): The error message of a failed attempt, empty on success.
+        created_at (datetime): When the attempt finished.
+    """
+
+    timer = models.ForeignKey(
+        Timer,
+        on_delete=models.CASCADE,
+        related_name="delivery_attempts",
+        db_constraint=False,
+    )
+    attempt = models.PositiveIntegerField()
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    latency = models.FloatField()
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the DeliveryAttempt instance.
+
+        Example: "Timer_id 12345-67890 - Attempt: 2 - Status: 503"
+        """
+        return f"Timer_id {self.timer_id} - Attempt: {self.attempt} - Status: {self.status_code}"
+
+
+class TimerOutbox(models.Model):
+    """
+    TimerOutbox model holding the timers still to be published to the broker.
+
+    With TIMERS_SCHEDULER = "outbox", an entry is inserted in the same transaction as its timer,
+    and the relay_outbox service publishes the entries in batches and deletes them. A timer is
+    therefore scheduled if and only if its insert commits, whatever happens to the web process
+    or the broker, and no request waits on the broker.
+
+    Attributes:
+        timer (Timer): The timer to schedule (no foreign key constraint, as for DeliveryAttempt).
+        due_at (datetime): When the timer is due, used to compute the countdown of the message.
+        version (int): The version of the timer the entry was written for, see Timer.version.
+        created_at (datetime): When the entry was written.
+    """
+
+    timer = models.ForeignKey(
+        Timer,
+        on_delete=models.CASCADE,
+        related_name="outbox_entries",
+        db_constraint=False,
+    )
+    due_at = models.DateTimeField()
+    version = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the TimerOutbox instance.
+
+        Example: "Outbox 42 - Timer_id 12345-67890"
+        """
+        return f"Outbox {self.id} - Timer_id {self.timer_id}"
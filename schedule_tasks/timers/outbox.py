@@ -0,0 +1,72 @@
+# timers/outbox.py
+# Relay publishing the transactional outbox (TimerOutbox) to the broker.
+import logging
+import time
+
+import redis
+from django.db import DatabaseError, close_old_connections, transaction
+from kombu.exceptions import OperationalError
+
+from .models import TimerOutbox
+from .scheduling import publish_timers
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """
+    Drains the TimerOutbox table into the broker in batches.
+
+    Each batch is locked with SELECT ... FOR UPDATE SKIP LOCKED, published over a single
+    producer and deleted in the same transaction, so several relays can run side by side. If
+    the publish fails the transaction rolls back and the entries are retried; if the process
+    dies after publishing but before committing, the entries are published again, which is
+    harmless because fire_webhook claims its timer before delivering.
+    """
+
+    def __init__(self, batch_size: int, poll_seconds: float) -> None:
+        """
+        Args:
+            batch_size (int): The maximum number of entries published per transaction.
+            poll_seconds (float): How long to wait when the outbox is drained, in seconds.
+        """
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+
+    def relay_batch(self) -> int:
+        """
+        Publishes and deletes one batch of outbox entries, oldest first.
+
+        Returns:
+            int: The number of entries relayed.
+        """
+        with transaction.atomic():
+            entries = list(
+                TimerOutbox.objects.select_for_update(skip_locked=True)
+                .order_by("id")
+                .values_list("id", "timer_id", "due_at", "version")[
+                    : self.batch_size
+                ]
+            )
+            if not entries:
+                return 0
+            publish_timers(entry[1:] for entry in entries)
+            TimerOutbox.objects.filter(
+                id__in=[entry[0] for entry in entries]
+            ).delete()
+        return len(entries)
+
+    def run(self) -> None:
+        """
+        Relays batches forever. Full batches are followed immediately by the next one. Database
+        and broker errors are logged and the batch is retried with fresh database connections.
+        """
+        while True:
+            try:
+                relayed = self.relay_batch()
+            except (DatabaseError, redis.RedisError, OperationalError) as e:
+                logger.error(f"Outbox relay failed: {e}, retrying.")
+                close_old_connections()
+                relayed = 0
+            if relayed < self.batch_size:
+                time.sleep(self.poll_seconds)
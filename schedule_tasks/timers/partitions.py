@@ -0,0 +1,403 @@
+# timers/partitions.py
+# Monthly partitions of the timers table, retention and archival of old timers.
+import gzip
+import itertools
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .models import DeliveryAttempt, Timer, TimerOutbox
+
+logger = logging.getLogger(__name__)
+
+TABLE = Timer._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+# A partition: name, lower bound (None for MINVALUE), upper bound (None for MAXVALUE)
+Partition = Tuple[str, Optional[datetime], Optional[datetime]]
+
+
+def month_start(value: datetime, months: int = 0) -> datetime:
+    """
+    Returns the start of the (UTC) month of value, shifted by months.
+
+    Args:
+        value (datetime): An aware datetime.
+        months (int): The number of months to add, may be negative.
+
+    Returns:
+        datetime: Midnight UTC on the first day of the month.
+    """
+    value = value.astimezone(dt_timezone.utc)
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(start: datetime) -> str:
+    """
+    Returns the name of the monthly partition starting at start, e.g. timers_timer_p2026_10.
+    """
+    return f"{TABLE}_p{start.year:04d}_{start.month:02d}"
+
+
+def is_partitioned() -> bool:
+    """
+    Returns True if the timers table is a partitioned table (PostgreSQL, after migration 0007).
+    """
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)",
+            [TABLE],
+        )
+        row = cursor.fetchone()
+    return row is not None and row[0] == "p"
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    value = value.strip()
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value.strip("'"))
+
+
+def parse_partition_bound(expression: str) -> Optional[Tuple]:
+    """
+    Parses a range partition bound, as returned by pg_get_expr(relpartbound).
+
+    Args:
+        expression (str): e.g. "FOR VALUES FROM ('2026-10-01 00:00:00+00') TO (MAXVALUE)".
+
+    Returns:
+        Optional[Tuple]: The (lower, upper) bounds, None standing for MINVALUE/MAXVALUE, or None
+        for the DEFAULT partition.
+    """
+    match = _BOUND_RE.search(expression)
+    if match is None:
+        return None
+    return _parse_bound(match.group(1)), _parse_bound(match.group(2))
+
+
+def list_partitions() -> List[Partition]:
+    """
+    Lists the range partitions of the timers table, oldest first. The DEFAULT partition is
+    not included.
+
+    Returns:
+        List[Partition]: The partitions.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [TABLE],
+        )
+        rows = cursor.fetchall()
+    partitions = []
+    for name, expression in rows:
+        bounds = parse_partition_bound(expression)
+        if bounds is not None:
+            partitions.append((name, *bounds))
+    epoch = datetime.min.replace(tzinfo=dt_timezone.utc)
+    return sorted(partitions, key=lambda p: p[1] or epoch)
+
+
+def create_partition(start: datetime) -> bool:
+    """
+    Creates the monthly partition starting at start, unless a partition already covers it.
+
+    Timers scheduled past the last partition land in the DEFAULT partition; the ones of the
+    new month are moved into the new partition in the same transaction, with the DEFAULT
+    partition detached meanwhile (PostgreSQL refuses to create a partition overlapping rows
+    of the DEFAULT partition).
+
+    Args:
+        start (datetime): The first day of the month, from month_start().
+
+    Returns:
+        bool: True if the partition was created.
+    """
+    end = month_start(start, 1)
+    for _, lower, upper in list_partitions():
+        if (lower is None or lower < end) and (upper is None or upper > start):
+            return False
+    name = partition_name(start)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"ALTER TABLE {TABLE} DETACH PARTITION {DEFAULT_PARTITION}"
+        )
+        cursor.execute(
+            f"CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE scheduled_time >= %s AND scheduled_time < %s RETURNING *) "
+            f"INSERT INTO {TABLE} SELECT * FROM moved",
+            [start, end],
+        )
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"
+        )
+    logger.info(f"Created partition {name} [{start}, {end}).")
+    return True
+
+
+def ensure_partitions(
+    months_ahead: int, current_time: Optional[datetime] = None
+) -> List[str]:
+    """
+    Creates the monthly partitions of the current month and the next months_ahead months.
+
+    Args:
+        months_ahead (int): The number of future months to create.
+        current_time (Optional[datetime]): The reference time, now by default.
+
+    Returns:
+        List[str]: The names of the partitions created.
+    """
+    current_time = current_time or timezone.now()
+    created = []
+    for months in range(months_ahead + 1):
+        start = month_start(current_time, months)
+        if create_partition(start):
+            created.append(partition_name(start))
+    return created
+
+
+def _timer_record(timer: dict, attempts: List[dict]) -> dict:
+    record = {
+        key: (value.isoformat() if isinstance(value, datetime) else value)
+        for key, value in timer.items()
+    }
+    record["id"] = str(record["id"])
+    if record.get("claim_token") is not None:
+        record["claim_token"] = str(record["claim_token"])
+    record["delivery_attempts"] = [
+        {
+            "attempt": a["attempt"],
+            "status_code": a["status_code"],
+            "latency": a["latency"],
+            "error": a["error"],
+            "created_at": a["created_at"].isoformat(),
+        }
+        for a in attempts
+    ]
+    return record
+
+
+def archive_timers(timers: QuerySet, path: str, chunk_size: int = 1000) -> int:
+    """
+    Writes timers and their delivery attempts to a gzip-compressed JSON Lines file, one timer
+    per line. The timers are streamed in chunks of chunk_size, and the file is written under
+    a temporary name and renamed once complete, so a crash never leaves a truncated archive.
+
+    Args:
+        timers (QuerySet): The timers to archive.
+        path (str): The path of the archive file.
+        chunk_size (int): The number of timers whose delivery attempts are read per query.
+
+    Returns:
+        int: The number of timers written.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    partial = f"{path}.partial"
+    written = 0
+    with gzip.open(partial, "wt", encoding="utf-8") as archive:
+        rows = timers.order_by("id").values().iterator(chunk_size=chunk_size)
+        while chunk := list(itertools.islice(rows, chunk_size)):
+            attempts: Dict = {}
+            for attempt in (
+                DeliveryAttempt.objects.filter(
+                    timer_id__in=[timer["id"] for timer in chunk]
+                )
+                .order_by("timer_id", "attempt")
+                .values()
+            ):
+                attempts.setdefault(attempt["timer_id"], []).append(attempt)
+            for timer in chunk:
+                record = _timer_record(timer, attempts.get(timer["id"], []))
+                archive.write(json.dumps(record) + "\n")
+            written += len(chunk)
+    os.replace(partial, path)
+    return written
+
+
+def _archive_path(label: str) -> str:
+    return os.path.join(
+        settings.TIMERS_ARCHIVE_DIR,
+        f"{label}-{time.strftime('%Y%m%dT%H%M%S')}.jsonl.gz",
+    )
+
+
+def _delete_timers(timer_ids: List) -> None:
+    # The deletion collector cascades to the delivery attempts and outbox entries with one
+    # DELETE each: the foreign keys have no database constraint (see migration 0007).
+    Timer.objects.filter(id__in=timer_ids).delete()
+
+
+def purge_finished_timers(
+    cutoff: datetime,
+    batch_size: int,
+    lower: Optional[datetime] = None,
+    label: str = "timers",
+) -> int:
+    """
+    Archives and deletes, in batches, the fired, dead-lettered and cancelled timers scheduled before
+    cutoff. Pending timers are never removed.
+
+    Args:
+        cutoff (datetime): Only timers scheduled strictly before this time are removed.
+        batch_size (int): The number of timers archived and deleted per transaction.
+        lower (Optional[datetime]): Only timers scheduled at or after this time are removed.
+        label (str): The prefix of the archive file names.
+
+    Returns:
+        int: The number of timers removed.
+    """
+    finished = Timer.objects.filter(scheduled_time__lt=cutoff).exclude(
+        is_fired=False, is_dead_lettered=False, is_cancelled=False
+    )
+    if lower is not None:
+        finished = finished.filter(scheduled_time__gte=lower)
+    removed = 0
+    batch = 0
+    while True:
+        with transaction.atomic():
+            timer_ids = list(
+                finished.order_by("scheduled_time", "id").values_list(
+                    "id", flat=True
+                )[:batch_size]
+            )
+            if not timer_ids:
+                break
+            batch += 1
+            archive_timers(
+                Timer.objects.filter(id__in=timer_ids),
+                _archive_path(f"{label}-{batch}"),
+            )
+            _delete_timers(timer_ids)
+        removed += len(timer_ids)
+    return removed
+
+
+def drop_partition(
+    name: str, lower: Optional[datetime], upper: datetime
+) -> int:
+    """
+    Archives every timer of a partition, then detaches and drops the partition: the rows go
+    away without a DELETE, any dead tuples or any index maintenance.
+
+    Args:
+        name (str): The partition name.
+        lower (Optional[datetime]): The lower bound of the partition, None for MINVALUE.
+        upper (datetime): The upper bound of the partition.
+
+    Returns:
+        int: The number of timers archived.
+    """
+    timers = Timer.objects.filter(scheduled_time__lt=upper)
+    if lower is not None:
+        timers = timers.filter(scheduled_time__gte=lower)
+    with transaction.atomic():
+        archived = archive_timers(timers, _archive_path(name))
+        timer_ids = timers.values("id")
+        DeliveryAttempt.objects.filter(timer_id__in=timer_ids).delete()
+        TimerOutbox.objects.filter(timer_id__in=timer_ids).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+            cursor.execute(f"DROP TABLE {name}")
+    logger.info(f"Dropped partition {name}, archived {archived} timer(s).")
+    return archived
+
+
+def apply_retention(
+    retention_days: int,
+    batch_size: int,
+    current_time: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """
+    Archives and removes the fired, dead-lettered and cancelled timers scheduled more than
+    retention_days ago.
+
+    On a partitioned table, a partition entirely older than the cutoff with no pending timer
+    is archived and dropped whole. The finished timers of the other old partitions (still
+    holding a pending timer) and of an unpartitioned table are archived and deleted row by row.
+
+    Args:
+        retention_days (int): The age after which finished timers are removed, in days.
+        batch_size (int): The number of timers deleted per transaction, row by row.
+        current_time (Optional[datetime]): The reference time, now by default.
+
+    Returns:
+        Dict[str, int]: The number of "partitions" dropped and of "timers" removed.
+    """
+    cutoff = (current_time or timezone.now()) - timedelta(days=retention_days)
+    if not is_partitioned():
+        return {
+            "partitions": 0,
+            "timers": purge_finished_timers(cutoff, batch_size),
+        }
+
+    result = {"partitions": 0, "timers": 0}
+    for name, lower, upper in list_partitions():
+        if lower is not None and lower >= cutoff:
+            break
+        if upper is not None and upper <= cutoff:
+            pending = Timer.objects.filter(
+                scheduled_time__lt=upper,
+                is_fired=False,
+                is_dead_lettered=False,
+                is_cancelled=False,
+            )
+            if lower is not None:
+                pending = pending.filter(scheduled_time__gte=lower)
+            if not pending.exists():
+                result["timers"] += drop_partition(name, lower, upper)
+                result["partitions"] += 1
+                continue
+        result["timers"] += purge_finished_timers(
+            min(cutoff, upper) if upper is not None else cutoff,
+            batch_size,
+            lower=lower,
+            label=name,
+        )
+    return result
+
+
+def maintain_partitions(
+    months_ahead: int, retention_days: int, batch_size: int
+) -> Dict[str, int]:
+    """
+    Runs the periodic maintenance of the timers table: creates the upcoming monthly partitions
+    (partitioned table only), then applies the retention policy.
+
+    Args:
+        months_ahead (int): The number of future monthly partitions kept created.
+        retention_days (int): The age after which finished timers are removed, in days.
+        batch_size (int): The number of timers deleted per transaction, row by row.
+
+    Returns:
+        Dict[str, int]: The number of partitions "created" and "dropped", and of "timers" removed.
+    """
+    created = ensure_partitions(months_ahead) if is_partitioned() else []
+    retention = apply_retention(retention_days, batch_size)
+    return {
+        "created": len(created),
+        "dropped": retention["partitions"],
+        "timers": retention["timers"],
+    }
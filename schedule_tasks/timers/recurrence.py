@@ -0,0 +1,121 @@
+# timers/recurrence.py
+# Next fire time of recurring timers (interval_seconds or cron).
+from datetime import datetime, time, timedelta, timezone
+from typing import Optional
+
+from celery.schedules import crontab
+from django.utils.timezone import get_default_timezone, localtime, make_aware
+
+from .models import Timer
+
+# How far ahead a cron expression is searched for its next match
+CRON_SEARCH_DAYS = 5 * 366
+
+
+def parse_cron(expression: str) -> crontab:
+    """
+    Parses a five-field cron expression ("minute hour day-of-month month day-of-week") with the
+    parser of Celery beat, so that the same expressions and semantics as CELERY_BEAT_SCHEDULE
+    apply (day-of-month and day-of-week must both match).
+
+    Args:
+        expression (str): The cron expression, e.g. "*/15 9-17 * * mon-fri".
+
+    Raises:
+        ValueError: If the expression is invalid.
+
+    Returns:
+        crontab: The parsed schedule.
+    """
+    fields = expression.split()
+    if len(fields) != 5:
+        raise ValueError(
+            "A cron expression has 5 fields: minute hour day-of-month month day-of-week."
+        )
+    minute, hour, day_of_month, month_of_year, day_of_week = fields
+    return crontab(
+        minute=minute,
+        hour=hour,
+        day_of_week=day_of_week,
+        day_of_month=day_of_month,
+        month_of_year=month_of_year,
+    )
+
+
+def next_cron_time(expression: str, after: datetime) -> datetime:
+    """
+    Returns the first time strictly after after that matches a cron expression, evaluated in
+    the TIME_ZONE of the project.
+
+    Args:
+        expression (str): The cron expression, see parse_cron().
+        after (datetime): The aware reference time.
+
+    Raises:
+        ValueError: If the expression is invalid or matches no time in the next five years
+            (e.g. "0 0 30 2 *").
+
+    Returns:
+        datetime: The next match, in UTC.
+    """
+    schedule = parse_cron(expression)
+    tz = get_default_timezone()
+    start = localtime(after, tz).replace(
+        second=0, microsecond=0, tzinfo=None
+    ) + timedelta(minutes=1)
+    hours = sorted(schedule.hour)
+    minutes = sorted(schedule.minute)
+    day = start.date()
+    for _ in range(CRON_SEARCH_DAYS):
+        # isoweekday() counts from Monday = 1, cron from Sunday = 0
+        if (
+            day.month in schedule.month_of_year
+            and day.day in schedule.day_of_month
+            and day.isoweekday() % 7 in schedule.day_of_week
+        ):
+            for hour in hours:
+                for minute in minutes:
+                    candidate = datetime.combine(day, time(hour, minute))
+                    if candidate >= start:
+                        return make_aware(candidate, tz).astimezone(
+                            timezone.utc
+                        )
+        day += timedelta(days=1)
+    raise ValueError(f"The cron expression {expression!r} never matches.")
+
+
+def next_occurrence(
+    timer: Timer, current_time: datetime
+) -> Optional[datetime]:
+    """
+    Returns when a recurring timer fires next, once its current occurrence was delivered.
+
+    Interval timers keep a fixed rate from their first occurrence (no drift from delivery
+    latency); occurrences missed while the timer was late are skipped rather than fired in a
+    burst, for interval and cron timers alike.
+
+    Args:
+        timer (Timer): The timer, with its recurrence fields and current scheduled_time.
+        current_time (datetime): The time of the delivery.
+
+    Returns:
+        Optional[datetime]: The next fire time, or None if the timer does not recur or the
+        delivered occurrence was its last one (max_occurrences or repeat_until reached).
+    """
+    if not timer.is_recurring:
+        return None
+    if (
+        timer.max_occurrences is not None
+        and timer.occurrences + 1 >= timer.max_occurrences
+    ):
+        return None
+    after = max(timer.scheduled_time, current_time)
+    if timer.interval_seconds:
+        interval = timedelta(seconds=timer.interval_seconds)
+        periods = (after - timer.scheduled_time) // interval + 1
+        next_time = timer.scheduled_time + periods * interval
+    else:
+        next_time = next_cron_time(timer.cron, after)
+    if timer.repeat_until is not None and next_time > timer.repeat_until:
+        return None
+    return next_time
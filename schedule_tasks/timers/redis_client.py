@@ -0,0 +1,33 @@
+# timers/redis_client.py
+# Shared Redis connection used by the timers app outside of the Celery broker.
+from functools import lru_cache
+
+import redis
+import redis.asyncio
+from django.conf import settings
+
+
+@lru_cache(maxsize=None)
+def get_redis() -> redis.Redis:
+    """
+    Returns the Redis client configured by TIMERS_REDIS_URL.
+
+    The client keeps its own connection pool, so it is created once per process and reused.
+
+    Returns:
+        redis.Redis: The Redis client.
+    """
+    return redis.Redis.from_url(settings.TIMERS_REDIS_URL)
+
+
+def get_async_redis() -> redis.asyncio.Redis:
+    """
+    Returns a new asyncio Redis client configured by TIMERS_REDIS_URL.
+
+    asyncio connections belong to the event loop they were opened on, so a new client is
+    created for every use; close it with aclose().
+
+    Returns:
+        redis.asyncio.Redis: The Redis client.
+    """
+    return redis.asyncio.Redis.from_url(settings.TIMERS_REDIS_URL)
@@ -0,0 +1,102 @@
+# timers/routers.py
+# Database router sending selected reads to the read replicas (TIMERS_READ_REPLICAS).
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from django.conf import settings
+
+T = TypeVar("T")
+
+# Set while the reads of the current request (or task) may be served by a replica
+_replica_reads: ContextVar[bool] = ContextVar(
+    "timers_replica_reads", default=False
+)
+
+
+@contextmanager
+def replica_reads() -> Iterator[None]:
+    """
+    Sends the ORM reads of the enclosed block to a read replica, when replicas are configured.
+    Writes always go to the primary ("default").
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def read_from_replica(query: Callable[[], T]) -> T:
+    """
+    Runs a read on a replica, and again on the primary if it found nothing: a timer created
+    moments ago may not have reached the replica yet (replication lag).
+
+    Args:
+        query (Callable[[], T]): The read, returning None or False when nothing is found.
+
+    Returns:
+        T: The result of the read.
+    """
+    if not settings.TIMERS_READ_REPLICAS:
+        return query()
+    with replica_reads():
+        result = query()
+    if result is None or result is False:
+        result = query()
+    return result
+
+
+async def aread_from_replica(query: Callable[[], Awaitable[T]]) -> T:
+    """
+    Asynchronous version of read_from_replica(), for the async ORM API.
+
+    Args:
+        query (Callable[[], Awaitable[T]]): The read, returning None or False when nothing is found.
+
+    Returns:
+        T: The result of the read.
+    """
+    if not settings.TIMERS_READ_REPLICAS:
+        return await query()
+    with replica_reads():
+        result = await query()
+    if result is None or result is False:
+        result = await query()
+    return result
+
+
+class ReadReplicaRouter:
+    """
+    Routes the reads made inside replica_reads() to one of the TIMERS_READ_REPLICAS aliases,
+    picked at random. Every other query goes to the primary, so code that reads its own
+    writes (claims, deliveries, the expired-timer sweep) is unaffected by replication lag.
+
+    Replicas are read-only copies of the primary: they are never migrated.
+    """
+
+    def db_for_read(self, model: Any, **hints: Any) -> Optional[str]:
+        replicas = settings.TIMERS_READ_REPLICAS
+        if replicas and _replica_reads.get():
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model: Any, **hints: Any) -> Optional[str]:
+        return "default"
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> bool:
+        # The primary and its replicas hold the same data
+        databases = {"default", *settings.TIMERS_READ_REPLICAS}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(
+        self,
+        db: str,
+        app_label: str,
+        model_name: Optional[str] = None,
+        **hints
+    ) -> Optional[bool]:
+        if db in settings.TIMERS_READ_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,353 @@
+# timers/scheduling.py
+# Hands newly created timers over to the Celery workers.
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.timezone import now
+
+from .dispatcher import notify_dispatcher
+from .events import publish_events
+from .models import Timer, TimerOutbox
+from .sweeper import wake_sweeper
+from .tasks import fire_webhook, iter_due_timer_keys
+from .timing import stage
+
+logger = logging.getLogger(__name__)
+
+# End of the window already promoted by promote_due_timers(), as a Unix timestamp
+PROMOTED_UNTIL_KEY = "timers:promotion:promoted_until"
+
+
+def schedule_timers(timers: Iterable[Timer]) -> None:
+    """
+    Schedules the webhook firing for a group of timers using Celery.
+
+    All messages are published over a single producer taken from the Celery
+    producer pool, so a batch of timers costs one broker connection checkout
+    instead of one per timer.
+
+    With TIMERS_SCHEDULER = "dispatcher", no message is published: the timers are
+    announced to the dispatch_timers service, which publishes them once they are due.
+    Otherwise only the timers due within TIMERS_PROMOTION_HORIZON_SECONDS are published, the
+    others are promoted later by promote_due_timers() (see near_timers()).
+    With TIMERS_SWEEPER = "loop", the sweeper is woken up if one of the timers is due before
+    its next sweep.
+
+    Args:
+        timers (Iterable[Timer]): The saved timers to schedule.
+
+    Returns:
+        None
+    """
+    timers = list(timers)
+    if not timers:
+        return
+
+    wake_sweeper(timers)
+    if settings.TIMERS_SCHEDULER == "dispatcher":
+        notify_dispatcher(timers)
+        return
+
+    publish_timers(
+        (timer.id, timer.next_attempt_at, timer.version)
+        for timer in near_timers(timers)
+    )
+
+
+def near_timers(timers: Iterable[Timer]) -> List[Timer]:
+    """
+    Returns the timers to hand to the broker when they are created: the ones due before the
+    window already promoted by promote_due_timers(), or, if promotion is not running, within
+    TIMERS_PROMOTION_HORIZON_SECONDS. The others are only persisted and promoted once they
+    enter the horizon, so the broker and the workers only hold near-term ETA messages.
+
+    A timer inserted while promote_due_timers() moves the window past it can be missed by
+    both; the expired-timer sweep fires it once due.
+
+    Args:
+        timers (Iterable[Timer]): The timers.
+
+    Returns:
+        List[Timer]: The timers to publish now, all of them when promotion is disabled.
+    """
+    timers = list(timers)
+    horizon = settings.TIMERS_PROMOTION_HORIZON_SECONDS
+    if not horizon or not timers:
+        return timers
+    current = now().timestamp()
+    limit = cache.get(PROMOTED_UNTIL_KEY)
+    if limit is None or limit <= current:
+        limit = current + horizon
+    return [
+        timer for timer in timers if timer.next_attempt_at.timestamp() < limit
+    ]
+
+
+def promote_due_timers(max_timers: int) -> int:
+    """
+    Publishes the pending timers that entered the promotion horizon since the previous run.
+
+    Reads the slice of the timer_next_attempt_idx index between the end of the previously
+    promoted window (kept in the cache) and now + TIMERS_PROMOTION_HORIZON_SECONDS, in keyset
+    pages, and publishes a countdown message for each timer over a single producer. The
+    messages carry no version: a timer rescheduled after its promotion is only claimed once due.
+
+    The first run (or the first run after the cache lost the window) promotes nothing and
+    starts the window at now + TIMERS_PROMOTION_HORIZON_SECONDS: the timers due before it were
+    published when they were created (see near_timers()), and any that were not are fired by
+    the expired-timer sweep once due.
+
+    Args:
+        max_timers (int): The maximum number of timers published per run. The next run resumes
+            where this one stopped.
+
+    Returns:
+        int: The number of timers published.
+    """
+    horizon = settings.TIMERS_PROMOTION_HORIZON_SECONDS
+    if not horizon or settings.TIMERS_SCHEDULER == "dispatcher":
+        return 0
+    current_time = now()
+    until = current_time + timedelta(seconds=horizon)
+    promoted_until = cache.get(PROMOTED_UNTIL_KEY)
+    if promoted_until is None:
+        cache.set(PROMOTED_UNTIL_KEY, until.timestamp(), timeout=None)
+        return 0
+    keys = list(
+        iter_due_timer_keys(
+            until,
+            page_size=settings.TIMERS_SWEEP_PAGE_SIZE,
+            limit=max_timers,
+            due_from=datetime.fromtimestamp(promoted_until, tz=timezone.utc),
+            current_time=current_time,
+        )
+    )
+    published = publish_timers(
+        (timer_id, due_at, None) for due_at, timer_id in keys
+    )
+    if len(keys) >= max_timers:
+        # Capped: resume from the last promoted due time
+        until = keys[-1][0]
+    cache.set(PROMOTED_UNTIL_KEY, until.timestamp(), timeout=None)
+    return published
+
+
+def publish_timers(
+    entries: Iterable[Tuple[UUID, datetime, Optional[int]]],
+) -> int:
+    """
+    Publishes one fire_webhook message per timer, with a countdown ending when the timer is due.
+    All messages go over a single producer taken from the Celery producer pool.
+
+    Each message carries the version of its timer, so that it becomes a no-op if the timer is
+    rescheduled or cancelled before it is delivered (see Timer.version).
+
+    Args:
+        entries (Iterable[Tuple[UUID, datetime, Optional[int]]]): (timer id, due time, version)
+            triples. A None version is not checked by fire_webhook.
+
+    Returns:
+        int: The number of messages published.
+    """
+    current_time = now()
+    published = 0
+    with fire_webhook.app.producer_or_acquire() as producer:
+        for timer_id, due_at, version in entries:
+            delay = max((due_at - current_time).total_seconds(), 0)
+            fire_webhook.apply_async(
+                (str(timer_id), version), countdown=delay, producer=producer
+            )
+            published += 1
+    logger.info(f"Scheduled {published} timer(s) with Celery.")
+    return published
+
+
+def create_timers(timers: List[Timer]) -> None:
+    """
+    Inserts new timers and schedules them.
+
+    With TIMERS_SCHEDULER = "outbox", the timers and their TimerOutbox entries are inserted in
+    one transaction and the relay_outbox service publishes them: the request does not wait on
+    the broker, and a timer is scheduled if and only if its insert commits. Otherwise the
+    timers are inserted, then handed to schedule_timers(). In both cases only the timers due
+    soon are handed over right away, see near_timers().
+
+    Args:
+        timers (List[Timer]): The unsaved timers, see TimerSerializer.build_timer().
+
+    Returns:
+        None
+    """
+    if settings.TIMERS_SCHEDULER == "outbox":
+        with stage("db"), transaction.atomic():
+            Timer.objects.bulk_create(timers)
+            TimerOutbox.objects.bulk_create(
+                TimerOutbox(
+                    timer_id=timer.id,
+                    due_at=timer.next_attempt_at,
+                    version=timer.version,
+                )
+                for timer in near_timers(timers)
+            )
+        wake_sweeper(timers)
+        return
+
+    with stage("db"):
+        Timer.objects.bulk_create(timers)
+    with stage("enqueue"):
+        schedule_timers(timers)
+
+
+async def aschedule_timers(timers: Iterable[Timer]) -> None:
+    """
+    Asynchronous version of schedule_timers(), for the async views.
+
+    Celery has no asyncio publishing API, so the publish runs in the default thread pool
+    executor. It does not touch the database, so it does not have to wait for the request's
+    database thread (thread_sensitive=False), and the event loop keeps serving other requests
+    in the meantime.
+
+    Args:
+        timers (Iterable[Timer]): The saved timers to schedule.
+
+    Returns:
+        None
+    """
+    await sync_to_async(schedule_timers, thread_sensitive=False)(list(timers))
+
+
+async def acreate_timers(timers: List[Timer]) -> None:
+    """
+    Asynchronous version of create_timers(), for the async views.
+
+    Args:
+        timers (List[Timer]): The unsaved timers.
+
+    Returns:
+        None
+    """
+    if settings.TIMERS_SCHEDULER == "outbox":
+        # Transactions are not available to async code
+        await sync_to_async(create_timers)(timers)
+        return
+
+    with stage("db"):
+        await Timer.objects.abulk_create(timers)
+    with stage("enqueue"):
+        await aschedule_timers(timers)
+
+
+class TimerNotPending(Exception):
+    """
+    Raised when a timer can no longer be cancelled or rescheduled: it has fired, it was
+    dead-lettered, or a worker is delivering it right now.
+    """
+
+
+def _lock_pending_timer(timer_id: UUID) -> Timer:
+    """
+    Locks a timer that may still be cancelled or rescheduled, inside a transaction.
+
+    Raises:
+        Timer.DoesNotExist: If the timer does not exist or was cancelled.
+        TimerNotPending: If the timer has fired, was dead-lettered or is being delivered.
+    """
+    timer = (
+        Timer.objects.select_for_update()
+        .filter(id=timer_id, is_cancelled=False)
+        .only(
+            "id",
+            "scheduled_time",
+            "is_fired",
+            "is_dead_lettered",
+            "claimed_at",
+            "version",
+            "client",
+        )
+        .first()
+    )
+    if timer is None:
+        raise Timer.DoesNotExist
+    if timer.is_fired or timer.is_dead_lettered:
+        raise TimerNotPending("Timer already fired.")
+    lease = timedelta(seconds=settings.TIMERS_CLAIM_LEASE_SECONDS)
+    if timer.claimed_at is not None and timer.claimed_at >= now() - lease:
+        raise TimerNotPending("Timer is being delivered.")
+    return timer
+
+
+def cancel_timer(timer_id: UUID) -> None:
+    """
+    Cancels a pending timer.
+
+    The row becomes a tombstone (is_cancelled, with a new version): no worker claims it anymore,
+    so the countdown message already in the broker turns into a no-op when it is delivered,
+    without revoking it (Celery revocation keeps an ever-growing revoked set in every worker).
+    The streams watching the timer get a "cancelled" event.
+
+    Args:
+        timer_id (UUID): The id of the timer.
+
+    Raises:
+        Timer.DoesNotExist: If the timer does not exist or is already cancelled.
+        TimerNotPending: If the timer has fired, was dead-lettered or is being delivered.
+
+    Returns:
+        None
+    """
+    with transaction.atomic():
+        timer = _lock_pending_timer(timer_id)
+        Timer.objects.filter(id=timer.id).update(
+            is_cancelled=True, version=timer.version + 1
+        )
+    publish_events([timer], "cancelled")
+    logger.info(f"Timer cancelled: {timer_id}")
+
+
+def reschedule_timer(timer_id: UUID, seconds: int) -> Timer:
+    """
+    Moves a pending timer to fire seconds from now.
+
+    The timer gets a new version and a new countdown message (or outbox entry, or dispatcher
+    announcement, see TIMERS_SCHEDULER); the message published for the previous schedule
+    claims nothing when it is delivered.
+
+    Args:
+        timer_id (UUID): The id of the timer.
+        seconds (int): The new duration of the timer, from now.
+
+    Raises:
+        Timer.DoesNotExist: If the timer does not exist or was cancelled.
+        TimerNotPending: If the timer has fired, was dead-lettered or is being delivered.
+
+    Returns:
+        Timer: The rescheduled timer (id, scheduled_time, is_fired, version).
+    """
+    with transaction.atomic():
+        timer = _lock_pending_timer(timer_id)
+        timer.scheduled_time = now() + timedelta(seconds=seconds)
+        timer.next_attempt_at = timer.scheduled_time
+        timer.version += 1
+        Timer.objects.filter(id=timer.id).update(
+            scheduled_time=timer.scheduled_time,
+            next_attempt_at=timer.next_attempt_at,
+            version=timer.version,
+        )
+        if settings.TIMERS_SCHEDULER == "outbox" and near_timers([timer]):
+            TimerOutbox.objects.create(
+                timer_id=timer.id,
+                due_at=timer.next_attempt_at,
+                version=timer.version,
+            )
+    if settings.TIMERS_SCHEDULER == "outbox":
+        wake_sweeper([timer])
+    else:
+        schedule_timers([timer])
+    logger.info(f"Timer rescheduled: {timer_id}, version: {timer.version}")
+    return timer
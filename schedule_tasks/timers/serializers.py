@@ -2,9 +2,47 @@
 # Serializer for Validations, This will handle user input validation, including invalid inputs.
 from datetime import datetime, timedelta, timezone
 
+from django.conf import settings
 from rest_framework import serializers
 
+from .ids import fire_time_uuid
 from .models import Timer
+from .recurrence import next_cron_time, parse_cron
+
+
+def build_timer(validated_data: dict) -> Timer:
+    """
+    Calculates the total delay in seconds and sets the scheduled_time based on the current time plus the delay.
+    timezone.utc ensures the current time is in the UTC (Coordinated Universal Time) timezone, which is a standardized time reference that avoids timezone-related issues.
+    timedelta represents the duration to be added to the current time, The timedelta class from the datetime module, creates a duration object representing the total number of seconds calculated from the input hours, minutes, and seconds.
+
+    The returned instance is not saved, so callers can insert many of them with a single bulk_create.
+
+    Args:
+        validated_data (dict): The validated data containing hours, minutes, and seconds.
+
+    Returns:
+        Timer: The unsaved Timer instance.
+    """
+    validated_data = dict(validated_data)
+    total_seconds = (
+        validated_data.pop("hours") * 3600
+        + validated_data.pop("minutes") * 60
+        + validated_data.pop("seconds")
+    )
+    validated_data["scheduled_time"] = datetime.now(timezone.utc) + timedelta(
+        seconds=total_seconds
+    )
+    if validated_data.get("cron"):
+        # The first occurrence is the first match of the expression after the duration
+        validated_data["scheduled_time"] = next_cron_time(
+            validated_data["cron"], validated_data["scheduled_time"]
+        )
+    validated_data["next_attempt_at"] = validated_data["scheduled_time"]
+    if settings.TIMERS_ID_SCHEME == "fire_time":
+        # The id embeds the fire time, see timers.ids.fire_time_from_id
+        validated_data["id"] = fire_time_uuid(validated_data["scheduled_time"])
+    return Timer(**validated_data)
 
 
 class TimerSerializer(serializers.ModelSerializer):
@@ -15,6 +53,11 @@ class TimerSerializer(serializers.ModelSerializer):
         hours (int): Number of hours for the timer (write-only).
         minutes (int): Number of minutes for the timer (write-only).
         seconds (int): Number of seconds for the timer (write-only).
+        interval_seconds (int): Optional, makes the timer fire again every interval_seconds.
+        cron (str): Optional, makes the timer fire again on a cron expression. The first
+            occurrence is the first match after the duration.
+        repeat_until (datetime): Optional end time of a recurring timer.
+        max_occurrences (int): Optional number of deliveries of a recurring timer.
     """
 
     hours = serializers.IntegerField(
@@ -26,6 +69,12 @@ class TimerSerializer(serializers.ModelSerializer):
     seconds = serializers.IntegerField(
         write_only=True, min_value=0, required=True
     )
+    interval_seconds = serializers.IntegerField(
+        min_value=1, max_value=2**31 - 1, required=False, allow_null=True
+    )
+    max_occurrences = serializers.IntegerField(
+        min_value=1, max_value=2**31 - 1, required=False, allow_null=True
+    )
 
     class Meta:
         """
@@ -42,19 +91,48 @@ class TimerSerializer(serializers.ModelSerializer):
             "hours",
             "minutes",
             "seconds",
+            "interval_seconds",
+            "cron",
+            "repeat_until",
+            "max_occurrences",
         ]
         # Following Fucntionality  changes ensure that scheduled_time is calculated internally and isn't required in the input JSON.
         read_only_fields = ["id", "scheduled_time", "is_fired"]
 
+    def validate_cron(self, value: str) -> str:
+        """
+        Ensures that the cron expression is valid and matches at least once.
+
+        Args:
+            value (str): The cron expression.
+
+        Raises:
+            serializers.ValidationError: If the expression is invalid or never matches.
+
+        Returns:
+            str: The expression, with its fields separated by single spaces.
+        """
+        if not value:
+            return value
+        try:
+            parse_cron(value)
+            next_cron_time(value, datetime.now(timezone.utc))
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return " ".join(value.split())
+
     def validate(self, data: dict) -> dict:
         """
-        Ensures that the timer duration cannot be zero.
+        Ensures that the timer duration cannot be zero, and that the recurrence fields are
+        consistent: an interval or a cron expression, not both, and end conditions only on a
+        recurring timer.
 
         Args:
             data (dict): The validated data containing hours, minutes, and seconds.
 
         Raises:
-            serializers.ValidationError: If the timer duration is zero.
+            serializers.ValidationError: If the timer duration is zero or the recurrence fields
+                are inconsistent.
 
         Returns:
             dict: The validated data.
@@ -66,13 +144,35 @@ class TimerSerializer(serializers.ModelSerializer):
             and data["seconds"] == 0
         ):
             raise serializers.ValidationError("Timer duration cannot be zero.")
+        recurring = bool(data.get("interval_seconds") or data.get("cron"))
+        if data.get("interval_seconds") and data.get("cron"):
+            raise serializers.ValidationError(
+                "A timer recurs on an interval or a cron expression, not both."
+            )
+        if not recurring and (
+            data.get("repeat_until") is not None
+            or data.get("max_occurrences") is not None
+        ):
+            raise serializers.ValidationError(
+                "repeat_until and max_occurrences require interval_seconds or cron."
+            )
         return data
 
+    def build_timer(self, validated_data: dict) -> Timer:
+        """
+        Builds the unsaved Timer instance from the validated data, see build_timer().
+
+        Args:
+            validated_data (dict): The validated data containing hours, minutes, and seconds.
+
+        Returns:
+            Timer: The unsaved Timer instance.
+        """
+        return build_timer(validated_data)
+
     def create(self, validated_data: dict) -> Timer:
         """
-        Calculates the total delay in seconds and sets the scheduled_time based on the current time plus the delay.
-        timezone.utc ensures the current time is in the UTC (Coordinated Universal Time) timezone, which is a standardized time reference that avoids timezone-related issues.
-        timedelta represents the duration to be added to the current time, The timedelta class from the datetime module, creates a duration object representing the total number of seconds calculated from the input hours, minutes, and seconds.
+        Builds the Timer instance from the validated data and saves it.
 
         Args:
             validated_data (dict): The validated data containing hours, minutes, and seconds.
@@ -80,12 +180,50 @@ class TimerSerializer(serializers.ModelSerializer):
         Returns:
             Timer: The created Timer instance.
         """
-        total_seconds = (
-            validated_data.pop("hours") * 3600
-            + validated_data.pop("minutes") * 60
-            + validated_data.pop("seconds")
-        )
-        validated_data["scheduled_time"] = datetime.now(
-            timezone.utc
-        ) + timedelta(seconds=total_seconds)
-        return Timer.objects.create(**validated_data)
+        timer = self.build_timer(validated_data)
+        timer.save(force_insert=True)
+        return timer
+
+
+class TimerDurationSerializer(serializers.Serializer):
+    """
+    Serializer for the new duration of a rescheduled timer (PATCH /timer/{timer_uuid}), with
+    the same validation as the duration fields of TimerSerializer.
+
+    Serializer Fields:
+        hours (int): Number of hours from now.
+        minutes (int): Number of minutes from now.
+        seconds (int): Number of seconds from now.
+    """
+
+    hours = serializers.IntegerField(min_value=0, required=True)
+    minutes = serializers.IntegerField(min_value=0, required=True)
+    seconds = serializers.IntegerField(min_value=0, required=True)
+
+    def validate(self, data: dict) -> dict:
+        """
+        Ensures that the timer duration cannot be zero.
+
+        Args:
+            data (dict): The validated data containing hours, minutes, and seconds.
+
+        Raises:
+            serializers.ValidationError: If the timer duration is zero.
+
+        Returns:
+            dict: The validated data.
+        """
+        if (
+            data["hours"] == 0
+            and data["minutes"] == 0
+            and data["seconds"] == 0
+        ):
+            raise serializers.ValidationError("Timer duration cannot be zero.")
+        return data
+
+    def total_seconds(self) -> int:
+        """
+        Returns the validated duration in seconds.
+        """
+        data = self.validated_data
+        return data["hours"] * 3600 + data["minutes"] * 60 + data["seconds"]
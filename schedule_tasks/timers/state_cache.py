@@ -0,0 +1,296 @@
+# timers/state_cache.py
+# Read-through cache of the (scheduled_time, is_fired) state of timers.
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .ids import fire_time_from_id
+from .models import Timer
+from .routers import aread_from_replica, read_from_replica, replica_reads
+from .timing import stage
+
+HITS_KEY = "timers:state_cache:hits"
+MISSES_KEY = "timers:state_cache:misses"
+
+TimerState = Tuple[datetime, bool]
+
+
+def _state_key(timer_id: UUID) -> str:
+    return f"timers:state:{timer_id}"
+
+
+def cache_timer_state(
+    timer_id: UUID, scheduled_time: datetime, is_fired: bool
+) -> None:
+    """
+    Stores the state of a timer in the cache for TIMERS_STATE_CACHE_TTL seconds.
+
+    Args:
+        timer_id (UUID): The id of the timer.
+        scheduled_time (datetime): The time when the timer is scheduled to fire.
+        is_fired (bool): Indicates whether the timer's webhook has been fired.
+
+    Returns:
+        None
+    """
+    cache.set(
+        _state_key(timer_id),
+        (scheduled_time.timestamp(), is_fired),
+        timeout=settings.TIMERS_STATE_CACHE_TTL,
+    )
+
+
+def evict_timer_state(timer_id: UUID) -> None:
+    """
+    Removes the state of a timer from the cache, e.g. once it is cancelled.
+
+    Args:
+        timer_id (UUID): The id of the timer.
+
+    Returns:
+        None
+    """
+    cache.delete(_state_key(timer_id))
+
+
+def cache_timer_states(timers: Iterable[Timer]) -> None:
+    """
+    Stores the state of many timers in the cache with a single round trip.
+
+    Args:
+        timers (Iterable[Timer]): The timers.
+
+    Returns:
+        None
+    """
+    states = {
+        _state_key(timer.id): (
+            timer.scheduled_time.timestamp(),
+            timer.is_fired,
+        )
+        for timer in timers
+    }
+    if states:
+        cache.set_many(states, timeout=settings.TIMERS_STATE_CACHE_TTL)
+
+
+def get_timer_state(timer_id: UUID) -> Optional[TimerState]:
+    """
+    Returns the state of a timer, from the cache if possible, otherwise from the database.
+
+    A state read from the database is put in the cache, so steady-state polling of a timer
+    never reaches the database. Database reads go to a read replica when TIMERS_READ_REPLICAS
+    is set, falling back to the primary for timers not replicated yet. For ids embedding the
+    fire time (TIMERS_ID_SCHEME = "fire_time") a cache miss only costs an existence check.
+    Cache hits and misses are counted, see get_cache_stats().
+
+    Args:
+        timer_id (UUID): The id of the timer.
+
+    Returns:
+        Optional[TimerState]: The (scheduled_time, is_fired) state, or None if the timer does not exist
+        or was cancelled.
+    """
+    with stage("cache"):
+        state = cache.get(_state_key(timer_id))
+        if state is not None:
+            _count(HITS_KEY)
+            timestamp, is_fired = state
+            return (
+                datetime.fromtimestamp(timestamp, tz=timezone.utc),
+                is_fired,
+            )
+        _count(MISSES_KEY)
+
+    fire_time = fire_time_from_id(timer_id)
+    if fire_time is not None:
+        # The id embeds the fire time, so only the existence of the timer has to be checked.
+        # is_fired is not read: a timer only fires once due, so its time_left is 0 whether or
+        # not it has fired. A rescheduled or cancelled timer (version > 0) no longer fires at
+        # the time of its id, its row is read below.
+        with stage("db"):
+            if read_from_replica(
+                Timer.objects.filter(id=timer_id, version=0).exists
+            ):
+                return fire_time, False
+
+    with stage("db"):
+        row = read_from_replica(
+            Timer.objects.filter(id=timer_id, is_cancelled=False)
+            .values_list("scheduled_time", "is_fired")
+            .first
+        )
+    if row is None:
+        return None
+    with stage("cache"):
+        cache_timer_state(timer_id, *row)
+    return row
+
+
+def _read_timer_states(timer_ids: List[UUID]) -> Dict[UUID, TimerState]:
+    return {
+        timer_id: (scheduled_time, is_fired)
+        for timer_id, scheduled_time, is_fired in Timer.objects.filter(
+            id__in=timer_ids, is_cancelled=False
+        ).values_list("id", "scheduled_time", "is_fired")
+    }
+
+
+def get_timer_states(timer_ids: Iterable[UUID]) -> Dict[UUID, TimerState]:
+    """
+    Returns the states of many timers with one cache round trip, plus one id__in query for the
+    cache misses (and one more on the primary for the timers a replica did not have yet). The
+    states read from the database are put in the cache with one more round trip.
+
+    Args:
+        timer_ids (Iterable[UUID]): The ids of the timers.
+
+    Returns:
+        Dict[UUID, TimerState]: The (scheduled_time, is_fired) state of every timer found;
+        unknown and cancelled timers are left out.
+    """
+    timer_ids = list(dict.fromkeys(timer_ids))
+    if not timer_ids:
+        return {}
+    with stage("cache"):
+        cached = cache.get_many(
+            [_state_key(timer_id) for timer_id in timer_ids]
+        )
+    states: Dict[UUID, TimerState] = {}
+    missing = []
+    for timer_id in timer_ids:
+        state = cached.get(_state_key(timer_id))
+        if state is None:
+            missing.append(timer_id)
+            continue
+        timestamp, is_fired = state
+        states[timer_id] = (
+            datetime.fromtimestamp(timestamp, tz=timezone.utc),
+            is_fired,
+        )
+    if states:
+        _count(HITS_KEY, len(states))
+    if not missing:
+        return states
+    _count(MISSES_KEY, len(missing))
+
+    rows: Dict[UUID, TimerState] = {}
+    with stage("db"):
+        if settings.TIMERS_READ_REPLICAS:
+            with replica_reads():
+                rows = _read_timer_states(missing)
+        lagging = [timer_id for timer_id in missing if timer_id not in rows]
+        if lagging:
+            rows.update(_read_timer_states(lagging))
+    if rows:
+        with stage("cache"):
+            cache.set_many(
+                {
+                    _state_key(timer_id): (
+                        scheduled_time.timestamp(),
+                        is_fired,
+                    )
+                    for timer_id, (scheduled_time, is_fired) in rows.items()
+                },
+                timeout=settings.TIMERS_STATE_CACHE_TTL,
+            )
+    states.update(rows)
+    return states
+
+
+async def acache_timer_state(
+    timer_id: UUID, scheduled_time: datetime, is_fired: bool
+) -> None:
+    """
+    Asynchronous version of cache_timer_state(), for the async views.
+
+    Args:
+        timer_id (UUID): The id of the timer.
+        scheduled_time (datetime): The time when the timer is scheduled to fire.
+        is_fired (bool): Indicates whether the timer's webhook has been fired.
+
+    Returns:
+        None
+    """
+    await cache.aset(
+        _state_key(timer_id),
+        (scheduled_time.timestamp(), is_fired),
+        timeout=settings.TIMERS_STATE_CACHE_TTL,
+    )
+
+
+async def aget_timer_state(timer_id: UUID) -> Optional[TimerState]:
+    """
+    Asynchronous version of get_timer_state(), using the async cache and ORM APIs.
+
+    Args:
+        timer_id (UUID): The id of the timer.
+
+    Returns:
+        Optional[TimerState]: The (scheduled_time, is_fired) state, or None if the timer does not exist.
+    """
+    with stage("cache"):
+        state = await cache.aget(_state_key(timer_id))
+        if state is not None:
+            await _acount(HITS_KEY)
+            timestamp, is_fired = state
+            return (
+                datetime.fromtimestamp(timestamp, tz=timezone.utc),
+                is_fired,
+            )
+        await _acount(MISSES_KEY)
+
+    fire_time = fire_time_from_id(timer_id)
+    if fire_time is not None:
+        with stage("db"):
+            if await aread_from_replica(
+                Timer.objects.filter(id=timer_id, version=0).aexists
+            ):
+                return fire_time, False
+
+    with stage("db"):
+        row = await aread_from_replica(
+            Timer.objects.filter(id=timer_id, is_cancelled=False)
+            .values_list("scheduled_time", "is_fired")
+            .afirst
+        )
+    if row is None:
+        return None
+    with stage("cache"):
+        await acache_timer_state(timer_id, *row)
+    return row
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """
+    Returns the number of cache hits and misses counted by get_timer_state() and
+    get_timer_states().
+
+    Returns:
+        Dict[str, int]: {"hits": ..., "misses": ...}
+    """
+    counts = cache.get_many([HITS_KEY, MISSES_KEY])
+    return {
+        "hits": counts.get(HITS_KEY, 0),
+        "misses": counts.get(MISSES_KEY, 0),
+    }
+
+
+def _count(key: str, delta: int = 1) -> None:
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # First count: create the counter, unless another process just did
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+async def _acount(key: str) -> None:
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        if not await cache.aadd(key, 1, timeout=None):
+            await cache.aincr(key)
@@ -0,0 +1,163 @@
+# timers/sweeper.py
+# Event-driven expired-timer sweep: sleeps until the next timer is due instead of polling.
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+import redis
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+
+from .models import Timer
+from .redis_client import get_redis
+from .tasks import sweep_due_timers
+
+logger = logging.getLogger(__name__)
+
+# Redis list pushed to wake the sweeper up early
+WAKE_KEY = "timers:sweeper:wake"
+# When the sweeper plans to wake up next, as a Unix timestamp ("inf" while it is sweeping)
+NEXT_WAKE_KEY = "timers:sweeper:next_wake"
+
+
+def wake_sweeper(timers: Iterable[Timer]) -> None:
+    """
+    Wakes the sweeper up if one of the timers is due before it planned to wake up.
+
+    Costs one Redis GET per call, plus one push when the sweeper has to re-plan. Nothing is
+    pushed when no sweeper is running (TIMERS_SWEEPER = "beat", or its planned wake-up key
+    expired).
+
+    Args:
+        timers (Iterable[Timer]): The new or rescheduled timers.
+
+    Returns:
+        None
+    """
+    if settings.TIMERS_SWEEPER != "loop":
+        return
+    earliest = min((timer.next_attempt_at for timer in timers), default=None)
+    if earliest is None:
+        return
+    redis = get_redis()
+    next_wake = redis.get(NEXT_WAKE_KEY)
+    if next_wake is not None and earliest.timestamp() < float(next_wake):
+        # A single pending wake-up is enough
+        redis.pipeline().rpush(WAKE_KEY, 1).ltrim(WAKE_KEY, 0, 0).execute()
+
+
+class TimerSweeper:
+    """
+    Sweeps the due timers, then sleeps exactly until the next pending timer is due.
+
+    Replaces the every-minute check_expired_timers beat task (TIMERS_SWEEPER = "loop"): a timer
+    whose countdown message was lost fires within TIMERS_SWEEPER_GRACE_SECONDS of its due time
+    instead of up to a minute late, and an idle service makes one indexed query per
+    TIMERS_SWEEPER_MAX_SLEEP_SECONDS. The API wakes the sweeper up through Redis when a timer
+    due sooner than the planned wake-up is created (see wake_sweeper()).
+
+    The timers due within the last grace_seconds are left to their countdown messages, so the
+    sweep only picks up the timers that were actually missed.
+    """
+
+    def __init__(self, max_sleep_seconds: float, grace_seconds: float) -> None:
+        """
+        Args:
+            max_sleep_seconds (float): The longest sleep, which bounds the lateness of retries
+                and of timers whose wake-up notification was lost.
+            grace_seconds (float): How long a due timer is left to its countdown message.
+        """
+        self.max_sleep_seconds = max_sleep_seconds
+        self.grace_seconds = grace_seconds
+
+    def next_due(self, after: datetime) -> Optional[datetime]:
+        """
+        Returns when the earliest pending, unclaimed timer due at or after after is due, with
+        one query served by the timer_next_attempt_idx index.
+
+        Args:
+            after (datetime): The timers due before this time were just swept.
+
+        Returns:
+            Optional[datetime]: The due time, or None if no timer is pending.
+        """
+        return (
+            Timer.objects.claimable(
+                timezone.now(), settings.TIMERS_CLAIM_LEASE_SECONDS
+            )
+            .filter(next_attempt_at__gte=after)
+            .order_by("next_attempt_at")
+            .values_list("next_attempt_at", flat=True)
+            .first()
+        )
+
+    def sweep(self) -> float:
+        """
+        Enqueues the timers that are due, and plans the next sweep.
+
+        Returns:
+            float: How long to sleep before the next sweep, in seconds.
+        """
+        current_time = timezone.now()
+        due_before = current_time - timedelta(seconds=self.grace_seconds)
+        enqueued = sweep_due_timers(due_before)
+        if enqueued:
+            logger.info(f"Sweeper enqueued {enqueued} expired timer(s).")
+        if enqueued >= settings.TIMERS_SWEEP_MAX_PER_RUN:
+            # More timers are due: give the workers a moment to claim this run's
+            return self.grace_seconds
+        next_due = self.next_due(due_before)
+        if next_due is None:
+            return self.max_sleep_seconds
+        wake_at = next_due + timedelta(seconds=self.grace_seconds)
+        return min(
+            max((wake_at - current_time).total_seconds(), 0),
+            self.max_sleep_seconds,
+        )
+
+    def wait(self, seconds: float) -> bool:
+        """
+        Sleeps for seconds, or until wake_sweeper() is called for a timer due sooner.
+
+        Args:
+            seconds (float): The planned sleep, in seconds.
+
+        Returns:
+            bool: True if the sleep was interrupted by a wake-up.
+        """
+        if seconds <= 0:
+            return False
+        redis = get_redis()
+        redis.set(
+            NEXT_WAKE_KEY,
+            time.time() + seconds,
+            ex=int(seconds + self.max_sleep_seconds) + 1,
+        )
+        woken = redis.blpop([WAKE_KEY], timeout=seconds) is not None
+        redis.delete(WAKE_KEY)
+        return woken
+
+    def run(self) -> None:
+        """
+        Runs the sweep loop until interrupted. Database and Redis errors are logged and the
+        iteration is retried after a second, with fresh database connections.
+
+        Returns:
+            None
+        """
+        while True:
+            try:
+                # While sweeping and planning, every new timer wakes the next sleep up: it may
+                # be due before the wake-up time being computed.
+                get_redis().set(
+                    NEXT_WAKE_KEY, "inf", ex=int(self.max_sleep_seconds) + 1
+                )
+                self.wait(self.sweep())
+            except (DatabaseError, redis.RedisError) as e:
+                # A database or Redis outage must not stop the sweeper: with
+                # TIMERS_SWEEPER = "loop" nothing else fires the missed timers.
+                logger.error(f"Sweep failed: {e}, retrying.")
+                close_old_connections()
+                time.sleep(min(1.0, self.max_sleep_seconds))
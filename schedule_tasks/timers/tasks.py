@@ -2,63 +2,617 @@
 from __future__ import absolute_import, unicode_literals
 
 import logging
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-import requests
 from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
 from django.utils import timezone
 
-from .models import Timer
+from .delivery import deliver_webhooks
+from .events import publish_events, publish_fired
+from .lanes import HostLanes
+from .metrics import (FIRE_LATENESS, FIRE_OUTCOMES, SWEEP_ENQUEUED,
+                      SWEEP_FOUND, WEBHOOK_DURATION, status_class)
+from .models import DeliveryAttempt, Timer, TimerQuerySet
+from .partitions import maintain_partitions
+from .recurrence import next_occurrence
+from .state_cache import cache_timer_state, cache_timer_states
 
 logger = logging.getLogger(__name__)
 
+# Loaded with the timers of a batch, for next_occurrence()
+RECURRING_TIMER_FIELDS = (
+    "interval_seconds",
+    "cron",
+    "repeat_until",
+    "max_occurrences",
+    "occurrences",
+)
+
+
+def compute_retry_delay(attempts: int) -> float:
+    """
+    Computes the delay before retrying a timer whose delivery failed attempts times.
+
+    The delay doubles with every attempt, starting at TIMERS_RETRY_BASE_SECONDS and capped at
+    TIMERS_RETRY_MAX_SECONDS, and is jittered between half and all of that value so that timers
+    that failed together do not retry together.
+
+    Args:
+        attempts (int): The number of attempts made so far (at least 1).
+
+    Returns:
+        float: The delay in seconds.
+    """
+    delay = min(
+        settings.TIMERS_RETRY_BASE_SECONDS * 2 ** min(attempts - 1, 32),
+        settings.TIMERS_RETRY_MAX_SECONDS,
+    )
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def due_or_first_attempt(current_time: datetime) -> Q:
+    """
+    Condition under which a claim may deliver a timer: its next attempt is due, or it is the
+    first attempt of its original schedule. The first attempt is let through even if it looks
+    slightly early, so that the countdown message of a new timer is never rejected because of
+    clock skew between the web and worker hosts; a rescheduled or retried timer has to be due.
+
+    Args:
+        current_time (datetime): The reference time.
+
+    Returns:
+        Q: The condition.
+    """
+    return Q(attempts=0, version=0) | Q(next_attempt_at__lte=current_time)
+
 
 # The shared_task decorator makes the function available as a Celery task
 @shared_task
-def fire_webhook(timer_id: str) -> None:
+def fire_webhook(timer_id: str, version: Optional[int] = None) -> None:
     """
     Fire the webhook for a given timer.
 
-    Retrieves the Timer object with the given timer_id and ensures it hasn't been fired (is_fired=False).
-    Sends a POST request to the specified URL with the timer ID in the payload (data in JSON format).
-    After sending the POST request, the Timer object is updated to mark it as "fired" and saved back to the database.
-    i.e Marks the timer as fired (is_fired=True) and saves the changes.
-    catching the Timer.DoesNotExist exception is to ensure that  function doesn't crash if the timer ID doesn't correspond to an existing timer
-    Handles the case where the Timer object does not exist (by using the try and except block.)
+    Claims the Timer object with the given timer_id before doing anything else. The claim is an
+    atomic conditional UPDATE that only succeeds if the timer hasn't been fired (is_fired=False)
+    and no other worker holds a live claim on it, so the countdown task, the expired-timer sweep
+    and the worker replicas can never deliver the same webhook twice.
+    Sends a POST request to the specified URL with the timer ID in the payload (data in JSON format),
+    through the pooled delivery engine (keep-alive connections, connect/read timeouts).
+    After sending the POST request, the claimed timer is marked as "fired" (is_fired=True) and the claim is cleared.
+    Every attempt is recorded as a DeliveryAttempt. If the POST request fails, the claim is released
+    and the next attempt is scheduled with exponential backoff (see compute_retry_delay), until
+    TIMERS_MAX_ATTEMPTS attempts have failed and the timer is dead-lettered.
+    Deliveries go through the lane of the destination host (see timers.lanes): when the host has
+    too many deliveries in flight or its circuit breaker is open, the timer is parked (its claim
+    is released without sending anything) so a failing host cannot starve the healthy ones.
+    A claim that is never finalized (e.g. the worker died) expires after TIMERS_CLAIM_LEASE_SECONDS.
+    Once fired, the timer's completion event is published to its subscribers (see
+    timers.events).
+    Cancelled timers are never claimed, and a message published for an older version of the
+    timer (before it was rescheduled or cancelled) claims nothing: stale countdown messages are
+    no-ops, checked by the claim UPDATE itself.
+    A recurring timer (interval_seconds or cron) is not marked as fired until its last
+    occurrence: each delivery advances the same row to the next occurrence, see
+    advance_recurring_timers().
 
     Args:
         timer_id (str): The unique identifier of the timer to be fired.
+        version (Optional[int]): The version of the timer the message was published for. Messages
+            without a version (dispatcher) only claim a rescheduled timer once it is due.
 
     Raises:
-        Timer.DoesNotExist: If the timer with the given ID does not exist or has already been fired.
-        requests.RequestException: If the POST request to the URL fails.
+        Timer.DoesNotExist: If the timer with the given ID does not exist, has already been fired or is claimed by another worker.
 
     Returns:
         None
     """
     logger.info(f"Attempting to fire webhook for timer ID: {timer_id}")
     try:
-        timer = Timer.objects.get(id=timer_id, is_fired=False)
-        logger.info(f"Timer found: {timer.id}, URL: {timer.url}")
+        # A retry is only claimable once its backoff has elapsed
+        timers = Timer.objects.filter(id=timer_id)
+        if version is None:
+            timers = timers.filter(due_or_first_attempt(timezone.now()))
+        else:
+            timers = timers.filter(version=version).filter(
+                Q(attempts=0) | Q(next_attempt_at__lte=timezone.now())
+            )
+        token = timers.claim(settings.TIMERS_CLAIM_LEASE_SECONDS)
+        if token is None:
+            raise Timer.DoesNotExist
+        timer = Timer.objects.get(id=timer_id, claim_token=token)
+        logger.info(f"Timer claimed: {timer.id}, URL: {timer.url}")
+    except Timer.DoesNotExist:
+        logger.error(
+            f"Timer with ID {timer_id} does not exist, is already fired, cancelled, rescheduled or is claimed by another worker."
+        )
+        return
 
-        # Sends a POST request to the specified URL with the timer.id in the payload as a JSON object
-        response = requests.post(timer.url, json={"id": str(timer.id)})
-        response.raise_for_status()
-        logger.info(
-            f"Webhook triggered successfully for timer ID: {timer.id}, Response status: {response.status_code}"
+    # Take a slot in the lane of the destination host, unless its circuit is open
+    lanes = HostLanes.from_settings()
+    host = lanes.host_of(timer.url)
+    decision = lanes.acquire(host)
+    owned = Timer.objects.filter(id=timer.id, claim_token=token)
+    if not decision.allowed:
+        logger.warning(
+            f"Delivery lane of {host} is unavailable, timer ID: {timer_id} parked for {decision.retry_after:.0f}s."
         )
+        owned.update(
+            next_attempt_at=timezone.now()
+            + timedelta(seconds=decision.retry_after),
+            claimed_at=None,
+            claim_token=None,
+        )
+        FIRE_OUTCOMES.inc(outcome="parked")
+        return
 
-        # Mark the timer as fired and save changes
-        timer.is_fired = True
-        timer.save()
-        logger.info(f"Timer marked as fired: {timer.id}")
-    except Timer.DoesNotExist:
+    # Sends a POST request to the specified URL with the timer.id in the payload as a JSON object
+    (result,) = deliver_webhooks([(str(timer.id), timer.url)])
+    lanes.release(
+        host,
+        healthy=result.host_healthy,
+        probe=decision.probe,
+        slot=decision.slot,
+    )
+    WEBHOOK_DURATION.observe(
+        result.latency, status_class=status_class(result.status_code)
+    )
+
+    attempt = timer.attempts + 1
+    DeliveryAttempt.objects.create(
+        timer_id=timer.id,
+        attempt=attempt,
+        status_code=result.status_code,
+        latency=result.latency,
+        error=result.error,
+    )
+    if result.ok:
+        logger.info(
+            f"Webhook triggered successfully for timer ID: {timer.id}, Response status: {result.status_code}"
+        )
+        next_time = next_occurrence(timer, timezone.now())
+        if next_time is not None:
+            if advance_recurring_timers(owned, {timer: next_time}):
+                FIRE_OUTCOMES.inc(outcome="fired")
+                logger.info(
+                    f"Timer advanced to its next occurrence: {timer.id}, at {next_time}"
+                )
+            else:
+                logger.warning(
+                    f"Timer {timer.id} lost its claim before it was advanced."
+                )
+        # Mark the timer as fired and clear the claim, only if the claim is still ours
+        elif owned.update(
+            is_fired=True,
+            attempts=attempt,
+            occurrences=F("occurrences") + 1,
+            claimed_at=None,
+            claim_token=None,
+        ):
+            cache_timer_state(timer.id, timer.scheduled_time, True)
+            publish_fired([timer])
+            FIRE_LATENESS.observe(
+                max(
+                    (timezone.now() - timer.scheduled_time).total_seconds(),
+                    0,
+                )
+            )
+            FIRE_OUTCOMES.inc(outcome="fired")
+            logger.info(f"Timer marked as fired: {timer.id}")
+        else:
+            logger.warning(
+                f"Timer {timer.id} lost its claim before it was marked as fired."
+            )
+    elif attempt >= settings.TIMERS_MAX_ATTEMPTS:
         logger.error(
-            f"Timer with ID {timer_id} does not exist or is already fired."
+            f"Failed to trigger webhook for timer ID: {timer_id}. Error: {result.error}. "
+            f"Giving up after {attempt} attempts, timer dead-lettered."
         )
-    except requests.RequestException as e:
+        if owned.update(
+            is_dead_lettered=True,
+            attempts=attempt,
+            claimed_at=None,
+            claim_token=None,
+        ):
+            publish_events([timer], "dead_lettered")
+            FIRE_OUTCOMES.inc(outcome="dead_lettered")
+    else:
+        delay = compute_retry_delay(attempt)
         logger.error(
-            f"Failed to trigger webhook for timer ID: {timer_id}. Error: {e}"
+            f"Failed to trigger webhook for timer ID: {timer_id}. Error: {result.error}. "
+            f"Attempt {attempt}, retrying in {delay:.0f}s."
         )
+        # Release the claim and push the next attempt back
+        owned.update(
+            attempts=attempt,
+            next_attempt_at=timezone.now() + timedelta(seconds=delay),
+            claimed_at=None,
+            claim_token=None,
+        )
+        FIRE_OUTCOMES.inc(outcome="retried")
+
+
+@shared_task
+def fire_webhooks_batch(timer_ids: List[str]) -> None:
+    """
+    Fire the webhooks of a chunk of due timers together.
+
+    Same semantics as fire_webhook, with a constant number of queries per chunk instead of per
+    timer: the chunk is claimed with one conditional UPDATE and loaded with one query, the
+    webhooks are delivered concurrently by the pooled delivery engine, the attempts are
+    inserted with one bulk INSERT, and the delivered timers are marked as fired with a single
+    UPDATE ... WHERE id IN (...) that only writes the fired flag, the attempt count and the
+    claim. Failed timers are retried (one UPDATE setting each backoff) or dead-lettered, and
+    delivered recurring timers are advanced to their next occurrence (one UPDATE).
+
+    Args:
+        timer_ids (List[str]): The ids of the timers to fire.
+
+    Returns:
+        None
+    """
+    token = (
+        Timer.objects.filter(id__in=timer_ids)
+        .filter(due_or_first_attempt(timezone.now()))
+        .claim(settings.TIMERS_CLAIM_LEASE_SECONDS)
+    )
+    if token is None:
+        logger.info(
+            f"None of the {len(timer_ids)} timer(s) could be claimed, skipping batch."
+        )
+        return
+    timers = list(
+        Timer.objects.filter(claim_token=token).only(
+            "id",
+            "url",
+            "scheduled_time",
+            "attempts",
+            "version",
+            "client",
+            *RECURRING_TIMER_FIELDS,
+        )
+    )
+    owned = Timer.objects.filter(claim_token=token)
+
+    # Take a slot in the lane of every destination host, park the timers of unavailable lanes
+    lanes = HostLanes.from_settings()
+    deliverable = []
+    decisions = {}
+    parked: Dict[float, List[uuid.UUID]] = {}
+    for timer in timers:
+        host = lanes.host_of(timer.url)
+        decision = lanes.acquire(host)
+        if decision.allowed:
+            deliverable.append(timer)
+            decisions[timer.id] = (host, decision)
+        else:
+            parked.setdefault(decision.retry_after, []).append(timer.id)
+    current_time = timezone.now()
+    for retry_after, parked_ids in parked.items():
+        owned.filter(id__in=parked_ids).update(
+            next_attempt_at=current_time + timedelta(seconds=retry_after),
+            claimed_at=None,
+            claim_token=None,
+        )
+        FIRE_OUTCOMES.inc(len(parked_ids), outcome="parked")
+    if parked:
+        logger.warning(
+            f"Parked {sum(map(len, parked.values()))} timer(s) of unavailable delivery lanes."
+        )
+    if not deliverable:
+        return
+
+    results = deliver_webhooks(
+        [(str(timer.id), timer.url) for timer in deliverable]
+    )
+
+    attempts = []
+    fired = []
+    recurring = {}
+    dead_lettered = []
+    retries = {}
+    for timer, result in zip(deliverable, results):
+        host, decision = decisions[timer.id]
+        lanes.release(
+            host,
+            healthy=result.host_healthy,
+            probe=decision.probe,
+            slot=decision.slot,
+        )
+        WEBHOOK_DURATION.observe(
+            result.latency, status_class=status_class(result.status_code)
+        )
+        attempt = timer.attempts + 1
+        attempts.append(
+            DeliveryAttempt(
+                timer_id=timer.id,
+                attempt=attempt,
+                status_code=result.status_code,
+                latency=result.latency,
+                error=result.error,
+            )
+        )
+        if result.ok:
+            next_time = next_occurrence(timer, timezone.now())
+            if next_time is not None:
+                recurring[timer] = next_time
+            else:
+                fired.append(timer)
+        elif attempt >= settings.TIMERS_MAX_ATTEMPTS:
+            dead_lettered.append(timer)
+        else:
+            retries[timer.id] = timezone.now() + timedelta(
+                seconds=compute_retry_delay(attempt)
+            )
+    DeliveryAttempt.objects.bulk_create(attempts)
+
+    marked = advanced = 0
+    if fired:
+        with transaction.atomic():
+            marked_ids = lock_owned_timers(
+                owned, [timer.id for timer in fired]
+            )
+            marked = owned.filter(id__in=marked_ids).update(
+                is_fired=True,
+                attempts=F("attempts") + 1,
+                occurrences=F("occurrences") + 1,
+                claimed_at=None,
+                claim_token=None,
+            )
+        # A timer whose claim expired and was taken over is left to its new owner
+        fired = [timer for timer in fired if timer.id in marked_ids]
+        current_time = timezone.now()
+        for timer in fired:
+            timer.is_fired = True
+            FIRE_LATENESS.observe(
+                max((current_time - timer.scheduled_time).total_seconds(), 0)
+            )
+        cache_timer_states(fired)
+        publish_fired(fired)
+    if recurring:
+        advanced = advance_recurring_timers(owned, recurring)
+    if marked + advanced:
+        FIRE_OUTCOMES.inc(marked + advanced, outcome="fired")
+    if dead_lettered:
+        with transaction.atomic():
+            locked_ids = lock_owned_timers(
+                owned, [timer.id for timer in dead_lettered]
+            )
+            owned.filter(id__in=locked_ids).update(
+                is_dead_lettered=True,
+                attempts=F("attempts") + 1,
+                claimed_at=None,
+                claim_token=None,
+            )
+        dead_lettered = [
+            timer for timer in dead_lettered if timer.id in locked_ids
+        ]
+        publish_events(dead_lettered, "dead_lettered")
+        if dead_lettered:
+            FIRE_OUTCOMES.inc(len(dead_lettered), outcome="dead_lettered")
+    if retries:
+        owned.filter(id__in=list(retries)).update(
+            attempts=F("attempts") + 1,
+            next_attempt_at=Case(
+                *(
+                    When(id=timer_id, then=Value(next_attempt_at))
+                    for timer_id, next_attempt_at in retries.items()
+                )
+            ),
+            claimed_at=None,
+            claim_token=None,
+        )
+        FIRE_OUTCOMES.inc(len(retries), outcome="retried")
+    logger.info(
+        f"Batch of {len(timer_ids)} timer(s): {marked} fired, {advanced} advanced, "
+        f"{len(retries)} retried, {len(dead_lettered)} dead-lettered."
+    )
+
+
+def lock_owned_timers(
+    owned: TimerQuerySet, ids: Iterable[uuid.UUID]
+) -> Set[uuid.UUID]:
+    """
+    Locks the timers among ids that are still claimed by the caller, until the end of the
+    current transaction.
+
+    A claim can expire during a long delivery and be taken over by another worker; the row
+    locks keep that from happening between this SELECT and the UPDATE finalizing the timers,
+    so the caller knows exactly which timers its UPDATE changed.
+
+    Args:
+        owned (TimerQuerySet): The timers claimed by the caller.
+        ids (Iterable[uuid.UUID]): The ids of the timers to finalize.
+
+    Returns:
+        Set[uuid.UUID]: The ids of the timers still claimed by the caller.
+    """
+    return set(
+        owned.filter(id__in=list(ids))
+        .select_for_update()
+        .values_list("id", flat=True)
+    )
+
+
+def advance_recurring_timers(
+    owned: TimerQuerySet, next_times: Dict[Timer, datetime]
+) -> int:
+    """
+    Moves delivered recurring timers to their next occurrence, in place.
+
+    One UPDATE sets the new scheduled_time and next_attempt_at of every timer, resets its
+    attempt count, counts the delivered occurrence, bumps the version and releases the claim,
+    so a recurring timer costs one row whatever its number of occurrences. The next
+    occurrence is then scheduled like a rescheduled timer (see
+    timers.scheduling.schedule_timers), and its message carries the new version. Timers whose
+    claim was taken over by another worker are left alone.
+
+    Args:
+        owned (TimerQuerySet): The timers still claimed by the caller.
+        next_times (Dict[Timer, datetime]): The next fire time of each delivered timer.
+
+    Returns:
+        int: The number of timers advanced, 0 if the caller no longer owns them.
+    """
+    # timers.scheduling imports this module
+    from .scheduling import schedule_timers
+
+    with transaction.atomic():
+        ids = lock_owned_timers(owned, (timer.id for timer in next_times))
+        next_times = {
+            timer: next_time
+            for timer, next_time in next_times.items()
+            if timer.id in ids
+        }
+        if not next_times:
+            return 0
+        cases = [
+            When(id=timer.id, then=Value(next_time))
+            for timer, next_time in next_times.items()
+        ]
+        updated = owned.filter(id__in=ids).update(
+            scheduled_time=Case(*cases),
+            next_attempt_at=Case(*cases),
+            attempts=0,
+            occurrences=F("occurrences") + 1,
+            version=F("version") + 1,
+            claimed_at=None,
+            claim_token=None,
+        )
+    current_time = timezone.now()
+    for timer, next_time in next_times.items():
+        FIRE_LATENESS.observe(
+            max((current_time - timer.scheduled_time).total_seconds(), 0)
+        )
+        timer.scheduled_time = timer.next_attempt_at = next_time
+        timer.is_fired = False
+        timer.attempts = 0
+        timer.occurrences += 1
+        timer.version += 1
+    cache_timer_states(next_times)
+    schedule_timers(next_times)
+    logger.info(
+        f"Advanced {updated} recurring timer(s) to their next occurrence."
+    )
+    return updated
+
+
+def iter_due_timer_keys(
+    due_before: datetime,
+    page_size: int,
+    limit: int,
+    due_from: Optional[datetime] = None,
+    current_time: Optional[datetime] = None,
+) -> Iterator[Tuple[datetime, uuid.UUID]]:
+    """
+    Walks the (next_attempt_at, id) keys of the pending, unclaimed timers due before due_before.
+
+    The timers are read in keyset pages ordered by (next_attempt_at, id), which is served by the
+    timer_next_attempt_idx partial index. Each page only fetches the two indexed columns and
+    resumes after the last row of the previous page, so at most page_size rows are held in
+    memory at once and no page needs an OFFSET scan.
+
+    Args:
+        due_before (datetime): Only timers due strictly before this time are returned.
+        page_size (int): The number of rows fetched per query.
+        limit (int): The maximum number of keys returned in total.
+        due_from (Optional[datetime]): If given, only timers due at or after this time are returned.
+        current_time (Optional[datetime]): The reference time of the claim lease check, now if
+            not given. due_before may be in the future (promotion horizon, dispatcher wheel), a
+            claim is stale relative to the current time.
+
+    Returns:
+        Iterator[Tuple[datetime, uuid.UUID]]: The keys of the due timers, oldest first.
+    """
+    if current_time is None:
+        current_time = timezone.now()
+    returned = 0
+    last_key = None
+    while returned < limit:
+        queryset = Timer.objects.claimable(
+            current_time, settings.TIMERS_CLAIM_LEASE_SECONDS
+        ).filter(next_attempt_at__lt=due_before)
+        if due_from is not None:
+            queryset = queryset.filter(next_attempt_at__gte=due_from)
+        if last_key is not None:
+            last_time, last_id = last_key
+            queryset = queryset.filter(
+                Q(next_attempt_at__gt=last_time)
+                | Q(next_attempt_at=last_time, id__gt=last_id)
+            )
+        size = min(page_size, limit - returned)
+        page = queryset.order_by("next_attempt_at", "id").values_list(
+            "next_attempt_at", "id"
+        )[:size]
+
+        rows = 0
+        for last_key in page.iterator(chunk_size=size):
+            rows += 1
+            yield last_key
+        returned += rows
+        if rows < size:
+            break
+
+
+def iter_due_timer_ids(
+    due_before: datetime, page_size: int, limit: int
+) -> Iterator[uuid.UUID]:
+    """
+    Walks the ids of the pending, unclaimed timers due before due_before, oldest first.
+
+    Args:
+        due_before (datetime): Only timers due strictly before this time are returned.
+        page_size (int): The number of rows fetched per query.
+        limit (int): The maximum number of ids returned in total.
+
+    Returns:
+        Iterator[uuid.UUID]: The ids of the due timers.
+    """
+    for _, timer_id in iter_due_timer_keys(due_before, page_size, limit):
+        yield timer_id
+
+
+def sweep_due_timers(due_before: datetime) -> int:
+    """
+    Enqueues the pending, unclaimed timers due before due_before.
+
+    Walks the due timers in keyset pages of TIMERS_SWEEP_PAGE_SIZE rows, at most
+    TIMERS_SWEEP_MAX_PER_RUN timers per call, and hands them to the fire_webhooks_batch task in
+    chunks of TIMERS_SWEEP_BATCH_SIZE timers. Timers beyond the cap are left to the next call.
+    The numbers of timers found and enqueued are recorded in the timers_sweep_* metrics.
+
+    Args:
+        due_before (datetime): Only timers due strictly before this time are enqueued.
+
+    Returns:
+        int: The number of timers enqueued.
+    """
+    found = enqueued = 0
+    chunk: List[str] = []
+    try:
+        for timer_id in iter_due_timer_ids(
+            due_before,
+            page_size=settings.TIMERS_SWEEP_PAGE_SIZE,
+            limit=settings.TIMERS_SWEEP_MAX_PER_RUN,
+        ):
+            found += 1
+            chunk.append(str(timer_id))
+            if len(chunk) >= settings.TIMERS_SWEEP_BATCH_SIZE:
+                fire_webhooks_batch.delay(chunk)
+                enqueued += len(chunk)
+                chunk = []
+        if chunk:
+            fire_webhooks_batch.delay(chunk)
+            enqueued += len(chunk)
+    finally:
+        SWEEP_FOUND.observe(found)
+        SWEEP_ENQUEUED.observe(enqueued)
+    return enqueued
 
 
 @shared_task
@@ -66,22 +620,55 @@ def check_expired_timers() -> None:
     """
     Check for and handle expired timers.
 
-    Retrieves all Timer objects that have not been fired and are past their scheduled time.
-    Fires the webhook for each expired timer by calling the fire_webhook task.
-
-    Raises:
-        Timer.DoesNotExist: If no expired timers are found.
+    Fires the webhooks of the Timer objects that have not been fired and whose next attempt is
+    due, see sweep_due_timers(). Does nothing with TIMERS_SWEEPER = "loop": the sweep_timers
+    service sweeps as soon as timers are due instead of every minute.
 
     Returns:
         None
     """
+    if settings.TIMERS_SWEEPER == "loop":
+        return
     logger.info("## Executing check_expired_timers task.")
-    expired_timers = Timer.objects.filter(
-        is_fired=False, scheduled_time__lt=timezone.now()
+    enqueued = sweep_due_timers(timezone.now())
+    logger.info(
+        f"** Completed check_expired_timers task, enqueued {enqueued} expired timer(s)."
     )
 
-    logger.info(f"++ Expired_timers list:{expired_timers}")
-    for timer in expired_timers:
-        logger.info(f" ** timer value in expired_timers_list:{timer}")
-        fire_webhook.delay(timer.id)
-    logger.info("** Completed check_expired_timers task.")
+
+@shared_task
+def promote_timers() -> None:
+    """
+    Publishes the timers that entered the promotion horizon (TIMERS_PROMOTION_HORIZON_SECONDS),
+    at most TIMERS_PROMOTION_MAX_PER_RUN per run, see timers.scheduling.promote_due_timers.
+
+    Returns:
+        None
+    """
+    # timers.scheduling imports this module
+    from .scheduling import promote_due_timers
+
+    promoted = promote_due_timers(settings.TIMERS_PROMOTION_MAX_PER_RUN)
+    if promoted:
+        logger.info(f"** Promoted {promoted} timer(s) entering the horizon.")
+
+
+@shared_task
+def maintain_timer_partitions() -> None:
+    """
+    Nightly maintenance of the timers table (see timers.partitions.maintain_partitions):
+    creates the next TIMERS_PARTITION_MONTHS_AHEAD monthly partitions, then archives and
+    removes the finished timers older than TIMERS_RETENTION_DAYS.
+
+    Returns:
+        None
+    """
+    result = maintain_partitions(
+        months_ahead=settings.TIMERS_PARTITION_MONTHS_AHEAD,
+        retention_days=settings.TIMERS_RETENTION_DAYS,
+        batch_size=settings.TIMERS_RETENTION_BATCH_SIZE,
+    )
+    logger.info(
+        f"** Completed maintain_timer_partitions task: {result['created']} partition(s) "
+        f"created, {result['dropped']} dropped, {result['timers']} timer(s) archived."
+    )
@@ -1,16 +1,58 @@
 # Create your tests here.
 # timers/tests.py
+import asyncio
+import gzip
+import json
+import os
+import tempfile
 import time
-from datetime import timedelta
-from unittest.mock import patch
+import uuid
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
+import redis
+from django.core.cache import cache
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import DatabaseError
 from django.http import HttpResponseNotFound
-from django.test import TestCase
+from django.test import (AsyncRequestFactory, Client, TestCase,
+                         override_settings)
 from django.utils.timezone import now
+from kombu.exceptions import OperationalError
 from rest_framework.test import APIClient
 
-from .models import Timer
+from . import async_views
+from .admission import client_digest
+from .benchmark import WebhookReceiver, percentiles
+from .delivery import DeliveryResult, WebhookDeliveryEngine
+from .dispatcher import TimerDispatcher
+from .fastpath import TimerPayload
+from .ids import fire_time_from_id, fire_time_uuid, uuid7
+from .lanes import ACQUIRE_SCRIPT, RELEASE_SCRIPT, HostLanes, LaneDecision
+from .metrics import FIRE_OUTCOMES, flush_metrics
+from .models import DeliveryAttempt, Timer, TimerOutbox
+from .outbox import OutboxRelay
+from .partitions import (apply_retention, month_start, parse_partition_bound,
+                         partition_name)
+from .recurrence import next_cron_time
+from .routers import ReadReplicaRouter, replica_reads
+from .scheduling import cancel_timer, promote_due_timers
+from .serializers import TimerSerializer
+from .state_cache import get_cache_stats, get_timer_state
+from .sweeper import TimerSweeper, wake_sweeper
+from .tasks import (check_expired_timers, compute_retry_delay, fire_webhook,
+                    fire_webhooks_batch)
+from .wheel import HierarchicalTimingWheel
+
+# Delivery lanes that always grant a slot, so that the delivery tests do not share lane state
+# (failures, open circuits) through Redis
+open_lanes = patch.multiple(
+    "timers.tasks.HostLanes",
+    acquire=MagicMock(return_value=LaneDecision(True)),
+    release=MagicMock(),
+)
 
 
 class TimerTests(TestCase):
@@ -152,3 +194,2596 @@ class TimerTests(TestCase):
         response = self.client.get(f"/timer/{timer.id}")
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data["time_left"], 0)
+
+
+class TimerBatchTests(TestCase):
+    """
+    Test case for the batch timer creation endpoint.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the test client for API requests.
+        """
+        self.client = APIClient()
+
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    def test_create_timers_batch(self, mock_apply_async) -> None:
+        """
+        Tests that a batch of timers is created with one result per item.
+
+        Sends a POST request with two valid items and one invalid item.
+        Asserts that the valid timers are saved and scheduled, and that the invalid
+        item gets its validation errors in place.
+        """
+        response = self.client.post(
+            "/timers/batch",
+            [
+                {
+                    "hours": 0,
+                    "minutes": 1,
+                    "seconds": 0,
+                    "url": "https://example.com",
+                },
+                {
+                    "hours": -1,
+                    "minutes": 1,
+                    "seconds": 0,
+                    "url": "https://example.com",
+                },
+                {
+                    "hours": 0,
+                    "minutes": 0,
+                    "seconds": 30,
+                    "url": "https://example.com/hook",
+                },
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        results = response.data["results"]
+        self.assertEqual(len(results), 3)
+        self.assertTrue(results[0]["time_left"] >= 59)
+        self.assertIn("hours", results[1]["errors"])
+        self.assertTrue(results[2]["time_left"] >= 29)
+        self.assertEqual(Timer.objects.count(), 2)
+        self.assertEqual(mock_apply_async.call_count, 2)
+
+    def test_create_timers_batch_rejects_non_list(self) -> None:
+        """
+        Tests that a batch request whose body is not a list results in a 400 response.
+        """
+        response = self.client.post(
+            "/timers/batch",
+            {"hours": 0, "minutes": 1, "seconds": 0, "url": "https://a.io"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.data)
+
+
+class ExpiredTimerSweepTests(TestCase):
+    """
+    Test case for the keyset-paginated expired-timer sweep.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates five due timers, one fired timer and one timer in the future.
+        """
+        self.due_timers = [
+            Timer.objects.create(
+                url="https://example.com",
+                scheduled_time=now() - timedelta(minutes=10 - index),
+            )
+            for index in range(5)
+        ]
+        Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() - timedelta(minutes=30),
+            is_fired=True,
+        )
+        Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() + timedelta(minutes=10),
+        )
+
+    @override_settings(TIMERS_SWEEP_PAGE_SIZE=2)
+    @patch("timers.tasks.fire_webhooks_batch.delay")
+    def test_sweep_walks_all_pages(self, mock_delay) -> None:
+        """
+        Tests that the sweep enqueues every due, unfired timer across several pages, oldest first.
+        """
+        check_expired_timers()
+        enqueued = [
+            timer_id
+            for call in mock_delay.call_args_list
+            for timer_id in call.args[0]
+        ]
+        self.assertEqual(
+            enqueued, [str(timer.id) for timer in self.due_timers]
+        )
+
+    @override_settings(TIMERS_SWEEP_PAGE_SIZE=2, TIMERS_SWEEP_MAX_PER_RUN=3)
+    @patch("timers.tasks.fire_webhooks_batch.delay")
+    def test_sweep_respects_per_run_cap(self, mock_delay) -> None:
+        """
+        Tests that a single sweep never enqueues more than TIMERS_SWEEP_MAX_PER_RUN timers.
+        """
+        check_expired_timers()
+        enqueued = [
+            timer_id
+            for call in mock_delay.call_args_list
+            for timer_id in call.args[0]
+        ]
+        self.assertEqual(
+            enqueued, [str(timer.id) for timer in self.due_timers[:3]]
+        )
+
+    @override_settings(TIMERS_SWEEP_BATCH_SIZE=2)
+    @patch("timers.tasks.fire_webhooks_batch.delay")
+    def test_sweep_enqueues_chunks(self, mock_delay) -> None:
+        """
+        Tests that the sweep hands the due timers to fire_webhooks_batch in chunks.
+        """
+        check_expired_timers()
+        chunks = [call.args[0] for call in mock_delay.call_args_list]
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+
+
+@open_lanes
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+)
+class FireWebhookClaimTests(TestCase):
+    """
+    Test case for the atomic claim taken by fire_webhook before delivering a webhook.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a due timer.
+        """
+        cache.clear()
+        self.timer = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() - timedelta(seconds=1),
+        )
+
+    @patch("timers.tasks.deliver_webhooks")
+    def test_fire_webhook_delivers_once(self, mock_deliver) -> None:
+        """
+        Tests that firing the same timer twice only sends one webhook.
+        """
+        mock_deliver.return_value = [
+            DeliveryResult(str(self.timer.id), 200, 0.01)
+        ]
+        fire_webhook(str(self.timer.id))
+        fire_webhook(str(self.timer.id))
+        self.assertEqual(mock_deliver.call_count, 1)
+        self.timer.refresh_from_db()
+        self.assertTrue(self.timer.is_fired)
+        self.assertIsNone(self.timer.claimed_at)
+
+    @patch("timers.tasks.deliver_webhooks")
+    def test_fire_webhook_skips_live_claim(self, mock_deliver) -> None:
+        """
+        Tests that a timer claimed by another worker is not delivered.
+        """
+        Timer.objects.filter(id=self.timer.id).claim(lease_seconds=300)
+        fire_webhook(str(self.timer.id))
+        mock_deliver.assert_not_called()
+
+    @patch("timers.tasks.deliver_webhooks")
+    def test_fire_webhook_reclaims_stale_claim(self, mock_deliver) -> None:
+        """
+        Tests that a claim older than the lease is taken over and the webhook is delivered.
+        """
+        mock_deliver.return_value = [
+            DeliveryResult(str(self.timer.id), 200, 0.01)
+        ]
+        Timer.objects.filter(id=self.timer.id).update(
+            claimed_at=now() - timedelta(seconds=301),
+            claim_token=uuid.uuid4(),
+        )
+        with override_settings(TIMERS_CLAIM_LEASE_SECONDS=300):
+            fire_webhook(str(self.timer.id))
+        mock_deliver.assert_called_once()
+        self.timer.refresh_from_db()
+        self.assertTrue(self.timer.is_fired)
+
+    @patch("timers.tasks.deliver_webhooks")
+    def test_failed_delivery_releases_claim(self, mock_deliver) -> None:
+        """
+        Tests that a failed POST leaves the timer unfired and releases the claim.
+        """
+        mock_deliver.return_value = [
+            DeliveryResult(str(self.timer.id), None, 0.01, "ConnectError")
+        ]
+        fire_webhook(str(self.timer.id))
+        self.timer.refresh_from_db()
+        self.assertFalse(self.timer.is_fired)
+        self.assertIsNone(self.timer.claimed_at)
+        self.assertIsNone(self.timer.claim_token)
+
+    @patch("timers.tasks.FIRE_OUTCOMES")
+    @patch("timers.tasks.deliver_webhooks")
+    def test_lost_claim_is_not_reported_as_fired(
+        self, mock_deliver, mock_outcomes
+    ) -> None:
+        """
+        Tests that a timer whose claim was taken over during the delivery is neither counted
+        nor logged as fired by the worker that lost it.
+        """
+
+        def deliver(targets):
+            # The lease expired mid-delivery and another worker claimed the timer
+            Timer.objects.filter(id=self.timer.id).update(
+                claim_token=uuid.uuid4()
+            )
+            return [DeliveryResult(str(self.timer.id), 200, 0.01)]
+
+        mock_deliver.side_effect = deliver
+        with self.assertLogs("timers.tasks", level="INFO") as logs:
+            fire_webhook(str(self.timer.id))
+        output = "\n".join(logs.output)
+        self.assertIn("lost its claim", output)
+        self.assertNotIn("Timer marked as fired", output)
+        mock_outcomes.inc.assert_not_called()
+        self.timer.refresh_from_db()
+        self.assertFalse(self.timer.is_fired)
+
+
+class TimingWheelTests(TestCase):
+    """
+    Test case for the hierarchical timing wheel and the dispatcher built on it.
+    """
+
+    def test_items_expire_in_order_across_levels(self) -> None:
+        """
+        Tests that items placed on every level of the wheel expire on time and in order.
+        """
+        wheel = HierarchicalTimingWheel(tick_seconds=1, start=0, slot_bits=2)
+        delays = [1, 3, 5, 17, 70, 300, 1000]
+        for delay in reversed(delays):
+            wheel.insert(delay, expires_at=delay)
+        self.assertEqual(len(wheel), len(delays))
+
+        expired = []
+        for second in range(1, 1001):
+            for item in wheel.advance_to(second):
+                self.assertEqual(item, second)
+                expired.append(item)
+        self.assertEqual(expired, delays)
+        self.assertEqual(len(wheel), 0)
+
+    def test_overdue_item_expires_on_next_tick(self) -> None:
+        """
+        Tests that an item inserted after its expiry time is handed out on the next tick.
+        """
+        wheel = HierarchicalTimingWheel(tick_seconds=0.5, start=100)
+        wheel.insert("late", expires_at=50)
+        self.assertEqual(wheel.advance_to(100.2), [])
+        self.assertEqual(wheel.advance_to(100.5), ["late"])
+
+    @patch("timers.dispatcher.fire_webhook.apply_async")
+    def test_dispatcher_hands_out_due_timers(self, mock_apply_async) -> None:
+        """
+        Tests that the dispatcher loads pending timers within its horizon and dispatches them when due.
+        """
+        current = now()
+        overdue = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=current - timedelta(seconds=5),
+        )
+        soon = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=current + timedelta(seconds=30),
+        )
+        Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=current + timedelta(hours=1),
+        )
+
+        dispatcher = TimerDispatcher(
+            tick_seconds=0.1,
+            horizon_seconds=60,
+            refill_seconds=5,
+            max_loaded=100,
+        )
+        start = current.timestamp()
+        self.assertEqual(dispatcher.load_window(start), 2)
+        self.assertEqual(dispatcher.load_window(start + 1), 0)
+
+        self.assertEqual(dispatcher.dispatch(start + 1), [overdue.id])
+        self.assertEqual(dispatcher.dispatch(start + 29), [])
+        self.assertEqual(dispatcher.dispatch(start + 31), [soon.id])
+        self.assertEqual(mock_apply_async.call_count, 2)
+
+    @patch("timers.dispatcher.fire_webhook.apply_async")
+    def test_dispatcher_keeps_timers_of_a_failed_publish(
+        self, mock_apply_async
+    ) -> None:
+        """
+        Tests that timers whose publish failed are handed out again on the next tick.
+        """
+        timer = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() - timedelta(seconds=5),
+        )
+        dispatcher = TimerDispatcher(
+            tick_seconds=0.1,
+            horizon_seconds=60,
+            refill_seconds=5,
+            max_loaded=100,
+        )
+        start = time.time()
+        dispatcher.load_window(start)
+        mock_apply_async.side_effect = OperationalError("broker down")
+        with self.assertRaises(OperationalError):
+            dispatcher.dispatch(start + 1)
+
+        mock_apply_async.side_effect = None
+        self.assertEqual(dispatcher.dispatch(start + 2), [timer.id])
+        self.assertEqual(mock_apply_async.call_count, 2)
+
+    @patch("timers.dispatcher.close_old_connections")
+    @patch("timers.dispatcher.time.sleep")
+    @patch("timers.dispatcher.get_redis")
+    def test_dispatcher_survives_outages(
+        self, mock_get_redis, mock_sleep, mock_close_old_connections
+    ) -> None:
+        """
+        Tests that a database error while loading and a Redis error while draining the inbox
+        are retried instead of stopping the dispatcher.
+        """
+        dispatcher = TimerDispatcher(
+            tick_seconds=0.1,
+            horizon_seconds=60,
+            refill_seconds=5,
+            max_loaded=100,
+        )
+        mock_get_redis.return_value.lpop.side_effect = [
+            redis.ConnectionError("down"),
+            None,
+            None,
+        ]
+        with patch.object(
+            dispatcher,
+            "load_window",
+            side_effect=[DatabaseError("gone"), 0],
+        ), patch.object(
+            dispatcher, "dispatch", side_effect=[[], KeyboardInterrupt]
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                dispatcher.run()
+        self.assertEqual(mock_close_old_connections.call_count, 2)
+        self.assertEqual(mock_sleep.call_count, 3)
+
+
+class WebhookDeliveryEngineTests(TestCase):
+    """
+    Test case for the asynchronous, connection-pooled webhook delivery engine.
+    """
+
+    def test_deliver_many_reports_each_outcome(self) -> None:
+        """
+        Tests that successes, HTTP errors and connection errors are reported per delivery.
+        """
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "down.example.com":
+                raise httpx.ConnectError("refused", request=request)
+            if request.url.path == "/fail":
+                return httpx.Response(500)
+            return httpx.Response(200)
+
+        async def run() -> list:
+            engine = WebhookDeliveryEngine(
+                max_in_flight=10,
+                connect_timeout=1,
+                read_timeout=1,
+                max_keepalive_connections=10,
+                transport=httpx.MockTransport(handler),
+            )
+            try:
+                return await engine.deliver_many(
+                    [
+                        ("a", "https://example.com/ok"),
+                        ("b", "https://example.com/fail"),
+                        ("c", "https://down.example.com/"),
+                    ]
+                )
+            finally:
+                await engine.aclose()
+
+        ok, failed, unreachable = asyncio.run(run())
+        self.assertTrue(ok.ok)
+        self.assertEqual(ok.status_code, 200)
+        self.assertFalse(failed.ok)
+        self.assertEqual(failed.status_code, 500)
+        self.assertFalse(unreachable.ok)
+        self.assertIsNone(unreachable.status_code)
+        self.assertIn("ConnectError", unreachable.error)
+
+    def test_redirects_are_followed(self) -> None:
+        """
+        Tests that a redirected webhook is delivered to its new location.
+        """
+        requests = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(
+                (request.method, request.url.path, request.content)
+            )
+            if request.url.path == "/old":
+                return httpx.Response(
+                    307, headers={"Location": "https://example.com/new"}
+                )
+            return httpx.Response(200)
+
+        async def run() -> list:
+            engine = WebhookDeliveryEngine(
+                max_in_flight=1,
+                connect_timeout=1,
+                read_timeout=1,
+                max_keepalive_connections=1,
+                transport=httpx.MockTransport(handler),
+            )
+            try:
+                return await engine.deliver_many(
+                    [("a", "https://example.com/old")]
+                )
+            finally:
+                await engine.aclose()
+
+        (result,) = asyncio.run(run())
+        self.assertTrue(result.ok)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(
+            requests,
+            [
+                ("POST", "/old", b'{"id":"a"}'),
+                ("POST", "/new", b'{"id":"a"}'),
+            ],
+        )
+
+    def test_in_flight_limit(self) -> None:
+        """
+        Tests that no more than max_in_flight deliveries run at the same time.
+        """
+        in_flight = 0
+        peak = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(204)
+
+        async def run() -> list:
+            engine = WebhookDeliveryEngine(
+                max_in_flight=3,
+                connect_timeout=1,
+                read_timeout=1,
+                max_keepalive_connections=3,
+                transport=httpx.MockTransport(handler),
+            )
+            try:
+                return await engine.deliver_many(
+                    (str(index), "https://example.com/") for index in range(20)
+                )
+            finally:
+                await engine.aclose()
+
+        results = asyncio.run(run())
+        self.assertEqual(len(results), 20)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(peak, 3)
+
+
+class HostLaneTests(TestCase):
+    """
+    Test case for the per-host delivery lanes and their circuit breakers.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates lanes allowing two concurrent deliveries and tripping after two failures, on a
+        mocked Redis whose scripts are checked by their keys and arguments.
+        """
+        self.lanes = HostLanes(
+            max_concurrency=2,
+            failure_threshold=2,
+            failure_window=60,
+            open_seconds=30,
+            lease_seconds=60,
+        )
+        self.host = self.lanes.host_of("https://Hooks.Example.com:8443/a")
+        patcher = patch("timers.lanes.get_redis")
+        self.redis = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.scripts = {
+            ACQUIRE_SCRIPT: MagicMock(),
+            RELEASE_SCRIPT: MagicMock(),
+        }
+        self.redis.register_script.side_effect = self.scripts.get
+
+    def test_host_of(self) -> None:
+        """
+        Tests that lanes are keyed on the lower-cased host and explicit port.
+        """
+        self.assertEqual(self.host, "hooks.example.com:8443")
+        self.assertEqual(
+            self.lanes.host_of("https://example.com/x"), "example.com"
+        )
+
+    def test_acquire_takes_leased_slot(self) -> None:
+        """
+        Tests that a granted slot is leased in one script call and given back by release().
+        """
+        self.scripts[ACQUIRE_SCRIPT].return_value = [1, b"0", 0]
+        decision = self.lanes.acquire(self.host)
+        self.assertTrue(decision.allowed)
+        self.assertFalse(decision.probe)
+        _, kwargs = self.scripts[ACQUIRE_SCRIPT].call_args
+        self.assertEqual(
+            kwargs["keys"][-1], "timers:lane:hooks.example.com:8443:slots"
+        )
+        self.assertEqual(kwargs["args"], [2, 60, 30, decision.slot])
+
+        self.lanes.release(self.host, healthy=True, slot=decision.slot)
+        _, kwargs = self.scripts[RELEASE_SCRIPT].call_args
+        self.assertEqual(kwargs["args"][:3], [decision.slot, 1, 0])
+
+    def test_refused_slot(self) -> None:
+        """
+        Tests that a full lane or an open circuit refuses the delivery with the script's delay.
+        """
+        self.scripts[ACQUIRE_SCRIPT].return_value = [0, b"12.5", 0]
+        decision = self.lanes.acquire(self.host)
+        self.assertFalse(decision.allowed)
+        self.assertEqual(decision.retry_after, 12.5)
+
+    def test_failed_probe_reopens_circuit(self) -> None:
+        """
+        Tests that the outcome of a probe is passed to the release script.
+        """
+        self.scripts[ACQUIRE_SCRIPT].return_value = [1, b"0", 1]
+        probe = self.lanes.acquire(self.host)
+        self.assertTrue(probe.probe)
+        self.lanes.release(
+            self.host, healthy=False, probe=probe.probe, slot=probe.slot
+        )
+        _, kwargs = self.scripts[RELEASE_SCRIPT].call_args
+        self.assertEqual(
+            kwargs["args"], [probe.slot, 0, 1, 2, 60, 30000, 24 * 3600]
+        )
+
+    def test_lanes_fail_open(self) -> None:
+        """
+        Tests that deliveries proceed when Redis is unreachable.
+        """
+        self.redis.register_script.side_effect = redis.ConnectionError("down")
+        self.assertTrue(self.lanes.acquire(self.host).allowed)
+        self.lanes.release(self.host, healthy=False)
+
+    @patch("timers.tasks.deliver_webhooks")
+    def test_fire_webhook_parks_timer_of_open_circuit(
+        self, mock_deliver
+    ) -> None:
+        """
+        Tests that fire_webhook does not deliver to a host whose circuit is open, and releases the claim.
+        """
+        timer = Timer.objects.create(
+            url="https://down.example.com/hook",
+            scheduled_time=now() - timedelta(seconds=1),
+        )
+        self.scripts[ACQUIRE_SCRIPT].return_value = [0, b"30", 0]
+        fire_webhook(str(timer.id))
+        mock_deliver.assert_not_called()
+        self.assertEqual(
+            self.scripts[ACQUIRE_SCRIPT].call_args[1]["keys"][0],
+            "timers:lane:down.example.com:open",
+        )
+        timer.refresh_from_db()
+        self.assertFalse(timer.is_fired)
+        self.assertIsNone(timer.claim_token)
+
+
+@open_lanes
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    },
+    TIMERS_RETRY_BASE_SECONDS=10,
+    TIMERS_MAX_ATTEMPTS=2,
+)
+class DeliveryRetryTests(TestCase):
+    """
+    Test case for the delivery attempt log and the exponential-backoff retries.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a due timer.
+        """
+        cache.clear()
+        self.timer = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() - timedelta(seconds=1),
+        )
+
+    @patch("timers.tasks.deliver_webhooks")
+    def test_failed_attempt_is_logged_and_backed_off(
+        self, mock_deliver
+    ) -> None:
+        """
+        Tests that a failed delivery is recorded and the next attempt is pushed back.
+        """
+        mock_deliver.return_value = [
+            DeliveryResult(str(self.timer.id), 503, 0.2, "503 Unavailable")
+        ]
+        fire_webhook(str(self.timer.id))
+
+        self.timer.refresh_from_db()
+        self.assertEqual(self.timer.attempts, 1)
+        self.assertFalse(self.timer.is_fired)
+        self.assertGreaterEqual(
+            self.timer.next_attempt_at, now() + timedelta(seconds=4)
+        )
+        attempt = DeliveryAttempt.objects.get(timer=self.timer)
+        self.assertEqual(attempt.attempt, 1)
+        self.assertEqual(attempt.status_code, 503)
+
+        # The retry is neither swept nor claimable before its backoff elapsed
+        with patch("timers.tasks.fire_webhooks_batch.delay") as mock_delay:
+            check_expired_timers()
+        mock_delay.assert_not_called()
+        fire_webhook(str(self.timer.id))
+        self.assertEqual(mock_deliver.call_count, 1)
+
+    @patch("timers.tasks.deliver_webhooks")
+    def test_timer_is_dead_lettered_after_max_attempts(
+        self, mock_deliver
+    ) -> None:
+        """
+        Tests that a timer is dead-lettered once TIMERS_MAX_ATTEMPTS attempts have failed.
+        """
+        mock_deliver.return_value = [
+            DeliveryResult(str(self.timer.id), None, 3.0, "ReadTimeout")
+        ]
+        fire_webhook(str(self.timer.id))
+        Timer.objects.filter(id=self.timer.id).update(next_attempt_at=now())
+        fire_webhook(str(self.timer.id))
+
+        self.timer.refresh_from_db()
+        self.assertTrue(self.timer.is_dead_lettered)
+        self.assertEqual(self.timer.attempts, 2)
+        self.assertEqual(
+            DeliveryAttempt.objects.filter(timer=self.timer).count(), 2
+        )
+        with patch("timers.tasks.fire_webhooks_batch.delay") as mock_delay:
+            check_expired_timers()
+        mock_delay.assert_not_called()
+
+    def test_retry_delay_grows_exponentially(self) -> None:
+        """
+        Tests that the jittered retry delay stays within [delay / 2, delay] and is capped.
+        """
+        for attempts, delay in [(1, 10), (2, 20), (4, 80)]:
+            retry_delay = compute_retry_delay(attempts)
+            self.assertTrue(delay / 2 <= retry_delay <= delay)
+        with override_settings(TIMERS_RETRY_MAX_SECONDS=60):
+            self.assertLessEqual(compute_retry_delay(30), 60)
+
+
+@open_lanes
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+)
+class TimerStateCacheTests(TestCase):
+    """
+    Test case for the read-through cache behind GET /timer/<id>.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the test client for API requests and an empty cache.
+        """
+        cache.clear()
+        self.client = APIClient()
+
+    def test_polling_is_served_from_cache(self) -> None:
+        """
+        Tests that only the first GET of a timer reaches the database, and that hits and misses are counted.
+        """
+        timer = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() + timedelta(seconds=60),
+        )
+        response = self.client.get(f"/timer/{timer.id}")
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get(f"/timer/{timer.id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(str(response.data["id"]), str(timer.id))
+        self.assertTrue(response.data["time_left"] >= 59)
+        self.assertEqual(get_cache_stats(), {"hits": 1, "misses": 1})
+
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    def test_created_timer_is_cached(self, mock_apply_async) -> None:
+        """
+        Tests that a timer created through the API can be polled without a database query.
+        """
+        response = self.client.post(
+            "/timer",
+            {
+                "hours": 0,
+                "minutes": 1,
+                "seconds": 0,
+                "url": "https://example.com",
+            },
+            format="json",
+        )
+        with self.assertNumQueries(0):
+            response = self.client.get(f"/timer/{response.data['id']}")
+        self.assertTrue(response.data["time_left"] >= 59)
+
+    @patch("timers.tasks.deliver_webhooks")
+    def test_fired_timer_overwrites_cache(self, mock_deliver) -> None:
+        """
+        Tests that fire_webhook updates the cached state when it marks a timer fired.
+        """
+        timer = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() + timedelta(seconds=60),
+        )
+        self.client.get(f"/timer/{timer.id}")
+        mock_deliver.return_value = [DeliveryResult(str(timer.id), 200, 0.1)]
+        fire_webhook(str(timer.id))
+        with self.assertNumQueries(0):
+            response = self.client.get(f"/timer/{timer.id}")
+        self.assertEqual(response.data["time_left"], 0)
+
+
+class TimerIdTests(TestCase):
+    """
+    Test case for the time-ordered timer ids.
+    """
+
+    def test_uuid7_is_time_ordered(self) -> None:
+        """
+        Tests that UUIDv7 ids carry the version and variant bits and sort by creation time.
+        """
+        first = uuid7()
+        time.sleep(0.002)
+        second = uuid7()
+        self.assertEqual(first.version, 7)
+        self.assertEqual(first.variant, uuid.RFC_4122)
+        self.assertLess(first, second)
+        self.assertEqual(Timer._meta.pk.default().version, 7)
+
+    def test_fire_time_round_trip(self) -> None:
+        """
+        Tests that the fire time embedded in an id is recovered at millisecond precision.
+        """
+        fire_time = now() + timedelta(minutes=5)
+        timer_id = fire_time_uuid(fire_time)
+        self.assertEqual(timer_id.version, 8)
+        self.assertAlmostEqual(
+            fire_time_from_id(timer_id).timestamp(),
+            fire_time.timestamp(),
+            delta=0.001,
+        )
+        self.assertIsNone(fire_time_from_id(uuid7()))
+        self.assertIsNone(fire_time_from_id(uuid.uuid4()))
+
+    @override_settings(
+        TIMERS_ID_SCHEME="fire_time",
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+            }
+        },
+    )
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    def test_time_left_from_fire_time_id(self, mock_apply_async) -> None:
+        """
+        Tests that a timer with a fire-time id is answered with a single existence check on a cache miss.
+        """
+        client = APIClient()
+        response = client.post(
+            "/timer",
+            {
+                "hours": 0,
+                "minutes": 2,
+                "seconds": 0,
+                "url": "https://example.com",
+            },
+            format="json",
+        )
+        timer_id = response.data["id"]
+        self.assertEqual(timer_id.version, 8)
+
+        cache.clear()
+        with self.assertNumQueries(1) as context:
+            response = client.get(f"/timer/{timer_id}")
+        self.assertIn("LIMIT 1", context.captured_queries[0]["sql"])
+        self.assertNotIn("scheduled_time", context.captured_queries[0]["sql"])
+        self.assertTrue(119 <= response.data["time_left"] <= 120)
+
+        response = client.get(f"/timer/{fire_time_uuid(now())}")
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+)
+class AsyncTimerViewTests(TestCase):
+    """
+    Test case for the native async timer endpoints.
+    """
+
+    def setUp(self) -> None:
+        """
+        Sets up the request factory and an empty cache.
+        """
+        self.factory = AsyncRequestFactory()
+        cache.clear()
+
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    async def test_create_and_get_timer(self, mock_apply_async) -> None:
+        """
+        Tests that a timer created through the async view is saved, scheduled and readable.
+        """
+        request = self.factory.post(
+            "/timer",
+            data={
+                "hours": 0,
+                "minutes": 1,
+                "seconds": 0,
+                "url": "https://example.com",
+            },
+            content_type="application/json",
+        )
+        response = await async_views.create_timer(request)
+        self.assertEqual(response.status_code, 201)
+        data = json.loads(response.content)
+        self.assertTrue(59 <= data["time_left"] <= 60)
+
+        timer = await Timer.objects.aget(id=data["id"])
+        self.assertEqual(timer.url, "https://example.com")
+        mock_apply_async.assert_called_once()
+        self.assertEqual(mock_apply_async.call_args.args[0], (data["id"], 0))
+
+        await cache.aclear()
+        response = await async_views.timer_detail(
+            self.factory.get(f"/timer/{timer.id}"), timer.id
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(59 <= json.loads(response.content)["time_left"] <= 60)
+
+        # Cancellations are handed to TimerDetailView
+        response = await async_views.timer_detail(
+            self.factory.delete(f"/timer/{timer.id}"), timer.id
+        )
+        self.assertEqual(response.status_code, 204)
+        response = await async_views.timer_detail(
+            self.factory.get(f"/timer/{timer.id}"), timer.id
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_invalid_and_missing_timers(self) -> None:
+        """
+        Tests that the async views answer validation errors and unknown ids like the sync views.
+        """
+        request = self.factory.post(
+            "/timer",
+            data={
+                "hours": -1,
+                "minutes": 1,
+                "seconds": 0,
+                "url": "https://example.com",
+            },
+            content_type="application/json",
+        )
+        response = await async_views.create_timer(request)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("hours", json.loads(response.content))
+
+        response = await async_views.create_timer(
+            self.factory.post(
+                "/timer", data="{", content_type="application/json"
+            )
+        )
+        self.assertEqual(response.status_code, 400)
+
+        timer_id = uuid.uuid4()
+        response = await async_views.timer_detail(
+            self.factory.get(f"/timer/{timer_id}"), timer_id
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            json.loads(response.content), {"error": "Timer not found"}
+        )
+
+
+class BenchmarkTests(TestCase):
+    """
+    Test case for the building blocks of the benchmark_timers command.
+    """
+
+    def test_percentiles(self) -> None:
+        """
+        Tests the nearest-rank percentiles of the benchmark report.
+        """
+        summary = percentiles([float(i) for i in range(100, 0, -1)])
+        self.assertEqual(
+            summary, {"p50": 50.0, "p95": 95.0, "p99": 99.0, "max": 100.0}
+        )
+        self.assertEqual(
+            percentiles([]),
+            {"p50": None, "p95": None, "p99": None, "max": None},
+        )
+
+    def test_webhook_receiver_records_first_delivery(self) -> None:
+        """
+        Tests that the in-process receiver records when each timer's webhook first arrived.
+        """
+        with WebhookReceiver() as receiver:
+            before = time.time()
+            for _ in range(2):
+                response = httpx.post(receiver.url, json={"id": "abc"})
+                self.assertEqual(response.status_code, 204)
+        self.assertEqual(receiver.count(), 1)
+        self.assertGreaterEqual(receiver.received["abc"], before)
+
+
+@open_lanes
+class MetricsTests(TestCase):
+    """
+    Test case for the /metrics endpoint and the metrics recorded by the API and the tasks.
+    """
+
+    def setUp(self) -> None:
+        """
+        Starts from empty metrics.
+        """
+        flush_metrics()
+        cache.clear()
+        self.client = APIClient()
+
+    def metric_value(self, exposition: str, sample: str) -> float:
+        """
+        Returns the value of one sample line of the exposition.
+
+        Args:
+            exposition (str): The /metrics response body.
+            sample (str): The sample name and labels, e.g. 'timers_pending'.
+
+        Returns:
+            float: The value.
+        """
+        for line in exposition.splitlines():
+            name, _, value = line.rpartition(" ")
+            if name == sample:
+                return float(value)
+        self.fail(f"{sample} not found in the metrics")
+
+    @patch("timers.tasks.deliver_webhooks")
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    def test_metrics_endpoint(self, mock_apply_async, mock_deliver) -> None:
+        """
+        Tests that API latency, pending/overdue timers, fire lateness, webhook latency and
+        sweep counts are exposed.
+        """
+        response = self.client.post(
+            "/timer",
+            {
+                "hours": 0,
+                "minutes": 1,
+                "seconds": 0,
+                "url": "https://example.com",
+            },
+            format="json",
+        )
+        self.client.get(f"/timer/{response.data['id']}")
+        self.client.get(f"/timer/{uuid.uuid4()}")
+        late = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() - timedelta(seconds=3),
+        )
+        mock_deliver.return_value = [DeliveryResult(str(late.id), 204, 0.02)]
+
+        body = self.client.get("/metrics").content.decode()
+        self.assertEqual(self.metric_value(body, "timers_pending"), 2)
+        self.assertEqual(self.metric_value(body, "timers_overdue"), 1)
+
+        check_expired_timers()
+        fire_webhook(str(late.id))
+        body = self.client.get("/metrics").content.decode()
+
+        self.assertEqual(
+            self.metric_value(
+                body,
+                'timers_api_request_duration_seconds_count{view="create_timer",status_class="2xx"}',
+            ),
+            1,
+        )
+        self.assertEqual(
+            self.metric_value(
+                body,
+                'timers_api_request_duration_seconds_count{view="timer_detail",status_class="4xx"}',
+            ),
+            1,
+        )
+        self.assertEqual(self.metric_value(body, "timers_overdue"), 0)
+        self.assertEqual(
+            self.metric_value(
+                body, 'timers_fire_lateness_seconds_bucket{le="2.5"}'
+            ),
+            0,
+        )
+        self.assertEqual(
+            self.metric_value(
+                body, 'timers_fire_lateness_seconds_bucket{le="5"}'
+            ),
+            1,
+        )
+        self.assertGreaterEqual(
+            self.metric_value(body, "timers_fire_lateness_seconds_sum"), 3
+        )
+        self.assertEqual(
+            self.metric_value(
+                body,
+                'timers_webhook_duration_seconds_bucket{status_class="2xx",le="0.025"}',
+            ),
+            1,
+        )
+        self.assertEqual(
+            self.metric_value(
+                body, 'timers_fire_outcomes_total{outcome="fired"}'
+            ),
+            1,
+        )
+        self.assertEqual(
+            self.metric_value(body, 'timers_sweep_found_bucket{le="1"}'), 1
+        )
+        self.assertEqual(
+            self.metric_value(body, "timers_sweep_enqueued_sum"), 1
+        )
+
+    def test_observations_are_buffered(self) -> None:
+        """
+        Tests that observations are written to the cache by flush_metrics(), that a scrape
+        includes the observations buffered by its own process, and that a cache outage neither
+        fails the observation nor loses it.
+        """
+        key = FIRE_OUTCOMES._key({"outcome": "parked"}, "total")
+        with patch("timers.metrics.cache.incr", side_effect=ConnectionError):
+            FIRE_OUTCOMES.inc(outcome="parked")
+            FIRE_OUTCOMES.inc(outcome="parked")
+            flush_metrics()
+            self.assertIsNone(cache.get(key))
+        body = self.client.get("/metrics").content.decode()
+        self.assertEqual(
+            self.metric_value(
+                body, 'timers_fire_outcomes_total{outcome="parked"}'
+            ),
+            2,
+        )
+
+        FIRE_OUTCOMES.inc(outcome="parked")
+        flush_metrics()
+        self.assertEqual(cache.get(key), 3)
+
+
+class RequestTimingTests(TestCase):
+    """
+    Test case for the Server-Timing middleware and the sampling profiler.
+    """
+
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    def test_server_timing_stages(self, mock_apply_async) -> None:
+        """
+        Tests that the stages of POST /timer are reported in the Server-Timing header and in
+        a structured log line.
+        """
+        client = APIClient()
+        with self.assertLogs("timers.middleware", level="INFO") as logs:
+            response = client.post(
+                "/timer",
+                {
+                    "hours": 0,
+                    "minutes": 1,
+                    "seconds": 0,
+                    "url": "https://example.com",
+                },
+                format="json",
+            )
+        stages = [
+            entry.split(";")[0]
+            for entry in response["Server-Timing"].split(", ")
+        ]
+        for name in ("validate", "db", "enqueue", "render", "total"):
+            self.assertIn(name, stages)
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record["event"], "request_timing")
+        self.assertEqual(record["status"], 201)
+        self.assertGreater(record["stages_ms"]["total"], 0)
+
+    def test_sampling_profiler(self) -> None:
+        """
+        Tests that sampled requests are profiled to TIMERS_PROFILE_DIR and others are not.
+        """
+        client = APIClient()
+        with tempfile.TemporaryDirectory() as profile_dir:
+            with override_settings(
+                TIMERS_PROFILE_SAMPLE_RATE=0,
+                TIMERS_PROFILE_DIR=profile_dir,
+            ):
+                client.get(f"/timer/{uuid.uuid4()}")
+                self.assertEqual(os.listdir(profile_dir), [])
+            with override_settings(
+                TIMERS_PROFILE_SAMPLE_RATE=1,
+                TIMERS_PROFILE_DIR=profile_dir,
+            ):
+                client.get(f"/timer/{uuid.uuid4()}")
+                (name,) = os.listdir(profile_dir)
+            self.assertTrue(name.endswith(".prof"))
+            self.assertIn("GET-timer_detail", name)
+
+
+class FastPathTests(TestCase):
+    """
+    Test case for the fast-path validation and JSON rendering (TIMERS_FAST_PATH).
+    """
+
+    PAYLOADS = [
+        {"hours": 0, "minutes": 1, "seconds": 0, "url": "https://example.com"},
+        {
+            "hours": 2,
+            "minutes": 0,
+            "seconds": 5,
+            "url": "http://localhost:8080/hook?a=1",
+        },
+        {
+            "hours": "1",
+            "minutes": 0,
+            "seconds": 0,
+            "url": "https://example.com",
+        },
+        {
+            "hours": 1.0,
+            "minutes": 0,
+            "seconds": 0,
+            "url": "https://example.com",
+        },
+        {
+            "hours": 1.5,
+            "minutes": 0,
+            "seconds": 0,
+            "url": "https://example.com",
+        },
+        {
+            "hours": True,
+            "minutes": 0,
+            "seconds": 0,
+            "url": "https://example.com",
+        },
+        {
+            "hours": -1,
+            "minutes": 0,
+            "seconds": 0,
+            "url": "https://example.com",
+        },
+        {"hours": 0, "minutes": 0, "seconds": 0, "url": "https://example.com"},
+        {
+            "hours": None,
+            "minutes": 0,
+            "seconds": 1,
+            "url": "https://example.com",
+        },
+        {"minutes": 0, "seconds": 1, "url": "https://example.com"},
+        {"hours": 0, "minutes": 0, "seconds": 1, "url": "not a url"},
+        {
+            "hours": 0,
+            "minutes": 0,
+            "seconds": 1,
+            "url": " https://example.com ",
+        },
+        {"hours": 0, "minutes": 0, "seconds": 1, "url": "https://exämple.com"},
+        {"hours": 0, "minutes": 0, "seconds": 1, "url": ""},
+        {"hours": 0, "minutes": 0, "seconds": 1, "url": 5},
+        {
+            "hours": 0,
+            "minutes": 0,
+            "seconds": 1,
+            "url": "https://example.com/" + "a" * 200,
+        },
+        [],
+        "timer",
+    ]
+
+    def test_payload_parity(self) -> None:
+        """
+        Tests that every payload accepted by the fast path is accepted by TimerSerializer with the
+        same validated data.
+        """
+        accepted = 0
+        for data in self.PAYLOADS:
+            payload = TimerPayload.parse(data)
+            if payload is None:
+                continue
+            accepted += 1
+            serializer = TimerSerializer(data=data)
+            self.assertTrue(serializer.is_valid(), data)
+            self.assertEqual(
+                payload.validated_data(), dict(serializer.validated_data)
+            )
+        self.assertEqual(accepted, 2)
+
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    def test_response_parity(self, mock_apply_async) -> None:
+        """
+        Tests that POST /timer answers every payload with the same status and body on both paths.
+        """
+        client = APIClient()
+        for data in self.PAYLOADS:
+            responses = []
+            for fast_path in (False, True):
+                with override_settings(TIMERS_FAST_PATH=fast_path):
+                    response = client.post("/timer", data, format="json")
+                body = json.loads(response.content)
+                if response.status_code == 201:
+                    body["id"] = uuid.UUID(body["id"]).version
+                    body["time_left"] = body["time_left"] > 0
+                responses.append((response.status_code, body))
+            self.assertEqual(responses[0], responses[1], data)
+
+        with override_settings(TIMERS_FAST_PATH=True):
+            response = client.post(
+                "/timer", "{", content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(
+            response.json()["detail"].startswith("JSON parse error - ")
+        )
+
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    def test_form_posts(self, mock_apply_async) -> None:
+        """
+        Tests that the fast path still accepts the form posts of the test timer form.
+        """
+        with override_settings(TIMERS_FAST_PATH=True):
+            response = Client().post(
+                "/timer",
+                {
+                    "hours": 0,
+                    "minutes": 1,
+                    "seconds": 0,
+                    "url": "https://example.com",
+                },
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(55 <= response.json()["time_left"] <= 60)
+
+
+@override_settings(TIMERS_SCHEDULER="outbox")
+class TimerOutboxTests(TestCase):
+    """
+    Test case for the transactional outbox and its relay.
+    """
+
+    def setUp(self) -> None:
+        """
+        Sets up the API client and a relay.
+        """
+        self.client = APIClient()
+        self.relay = OutboxRelay(batch_size=2, poll_seconds=0)
+
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    def test_outbox_relay(self, mock_apply_async) -> None:
+        """
+        Tests that created timers are written to the outbox, without publishing, and that the
+        relay publishes them in batches and empties the outbox.
+        """
+        response = self.client.post(
+            "/timer",
+            {
+                "hours": 0,
+                "minutes": 1,
+                "seconds": 0,
+                "url": "https://example.com",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.client.post(
+            "/timers/batch",
+            [
+                {
+                    "hours": 0,
+                    "minutes": 0,
+                    "seconds": 5,
+                    "url": "https://example.com",
+                },
+                {
+                    "hours": 0,
+                    "minutes": 0,
+                    "seconds": 9,
+                    "url": "https://example.com",
+                },
+            ],
+            format="json",
+        )
+        mock_apply_async.assert_not_called()
+        self.assertEqual(TimerOutbox.objects.count(), 3)
+        self.assertTrue(
+            TimerOutbox.objects.filter(timer_id=response.data["id"]).exists()
+        )
+
+        self.assertEqual(self.relay.relay_batch(), 2)
+        self.assertEqual(self.relay.relay_batch(), 1)
+        self.assertEqual(self.relay.relay_batch(), 0)
+        self.assertEqual(TimerOutbox.objects.count(), 0)
+        self.assertEqual(mock_apply_async.call_count, 3)
+        first = mock_apply_async.call_args_list[0]
+        self.assertEqual(first.args[0], (str(response.data["id"]), 0))
+        self.assertTrue(55 <= first.kwargs["countdown"] <= 60)
+
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    def test_failed_publish_keeps_entries(self, mock_apply_async) -> None:
+        """
+        Tests that the entries of a batch whose publish failed stay in the outbox.
+        """
+        self.client.post(
+            "/timer",
+            {
+                "hours": 0,
+                "minutes": 1,
+                "seconds": 0,
+                "url": "https://example.com",
+            },
+            format="json",
+        )
+        mock_apply_async.side_effect = ConnectionError("broker down")
+        with self.assertRaises(ConnectionError):
+            self.relay.relay_batch()
+        self.assertEqual(TimerOutbox.objects.count(), 1)
+
+        mock_apply_async.side_effect = None
+        self.assertEqual(self.relay.relay_batch(), 1)
+        self.assertEqual(TimerOutbox.objects.count(), 0)
+
+    @patch("timers.outbox.close_old_connections")
+    @patch("timers.outbox.time.sleep")
+    def test_relay_survives_outages(
+        self, mock_sleep, mock_close_old_connections
+    ) -> None:
+        """
+        Tests that database and broker errors are retried instead of stopping the relay, and
+        that programming errors are not swallowed.
+        """
+        with patch.object(
+            self.relay,
+            "relay_batch",
+            side_effect=[
+                DatabaseError("gone"),
+                OperationalError("broker down"),
+                0,
+                TypeError("bug"),
+            ],
+        ):
+            with self.assertRaises(TypeError):
+                self.relay.run()
+        self.assertEqual(mock_close_old_connections.call_count, 2)
+        self.assertEqual(mock_sleep.call_count, 3)
+
+
+@open_lanes
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+)
+class FireWebhooksBatchTests(TestCase):
+    """
+    Test case for the fire_webhooks_batch task.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates three due timers.
+        """
+        cache.clear()
+        self.timers = [
+            Timer.objects.create(
+                url=f"https://host{index}.example.com",
+                scheduled_time=now() - timedelta(seconds=1),
+            )
+            for index in range(3)
+        ]
+        self.ids = [str(timer.id) for timer in self.timers]
+
+    @patch("timers.tasks.deliver_webhooks")
+    def test_batch_fires_with_constant_queries(self, mock_deliver) -> None:
+        """
+        Tests that a chunk is claimed, loaded, recorded and finalized with a fixed number of
+        queries, and that only the delivered timers are marked as fired.
+        """
+        mock_deliver.side_effect = lambda jobs: [
+            (
+                DeliveryResult(timer_id, 503, 0.01, "503 Unavailable")
+                if "host1" in url
+                else DeliveryResult(timer_id, 200, 0.01)
+            )
+            for timer_id, url in jobs
+        ]
+        # claim, load, insert attempts, lock and mark fired (in a savepoint), schedule retries
+        with self.assertNumQueries(8):
+            fire_webhooks_batch(self.ids)
+        self.assertEqual(mock_deliver.call_count, 1)
+        self.assertEqual(len(mock_deliver.call_args.args[0]), 3)
+
+        fired, failed, other = [
+            Timer.objects.get(id=timer.id) for timer in self.timers
+        ]
+        self.assertTrue(fired.is_fired and other.is_fired)
+        self.assertEqual((fired.attempts, other.attempts), (1, 1))
+        self.assertIsNone(fired.claim_token)
+        self.assertFalse(failed.is_fired)
+        self.assertEqual(failed.attempts, 1)
+        self.assertIsNone(failed.claim_token)
+        self.assertGreater(failed.next_attempt_at, now())
+        self.assertEqual(DeliveryAttempt.objects.count(), 3)
+
+        # Fired timers are not delivered again, the retry waits for its backoff
+        fire_webhooks_batch(self.ids)
+        self.assertEqual(mock_deliver.call_count, 1)
+
+    @patch("timers.tasks.publish_fired")
+    @patch("timers.tasks.deliver_webhooks")
+    def test_batch_skips_timers_claimed_by_another_worker(
+        self, mock_deliver, mock_publish
+    ) -> None:
+        """
+        Tests that a timer whose claim was taken over during the delivery is neither marked
+        as fired, cached nor published by the batch.
+        """
+        stolen = self.timers[1]
+
+        def deliver(jobs):
+            Timer.objects.filter(id=stolen.id).update(claim_token=uuid.uuid4())
+            return [
+                DeliveryResult(timer_id, 200, 0.01) for timer_id, _ in jobs
+            ]
+
+        mock_deliver.side_effect = deliver
+        fire_webhooks_batch(self.ids)
+
+        self.assertFalse(Timer.objects.get(id=stolen.id).is_fired)
+        self.assertFalse(get_timer_state(stolen.id)[1])
+        published = [timer.id for timer in mock_publish.call_args.args[0]]
+        self.assertCountEqual(
+            published, [self.timers[0].id, self.timers[2].id]
+        )
+
+    @override_settings(TIMERS_MAX_ATTEMPTS=1)
+    @patch("timers.tasks.deliver_webhooks")
+    @patch("timers.tasks.publish_events")
+    def test_batch_dead_letters(self, mock_publish, mock_deliver) -> None:
+        """
+        Tests that timers failing their last attempt are dead-lettered, and that their streams
+        are told so.
+        """
+        mock_deliver.side_effect = lambda jobs: [
+            DeliveryResult(timer_id, None, 3.0, "ReadTimeout")
+            for timer_id, _ in jobs
+        ]
+        fire_webhooks_batch(self.ids)
+        self.assertEqual(
+            Timer.objects.filter(is_dead_lettered=True, attempts=1).count(), 3
+        )
+        timers, event = mock_publish.call_args.args
+        self.assertEqual(event, "dead_lettered")
+        self.assertCountEqual(
+            [timer.id for timer in timers], [timer.id for timer in self.timers]
+        )
+
+
+class TimerRetentionTests(TestCase):
+    """
+    Test case for the partition helpers and the retention of old timers (timers.partitions).
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates an old fired timer with two delivery attempts, an old dead-lettered timer, an
+        old pending timer and a recent fired timer.
+        """
+        old = now() - timedelta(days=40)
+        self.fired = Timer.objects.create(
+            url="https://example.com/fired", scheduled_time=old, is_fired=True
+        )
+        for attempt, status_code in ((1, 503), (2, 200)):
+            DeliveryAttempt.objects.create(
+                timer=self.fired,
+                attempt=attempt,
+                status_code=status_code,
+                latency=0.1,
+            )
+        self.dead = Timer.objects.create(
+            url="https://example.com/dead",
+            scheduled_time=old,
+            is_dead_lettered=True,
+        )
+        self.pending = Timer.objects.create(
+            url="https://example.com/pending", scheduled_time=old
+        )
+        self.recent = Timer.objects.create(
+            url="https://example.com/recent",
+            scheduled_time=now() - timedelta(days=1),
+            is_fired=True,
+        )
+        self.archive_dir = tempfile.mkdtemp()
+
+    def test_month_helpers(self) -> None:
+        """
+        Tests the month arithmetic and the partition names.
+        """
+        value = datetime(2026, 12, 31, 23, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(
+            month_start(value), datetime(2026, 12, 1, tzinfo=dt_timezone.utc)
+        )
+        self.assertEqual(
+            month_start(value, 1), datetime(2027, 1, 1, tzinfo=dt_timezone.utc)
+        )
+        self.assertEqual(
+            month_start(value, -12),
+            datetime(2025, 12, 1, tzinfo=dt_timezone.utc),
+        )
+        self.assertEqual(
+            partition_name(month_start(value, 1)), "timers_timer_p2027_01"
+        )
+
+    def test_parse_partition_bound(self) -> None:
+        """
+        Tests the parsing of the bounds reported by PostgreSQL.
+        """
+        self.assertEqual(
+            parse_partition_bound(
+                "FOR VALUES FROM ('2026-10-01 00:00:00+00') TO ('2026-11-01 00:00:00+00')"
+            ),
+            (
+                datetime(2026, 10, 1, tzinfo=dt_timezone.utc),
+                datetime(2026, 11, 1, tzinfo=dt_timezone.utc),
+            ),
+        )
+        self.assertEqual(
+            parse_partition_bound(
+                "FOR VALUES FROM (MINVALUE) TO ('2026-11-01 00:00:00+00')"
+            ),
+            (None, datetime(2026, 11, 1, tzinfo=dt_timezone.utc)),
+        )
+        self.assertIsNone(parse_partition_bound("DEFAULT"))
+
+    def test_retention_archives_and_deletes_old_finished_timers(self) -> None:
+        """
+        Tests that the old fired and dead-lettered timers are archived with their delivery
+        attempts and deleted, while pending and recent timers are kept.
+        """
+        with override_settings(TIMERS_ARCHIVE_DIR=self.archive_dir):
+            result = apply_retention(retention_days=30, batch_size=1)
+
+        self.assertEqual(result, {"partitions": 0, "timers": 2})
+        self.assertEqual(
+            set(Timer.objects.values_list("id", flat=True)),
+            {self.pending.id, self.recent.id},
+        )
+        self.assertFalse(DeliveryAttempt.objects.exists())
+
+        records = []
+        for name in sorted(os.listdir(self.archive_dir)):
+            self.assertTrue(name.endswith(".jsonl.gz"))
+            with gzip.open(os.path.join(self.archive_dir, name), "rt") as f:
+                records.extend(json.loads(line) for line in f)
+        by_id = {record["id"]: record for record in records}
+        self.assertEqual(set(by_id), {str(self.fired.id), str(self.dead.id)})
+        fired = by_id[str(self.fired.id)]
+        self.assertTrue(fired["is_fired"])
+        self.assertEqual(fired["url"], "https://example.com/fired")
+        self.assertEqual(
+            [a["status_code"] for a in fired["delivery_attempts"]], [503, 200]
+        )
+        self.assertTrue(by_id[str(self.dead.id)]["is_dead_lettered"])
+
+    def test_retention_without_old_timers_writes_nothing(self) -> None:
+        """
+        Tests that nothing is archived when no finished timer is old enough.
+        """
+        with override_settings(TIMERS_ARCHIVE_DIR=self.archive_dir):
+            result = apply_retention(retention_days=60, batch_size=100)
+        self.assertEqual(result["timers"], 0)
+        self.assertEqual(Timer.objects.count(), 4)
+        self.assertEqual(os.listdir(self.archive_dir), [])
+
+
+class ReadReplicaRoutingTests(TestCase):
+    """
+    Test case for the read replica router and the primary fallback of the status reads.
+    """
+
+    @override_settings(TIMERS_READ_REPLICAS=["replica_1"])
+    def test_router_sends_only_replica_reads_to_replicas(self) -> None:
+        """
+        Tests that reads go to a replica inside replica_reads() only, and that writes and
+        migrations never do.
+        """
+        router = ReadReplicaRouter()
+        self.assertIsNone(router.db_for_read(Timer))
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Timer), "replica_1")
+            self.assertEqual(router.db_for_write(Timer), "default")
+        self.assertIsNone(router.db_for_read(Timer))
+        self.assertFalse(router.allow_migrate("replica_1", "timers"))
+        self.assertIsNone(router.allow_migrate("default", "timers"))
+
+    def test_router_without_replicas_reads_from_primary(self) -> None:
+        """
+        Tests that replica_reads() is a no-op when no replica is configured.
+        """
+        with replica_reads():
+            self.assertIsNone(ReadReplicaRouter().db_for_read(Timer))
+
+    @override_settings(
+        TIMERS_READ_REPLICAS=["default"],
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+            }
+        },
+    )
+    def test_status_read_falls_back_to_primary(self) -> None:
+        """
+        Tests that a timer found on the replica costs one query, and that a timer missing
+        from it is looked up again on the primary. The "replica" is the test database.
+        """
+        cache.clear()
+        timer = Timer.objects.create(
+            url="https://example.com", scheduled_time=now()
+        )
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_timer_state(timer.id)[1], False)
+        with self.assertNumQueries(2):
+            self.assertIsNone(get_timer_state(uuid.uuid4()))
+
+
+@open_lanes
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+)
+class TimerCancelRescheduleTests(TestCase):
+    """
+    Test case for DELETE and PATCH /timer/<id> and the versioned countdown messages.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a pending timer due in one minute.
+        """
+        cache.clear()
+        self.client = APIClient()
+        self.timer = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() + timedelta(minutes=1),
+        )
+        self.url = f"/timer/{self.timer.id}"
+
+    @patch("timers.tasks.deliver_webhooks")
+    def test_cancel_timer(self, mock_deliver) -> None:
+        """
+        Tests that a cancelled timer is reported as not found, and that neither its countdown
+        message nor the sweep delivers it.
+        """
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, 204)
+        self.timer.refresh_from_db()
+        self.assertTrue(self.timer.is_cancelled)
+        self.assertEqual(self.timer.version, 1)
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.client.delete(self.url).status_code, 404)
+
+        Timer.objects.filter(id=self.timer.id).update(
+            next_attempt_at=now() - timedelta(seconds=1)
+        )
+        fire_webhook(str(self.timer.id), 0)
+        fire_webhooks_batch([str(self.timer.id)])
+        mock_deliver.assert_not_called()
+        with patch("timers.tasks.fire_webhooks_batch.delay") as mock_delay:
+            check_expired_timers()
+        mock_delay.assert_not_called()
+
+    @patch("timers.tasks.deliver_webhooks")
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    def test_reschedule_timer(self, mock_apply_async, mock_deliver) -> None:
+        """
+        Tests that a rescheduled timer gets a new version and countdown message, and that the
+        message of its previous schedule claims nothing.
+        """
+        response = self.client.patch(
+            self.url, {"hours": 0, "minutes": 2, "seconds": 0}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.data["time_left"], 100)
+        self.timer.refresh_from_db()
+        self.assertEqual(self.timer.version, 1)
+        self.assertEqual(self.timer.next_attempt_at, self.timer.scheduled_time)
+        mock_apply_async.assert_called_once()
+        self.assertEqual(
+            mock_apply_async.call_args.args[0], (str(self.timer.id), 1)
+        )
+        self.assertGreater(mock_apply_async.call_args.kwargs["countdown"], 100)
+        self.assertGreater(self.client.get(self.url).data["time_left"], 100)
+
+        mock_deliver.return_value = [
+            DeliveryResult(str(self.timer.id), 200, 0.01)
+        ]
+        # The countdown message of the original schedule, then one without a version
+        fire_webhook(str(self.timer.id), 0)
+        fire_webhook(str(self.timer.id))
+        mock_deliver.assert_not_called()
+        fire_webhook(str(self.timer.id), 1)
+        mock_deliver.assert_called_once()
+
+    def test_cancel_or_reschedule_finished_timer(self) -> None:
+        """
+        Tests the conflict, not found and validation responses.
+        """
+        Timer.objects.filter(id=self.timer.id).update(is_fired=True)
+        self.assertEqual(self.client.delete(self.url).status_code, 409)
+        response = self.client.patch(
+            self.url, {"hours": 0, "minutes": 1, "seconds": 0}, format="json"
+        )
+        self.assertEqual(response.status_code, 409)
+
+        unknown = f"/timer/{uuid.uuid4()}"
+        self.assertEqual(self.client.delete(unknown).status_code, 404)
+        response = self.client.patch(
+            self.url, {"hours": 0, "minutes": 0, "seconds": 0}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(
+    TIMERS_PROMOTION_HORIZON_SECONDS=300,
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    },
+)
+class TimerPromotionTests(TestCase):
+    """
+    Test case for the two-tier scheduling: near timers are published when created, far timers
+    are promoted once they enter the horizon.
+    """
+
+    def setUp(self) -> None:
+        """
+        Sets up the test client and an empty cache.
+        """
+        cache.clear()
+        self.client = APIClient()
+
+    def _create(self, hours: int, minutes: int) -> str:
+        response = self.client.post(
+            "/timer",
+            {
+                "hours": hours,
+                "minutes": minutes,
+                "seconds": 0,
+                "url": "https://example.com",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return str(response.data["id"])
+
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    def test_only_near_timers_are_published_on_create(
+        self, mock_apply_async
+    ) -> None:
+        """
+        Tests that a timer due beyond the horizon is only persisted.
+        """
+        near_id = self._create(0, 1)
+        far_id = self._create(2, 0)
+        published = [
+            call.args[0][0] for call in mock_apply_async.call_args_list
+        ]
+        self.assertEqual(published, [near_id])
+        self.assertTrue(Timer.objects.filter(id=far_id).exists())
+
+        with override_settings(TIMERS_PROMOTION_HORIZON_SECONDS=0):
+            far_id = self._create(2, 0)
+        self.assertEqual(mock_apply_async.call_args.args[0], (far_id, 0))
+
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    def test_promotion_publishes_each_window_once(
+        self, mock_apply_async
+    ) -> None:
+        """
+        Tests that promote_due_timers publishes the timers entering the horizon once, and that
+        later runs only read the window beyond the one already promoted.
+        """
+        # The first run only starts the window: the timers within the horizon were published
+        # when they were created
+        Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() + timedelta(minutes=2),
+        )
+        self.assertEqual(promote_due_timers(max_timers=100), 0)
+
+        soon = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() + timedelta(minutes=8),
+        )
+        Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() + timedelta(minutes=9),
+            claimed_at=now(),
+        )
+        later = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() + timedelta(hours=1),
+        )
+        # The claim of a timer is checked against the current time, not the horizon
+        with override_settings(TIMERS_PROMOTION_HORIZON_SECONDS=600):
+            self.assertEqual(promote_due_timers(max_timers=100), 1)
+        self.assertEqual(
+            mock_apply_async.call_args.args[0], (str(soon.id), None)
+        )
+        self.assertGreater(mock_apply_async.call_args.kwargs["countdown"], 400)
+
+        with override_settings(TIMERS_PROMOTION_HORIZON_SECONDS=600):
+            self.assertEqual(promote_due_timers(max_timers=100), 0)
+        with override_settings(TIMERS_PROMOTION_HORIZON_SECONDS=7200):
+            self.assertEqual(promote_due_timers(max_timers=100), 1)
+        self.assertEqual(
+            mock_apply_async.call_args.args[0], (str(later.id), None)
+        )
+
+        # A timer created inside the promoted window is published right away
+        mock_apply_async.reset_mock()
+        with override_settings(TIMERS_PROMOTION_HORIZON_SECONDS=7200):
+            self._create(1, 30)
+        mock_apply_async.assert_called_once()
+
+
+class TimerSweeperTests(TestCase):
+    """
+    Test case for the event-driven sweeper (TIMERS_SWEEPER = "loop").
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a sweeper with a one-minute maximum sleep and a half-second grace.
+        """
+        self.sweeper = TimerSweeper(max_sleep_seconds=60, grace_seconds=0.5)
+
+    @patch("timers.tasks.fire_webhooks_batch.delay")
+    def test_sweep_plans_next_due_timer(self, mock_delay) -> None:
+        """
+        Tests that missed timers are enqueued, that timers within the grace period are left to
+        their countdown message, and that the sleep ends when the next timer is due.
+        """
+        current = now()
+        missed = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=current - timedelta(seconds=5),
+        )
+        Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=current - timedelta(seconds=0.2),
+        )
+        seconds = self.sweeper.sweep()
+        mock_delay.assert_called_once_with([str(missed.id)])
+        # The timer in its grace period is due again in about 0.3 seconds
+        self.assertLessEqual(seconds, 0.3)
+
+        Timer.objects.all().delete()
+        Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() + timedelta(seconds=30),
+        )
+        self.assertTrue(29 < self.sweeper.sweep() <= 30.5)
+
+    @patch("timers.tasks.fire_webhooks_batch.delay")
+    def test_idle_sweeper_sleeps_max(self, mock_delay) -> None:
+        """
+        Tests that the sweeper sleeps the maximum time when nothing is pending, after the sweep
+        query and the next-due query.
+        """
+        with self.assertNumQueries(2):
+            self.assertEqual(self.sweeper.sweep(), 60)
+        mock_delay.assert_not_called()
+
+    @override_settings(TIMERS_SWEEPER="loop")
+    @patch("timers.sweeper.get_redis")
+    def test_wake_sweeper_only_for_sooner_timers(self, mock_get_redis) -> None:
+        """
+        Tests that creating a timer wakes the sweeper up only if the timer is due before the
+        planned wake-up, and never when no sweeper is running.
+        """
+        redis = MagicMock()
+        mock_get_redis.return_value = redis
+        timer = Timer(
+            url="https://example.com",
+            scheduled_time=now() + timedelta(seconds=10),
+        )
+        timer.next_attempt_at = timer.scheduled_time
+
+        redis.get.return_value = str(time.time() + 60).encode()
+        wake_sweeper([timer])
+        redis.get.return_value = str(time.time() + 5).encode()
+        wake_sweeper([timer])
+        redis.get.return_value = None
+        wake_sweeper([timer])
+        self.assertEqual(redis.pipeline.call_count, 1)
+
+        redis.get.return_value = b"inf"
+        wake_sweeper([timer])
+        self.assertEqual(redis.pipeline.call_count, 2)
+        with override_settings(TIMERS_SWEEPER="beat"):
+            wake_sweeper([timer])
+        self.assertEqual(redis.get.call_count, 4)
+
+    @patch("timers.sweeper.close_old_connections")
+    @patch("timers.sweeper.time.sleep")
+    @patch("timers.sweeper.get_redis")
+    def test_sweeper_survives_outages(
+        self, mock_get_redis, mock_sleep, mock_close_old_connections
+    ) -> None:
+        """
+        Tests that a Redis error while planning or sleeping, and a database error while
+        sweeping, are retried instead of stopping the sweeper.
+        """
+        mock_get_redis.return_value.set.side_effect = [
+            redis.ConnectionError("down"),
+            None,
+            None,
+            None,
+            None,
+        ]
+        mock_get_redis.return_value.blpop.side_effect = redis.TimeoutError(
+            "timeout"
+        )
+        with patch.object(
+            self.sweeper,
+            "sweep",
+            side_effect=[DatabaseError("gone"), 5.0, KeyboardInterrupt],
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                self.sweeper.run()
+        self.assertEqual(mock_sleep.call_count, 3)
+        self.assertEqual(mock_close_old_connections.call_count, 3)
+
+
+@open_lanes
+class TimerRecurrenceTests(TestCase):
+    """
+    Test case for the recurring timers (interval_seconds and cron), which keep a single row.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the test client for API requests.
+        """
+        cache.clear()
+        self.client = APIClient()
+
+    def test_create_recurring_timer(self) -> None:
+        """
+        Tests the validation of the recurrence fields, and that recurring payloads bypass the
+        fast path.
+        """
+        payload = {
+            "hours": 0,
+            "minutes": 1,
+            "seconds": 0,
+            "url": "https://example.com",
+        }
+        self.assertIsNone(
+            TimerPayload.parse({**payload, "interval_seconds": 60})
+        )
+        with override_settings(TIMERS_FAST_PATH=True):
+            response = self.client.post(
+                "/timer",
+                {**payload, "interval_seconds": 60, "max_occurrences": 3},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201)
+        timer = Timer.objects.get(id=response.data["id"])
+        self.assertEqual(timer.interval_seconds, 60)
+        self.assertEqual(timer.max_occurrences, 3)
+        self.assertTrue(timer.is_recurring)
+
+        for invalid in (
+            {"interval_seconds": 60, "cron": "* * * * *"},
+            {"max_occurrences": 2},
+            {"interval_seconds": 0},
+            {"cron": "61 * * * *"},
+            {"cron": "0 0 30 2 *"},
+            {"cron": "* * *"},
+        ):
+            response = self.client.post(
+                "/timer", {**payload, **invalid}, format="json"
+            )
+            self.assertEqual(response.status_code, 400, invalid)
+
+    @override_settings(TIME_ZONE="UTC")
+    def test_next_cron_time(self) -> None:
+        """
+        Tests the next match of cron expressions, and that a cron timer first fires on the
+        first match after its duration.
+        """
+        # Sunday 2025-01-05 10:30 UTC
+        after = datetime(2025, 1, 5, 10, 30, tzinfo=dt_timezone.utc)
+        self.assertEqual(
+            next_cron_time("0 9 * * mon", after),
+            datetime(2025, 1, 6, 9, 0, tzinfo=dt_timezone.utc),
+        )
+        self.assertEqual(
+            next_cron_time("*/15 * * * *", after),
+            datetime(2025, 1, 5, 10, 45, tzinfo=dt_timezone.utc),
+        )
+        self.assertEqual(
+            next_cron_time("0 0 29 2 *", after),
+            datetime(2028, 2, 29, 0, 0, tzinfo=dt_timezone.utc),
+        )
+
+        serializer = TimerSerializer(
+            data={
+                "hours": 0,
+                "minutes": 1,
+                "seconds": 0,
+                "url": "https://example.com",
+                "cron": "0  12 * * *",
+            }
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        timer = serializer.build_timer(serializer.validated_data)
+        self.assertEqual(timer.cron, "0 12 * * *")
+        self.assertEqual(
+            (timer.scheduled_time.hour, timer.scheduled_time.minute), (12, 0)
+        )
+        self.assertGreater(timer.scheduled_time, now())
+
+    @patch("timers.tasks.deliver_webhooks")
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    def test_interval_timer_advances_in_place(
+        self, mock_apply_async, mock_deliver
+    ) -> None:
+        """
+        Tests that each delivery moves the row to the next occurrence with a new version and
+        countdown message, until max_occurrences deliveries were made.
+        """
+        first = now() - timedelta(seconds=1)
+        timer = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=first,
+            interval_seconds=60,
+            max_occurrences=2,
+        )
+        mock_deliver.return_value = [DeliveryResult(str(timer.id), 200, 0.01)]
+
+        with self.assertLogs("timers.tasks", level="INFO") as logs:
+            fire_webhook(str(timer.id), 0)
+        output = "\n".join(logs.output)
+        self.assertIn("Timer advanced to its next occurrence", output)
+        self.assertNotIn("Timer marked as fired", output)
+        timer.refresh_from_db()
+        self.assertFalse(timer.is_fired)
+        self.assertEqual(timer.occurrences, 1)
+        self.assertEqual(timer.version, 1)
+        self.assertEqual(timer.attempts, 0)
+        self.assertIsNone(timer.claim_token)
+        self.assertEqual(timer.scheduled_time, first + timedelta(seconds=60))
+        self.assertEqual(timer.next_attempt_at, timer.scheduled_time)
+        self.assertEqual(
+            mock_apply_async.call_args.args[0], (str(timer.id), 1)
+        )
+        self.assertGreater(mock_apply_async.call_args.kwargs["countdown"], 50)
+        response = self.client.get(f"/timer/{timer.id}")
+        self.assertGreater(response.data["time_left"], 50)
+
+        # The stale message of the first occurrence claims nothing
+        fire_webhook(str(timer.id), 0)
+        self.assertEqual(mock_deliver.call_count, 1)
+
+        fire_webhook(str(timer.id), 1)
+        timer.refresh_from_db()
+        self.assertTrue(timer.is_fired)
+        self.assertEqual(timer.occurrences, 2)
+        self.assertEqual(Timer.objects.count(), 1)
+        self.assertEqual(DeliveryAttempt.objects.count(), 2)
+
+    @patch("timers.tasks.deliver_webhooks")
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    def test_batch_advances_recurring_timers(
+        self, mock_apply_async, mock_deliver
+    ) -> None:
+        """
+        Tests that the sweep batch advances the recurring timers, skipping the missed
+        occurrences, fires the one-shot timers, and stops at repeat_until.
+        """
+        late = now() - timedelta(seconds=150)
+        recurring = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=late,
+            interval_seconds=60,
+        )
+        ending = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=late,
+            interval_seconds=60,
+            repeat_until=late + timedelta(seconds=100),
+        )
+        one_shot = Timer.objects.create(
+            url="https://example.com", scheduled_time=late
+        )
+        timer_ids = [str(recurring.id), str(ending.id), str(one_shot.id)]
+        mock_deliver.return_value = [
+            DeliveryResult(timer_id, 200, 0.01) for timer_id in timer_ids
+        ]
+
+        fire_webhooks_batch(timer_ids)
+        recurring.refresh_from_db()
+        self.assertFalse(recurring.is_fired)
+        self.assertEqual(recurring.occurrences, 1)
+        self.assertEqual(
+            recurring.scheduled_time, late + timedelta(seconds=180)
+        )
+        ending.refresh_from_db()
+        self.assertTrue(ending.is_fired)
+        one_shot.refresh_from_db()
+        self.assertTrue(one_shot.is_fired)
+        self.assertEqual(one_shot.occurrences, 1)
+        mock_apply_async.assert_called_once()
+        self.assertEqual(
+            mock_apply_async.call_args.args[0], (str(recurring.id), 1)
+        )
+
+
+class AdmissionControlTests(TestCase):
+    """
+    Test case for the per-client rate limits and the backlog admission limits of the timer
+    creation endpoints.
+    """
+
+    payload = {
+        "hours": 0,
+        "minutes": 1,
+        "seconds": 0,
+        "url": "https://example.com",
+    }
+
+    def setUp(self) -> None:
+        """
+        Sets up the test client and an empty cache.
+        """
+        cache.clear()
+        self.client = APIClient()
+
+    @override_settings(
+        TIMERS_RATE_LIMIT_PER_SECOND=10,
+        TIMERS_RATE_LIMIT_API_KEYS=frozenset({"tenant-a", "tenant-b"}),
+    )
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    @patch("timers.admission.get_redis")
+    def test_rate_limited_client(
+        self, mock_get_redis, mock_apply_async
+    ) -> None:
+        """
+        Tests that a client with an empty bucket gets 429 with Retry-After, that buckets are
+        keyed on the API key, and that batches take one token per timer.
+        """
+        script = mock_get_redis.return_value.register_script.return_value
+        script.return_value = [0, b"2.5"]
+        response = self.client.post(
+            "/timer", self.payload, format="json", HTTP_X_API_KEY="tenant-a"
+        )
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "3")
+        self.assertFalse(Timer.objects.exists())
+        mock_apply_async.assert_not_called()
+        limited_key = script.call_args.kwargs["keys"]
+        self.assertEqual(script.call_args.kwargs["args"], [10, 1000, 1])
+
+        script.return_value = [1, b"0"]
+        response = self.client.post(
+            "/timer", self.payload, format="json", HTTP_X_API_KEY="tenant-b"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertNotEqual(script.call_args.kwargs["keys"], limited_key)
+
+        response = self.client.post(
+            "/timers/batch", [self.payload] * 3, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(script.call_args.kwargs["args"], [10, 1000, 3])
+
+        # Fails open when Redis is unavailable
+        script.side_effect = redis.ConnectionError("unreachable")
+        response = self.client.post("/timer", self.payload, format="json")
+        self.assertEqual(response.status_code, 201)
+
+    @override_settings(
+        TIMERS_RATE_LIMIT_PER_SECOND=10,
+        TIMERS_RATE_LIMIT_API_KEYS=frozenset({"tenant-a"}),
+    )
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    @patch("timers.admission.get_redis")
+    def test_unknown_api_key_is_ignored(
+        self, mock_get_redis, mock_apply_async
+    ) -> None:
+        """
+        Tests that a made-up API key does not get a bucket of its own: the client is keyed on
+        its source IP address, as without a key.
+        """
+        script = mock_get_redis.return_value.register_script.return_value
+        script.return_value = [1, b"0"]
+        keys = []
+        for api_key in ["made-up", "", "tenant-a"]:
+            response = self.client.post(
+                "/timer", self.payload, format="json", HTTP_X_API_KEY=api_key
+            )
+            self.assertEqual(response.status_code, 201)
+            keys.append(script.call_args.kwargs["keys"])
+            timer = Timer.objects.get(id=response.data["id"])
+        self.assertEqual(keys[0], keys[1])
+        self.assertNotEqual(keys[0], keys[2])
+        self.assertEqual(timer.client, client_digest("key:tenant-a"))
+
+    @override_settings(TIMERS_ADMISSION_MAX_OVERDUE=1)
+    @patch("timers.scheduling.fire_webhook.apply_async")
+    def test_overloaded_backlog(self, mock_apply_async) -> None:
+        """
+        Tests that creations get 503 with Retry-After while too many timers are overdue, and
+        that the backlog check is cached.
+        """
+        for _ in range(2):
+            Timer.objects.create(
+                url="https://example.com",
+                scheduled_time=now() - timedelta(minutes=1),
+            )
+        response = self.client.post("/timer", self.payload, format="json")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "5")
+        response = self.client.post(
+            "/timers/batch", [self.payload], format="json"
+        )
+        self.assertEqual(response.status_code, 503)
+        request = AsyncRequestFactory().post(
+            "/timer", data=self.payload, content_type="application/json"
+        )
+        response = asyncio.run(async_views.create_timer(request))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "5")
+
+        # The backlog drained, the cached answer expires
+        Timer.objects.update(is_fired=True)
+        response = self.client.post("/timer", self.payload, format="json")
+        self.assertEqual(response.status_code, 503)
+        self.assertIn(
+            'timers_admission_rejections_total{reason="overloaded"} 4',
+            self.client.get("/metrics").content.decode(),
+        )
+        cache.clear()
+        response = self.client.post("/timer", self.payload, format="json")
+        self.assertEqual(response.status_code, 201)
+
+
+class TimerStatusBatchTests(TestCase):
+    """
+    Test case for the batch status lookup endpoint (/timers/status).
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a pending and a fired timer, with an empty cache.
+        """
+        cache.clear()
+        self.client = APIClient()
+        self.pending = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() + timedelta(minutes=1),
+        )
+        self.fired = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() - timedelta(minutes=1),
+            is_fired=True,
+        )
+
+    def test_status_batch(self) -> None:
+        """
+        Tests that the states are returned in the order of the request, in the format of
+        GET /timer/<id>, with one query for the cache misses and none once they are cached.
+        """
+        unknown = str(uuid.uuid4())
+        ids = [
+            str(self.pending.id),
+            unknown,
+            str(self.fired.id),
+            "not-a-timer",
+        ]
+        with self.assertNumQueries(1):
+            response = self.client.post("/timers/status", ids, format="json")
+        self.assertEqual(response.status_code, 200)
+        results = response.data["results"]
+        self.assertEqual(results[0]["id"], self.pending.id)
+        self.assertTrue(59 <= results[0]["time_left"] <= 60)
+        self.assertEqual(
+            results[1], {"id": unknown, "error": "Timer not found"}
+        )
+        self.assertEqual(results[2], {"id": self.fired.id, "time_left": 0})
+        self.assertEqual(
+            results[3], {"id": "not-a-timer", "error": "Timer not found"}
+        )
+
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                "/timers/status", ids[:1] + ids[2:3], format="json"
+            )
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(get_cache_stats(), {"hits": 2, "misses": 3})
+
+    def test_invalid_status_batch(self) -> None:
+        """
+        Tests that a body that is not a list, or a too long list, is rejected.
+        """
+        response = self.client.post(
+            "/timers/status", {"id": str(self.pending.id)}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        with override_settings(TIMERS_BATCH_MAX_SIZE=1):
+            response = self.client.post(
+                "/timers/status",
+                [str(self.pending.id), str(self.fired.id)],
+                format="json",
+            )
+        self.assertEqual(response.status_code, 400)
+
+
+@open_lanes
+class TimerEventsTests(TestCase):
+    """
+    Test case for the timer completion events and the Server-Sent Events stream.
+    """
+
+    def setUp(self) -> None:
+        """
+        Sets up the request factory and an empty cache.
+        """
+        self.factory = AsyncRequestFactory()
+        cache.clear()
+
+    @override_settings(
+        TIMERS_FIRE_EVENTS=True,
+        TIMERS_RATE_LIMIT_API_KEYS=frozenset({"tenant-a"}),
+    )
+    @patch("timers.events.get_redis")
+    @patch("timers.tasks.deliver_webhooks")
+    def test_fired_timers_publish_events(
+        self, mock_deliver, mock_get_redis
+    ) -> None:
+        """
+        Tests that firing a timer publishes its event on its channel and on the channel of
+        its client, and that the client of the creation request is recorded.
+        """
+        with patch("timers.scheduling.fire_webhook.apply_async"):
+            response = APIClient().post(
+                "/timer",
+                {
+                    "hours": 0,
+                    "minutes": 1,
+                    "seconds": 0,
+                    "url": "https://example.com",
+                },
+                format="json",
+                HTTP_X_API_KEY="tenant-a",
+            )
+        timer = Timer.objects.get(id=response.data["id"])
+        self.assertEqual(timer.client, client_digest("key:tenant-a"))
+        Timer.objects.filter(id=timer.id).update(
+            next_attempt_at=now() - timedelta(seconds=1)
+        )
+        mock_deliver.return_value = [DeliveryResult(str(timer.id), 200, 0.01)]
+
+        fire_webhooks_batch([str(timer.id)])
+        pipeline = mock_get_redis.return_value.pipeline.return_value
+        event = json.dumps({"id": str(timer.id), "time_left": 0})
+        self.assertEqual(
+            [call.args for call in pipeline.publish.call_args_list],
+            [
+                (f"timers:events:timer:{timer.id}", event),
+                (f"timers:events:client:{timer.client}", event),
+            ],
+        )
+        pipeline.execute.assert_called_once()
+
+    @patch("timers.events.get_async_redis")
+    async def test_stream_timer_ids(self, mock_get_async_redis) -> None:
+        """
+        Tests that a stream of timer ids reports the fired and unknown timers right away, then
+        the fire events of the pending ones, and ends once they have all fired.
+        """
+        fired = await Timer.objects.acreate(
+            url="https://example.com",
+            scheduled_time=now() - timedelta(minutes=1),
+            is_fired=True,
+        )
+        pending = await Timer.objects.acreate(
+            url="https://example.com",
+            scheduled_time=now() + timedelta(minutes=1),
+        )
+        unknown = uuid.uuid4()
+        connection = mock_get_async_redis.return_value
+        connection.aclose = AsyncMock()
+        pubsub = connection.pubsub.return_value
+        pubsub.subscribe = AsyncMock()
+        pubsub.aclose = AsyncMock()
+        pubsub.get_message = AsyncMock(
+            side_effect=[
+                None,
+                {
+                    "type": "message",
+                    "data": json.dumps(
+                        {"id": str(pending.id), "time_left": 0}
+                    ),
+                },
+            ]
+        )
+
+        response = await async_views.timer_events(
+            self.factory.get(
+                "/timers/events",
+                {"ids": f"{fired.id},{pending.id},{unknown}"},
+            )
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(
+            chunks,
+            [
+                f'event: fired\ndata: {{"id": "{fired.id}", "time_left": 0}}\n\n'.encode(),
+                f'event: not_found\ndata: {{"id": "{unknown}", "error": "Timer not found"}}\n\n'.encode(),
+                b": keepalive\n\n",
+                f'event: fired\ndata: {{"id": "{pending.id}", "time_left": 0}}\n\n'.encode(),
+            ],
+        )
+        pubsub.subscribe.assert_awaited_once_with(
+            f"timers:events:timer:{fired.id}",
+            f"timers:events:timer:{pending.id}",
+            f"timers:events:timer:{unknown}",
+        )
+        pubsub.aclose.assert_awaited_once()
+        connection.aclose.assert_awaited_once()
+
+    @override_settings(TIMERS_FIRE_EVENTS=True)
+    @patch("timers.events.get_redis")
+    def test_cancelled_timers_publish_events(self, mock_get_redis) -> None:
+        """
+        Tests that cancelling a timer publishes a "cancelled" event on its channels.
+        """
+        timer = Timer.objects.create(
+            url="https://example.com",
+            scheduled_time=now() + timedelta(minutes=1),
+            client="client-a",
+        )
+        cancel_timer(timer.id)
+        pipeline = mock_get_redis.return_value.pipeline.return_value
+        event = json.dumps({"id": str(timer.id), "event": "cancelled"})
+        self.assertEqual(
+            [call.args for call in pipeline.publish.call_args_list],
+            [
+                (f"timers:events:timer:{timer.id}", event),
+                ("timers:events:client:client-a", event),
+            ],
+        )
+
+    @patch("timers.events.get_async_redis")
+    async def test_stream_ends_for_timers_that_never_fire(
+        self, mock_get_async_redis
+    ) -> None:
+        """
+        Tests that dead-lettered and cancelled timers are reported right away, and that a
+        pending timer cancelled during the stream ends it.
+        """
+        scheduled_time = now() + timedelta(minutes=1)
+        dead_lettered = await Timer.objects.acreate(
+            url="https://example.com",
+            scheduled_time=scheduled_time,
+            is_dead_lettered=True,
+        )
+        cancelled = await Timer.objects.acreate(
+            url="https://example.com",
+            scheduled_time=scheduled_time,
+            is_cancelled=True,
+        )
+        pending = await Timer.objects.acreate(
+            url="https://example.com", scheduled_time=scheduled_time
+        )
+        connection = mock_get_async_redis.return_value
+        connection.aclose = AsyncMock()
+        pubsub = connection.pubsub.return_value
+        pubsub.subscribe = AsyncMock()
+        pubsub.aclose = AsyncMock()
+        pubsub.get_message = AsyncMock(
+            return_value={
+                "type": "message",
+                "data": json.dumps(
+                    {"id": str(pending.id), "event": "cancelled"}
+                ),
+            }
+        )
+
+        response = await async_views.timer_events(
+            self.factory.get(
+                "/timers/events",
+                {"ids": f"{dead_lettered.id},{cancelled.id},{pending.id}"},
+            )
+        )
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(
+            chunks,
+            [
+                f'event: dead_lettered\ndata: {{"id": "{dead_lettered.id}"}}\n\n'.encode(),
+                f'event: cancelled\ndata: {{"id": "{cancelled.id}"}}\n\n'.encode(),
+                f'event: cancelled\ndata: {{"id": "{pending.id}"}}\n\n'.encode(),
+            ],
+        )
+        pubsub.get_message.assert_awaited_once()
+
+    @override_settings(TIMERS_RATE_LIMIT_API_KEYS=frozenset({"tenant-a"}))
+    async def test_invalid_streams(self) -> None:
+        """
+        Tests that invalid ids, and a client stream without a known API key, are rejected.
+        """
+        response = await async_views.timer_events(
+            self.factory.get("/timers/events", {"ids": "not-a-timer"})
+        )
+        self.assertEqual(response.status_code, 400)
+        response = await async_views.timer_events(
+            self.factory.get("/timers/events")
+        )
+        self.assertEqual(response.status_code, 400)
+        response = await async_views.timer_events(
+            self.factory.get(
+                "/timers/events", headers={"X-Api-Key": "tenant-b"}
+            )
+        )
+        self.assertEqual(response.status_code, 403)
+
+    @patch("timers.events.get_async_redis")
+    def test_stream_requires_asgi(self, mock_get_async_redis) -> None:
+        """
+        Tests that the stream is refused under WSGI, where it would be buffered whole and hold
+        a server thread, without opening a Redis connection.
+        """
+        response = Client().get("/timers/events", HTTP_X_API_KEY="tenant-a")
+        self.assertEqual(response.status_code, 501)
+        mock_get_async_redis.assert_not_called()
@@ -0,0 +1,147 @@
+# timers/timing.py
+# Per-request stage timing and the sampling profiler.
+import cProfile
+import logging
+import os
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Durations of the stages of the current request, in seconds, or None outside a timed request
+_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "timers_stages", default=None
+)
+
+# Profilers of the Celery tasks being profiled, by task id
+_task_profiles: Dict[str, cProfile.Profile] = {}
+
+
+def start_stages() -> object:
+    """
+    Starts recording the stages of the current request (or task).
+
+    Returns:
+        object: A token for stop_stages().
+    """
+    return _stages.set({})
+
+
+def stop_stages(token: object) -> Dict[str, float]:
+    """
+    Stops recording the stages started with start_stages().
+
+    Args:
+        token (object): The token returned by start_stages().
+
+    Returns:
+        Dict[str, float]: The duration of every stage, in seconds, in the order they started.
+    """
+    stages = _stages.get() or {}
+    _stages.reset(token)
+    return stages
+
+
+def record_stage(name: str, duration: float) -> None:
+    """
+    Adds duration to the stage name of the current request. Does nothing outside a timed request.
+
+    Args:
+        name (str): The stage name, e.g. "db".
+        duration (float): The duration, in seconds.
+
+    Returns:
+        None
+    """
+    stages = _stages.get()
+    if stages is not None:
+        stages[name] = stages.get(name, 0.0) + duration
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Times the enclosed block as the stage name of the current request. A stage entered several
+    times accumulates its durations.
+
+    Args:
+        name (str): The stage name: "validate", "db", "cache", "enqueue", "render"...
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def should_profile() -> bool:
+    """
+    Returns True for a TIMERS_PROFILE_SAMPLE_RATE fraction of the calls.
+    """
+    rate = settings.TIMERS_PROFILE_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def start_profile() -> Optional[cProfile.Profile]:
+    """
+    Starts profiling the calling thread.
+
+    Returns:
+        Optional[cProfile.Profile]: The profiler, or None if another profiler is already active.
+    """
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Only one profiler can be active at a time
+        return None
+    return profile
+
+
+def save_profile(profile: cProfile.Profile, label: str) -> str:
+    """
+    Stops a profiler and dumps its stats to TIMERS_PROFILE_DIR, to be read with pstats or
+    a viewer such as snakeviz.
+
+    Args:
+        profile (cProfile.Profile): The profiler returned by start_profile().
+        label (str): What was profiled, used in the file name, e.g. "POST-create_timer".
+
+    Returns:
+        str: The path of the stats file.
+    """
+    profile.disable()
+    os.makedirs(settings.TIMERS_PROFILE_DIR, exist_ok=True)
+    safe_label = "".join(c if c.isalnum() or c == "_" else "-" for c in label)
+    path = os.path.join(
+        settings.TIMERS_PROFILE_DIR,
+        f"{time.strftime('%Y%m%dT%H%M%S')}-{safe_label}-{uuid.uuid4().hex[:8]}.prof",
+    )
+    profile.dump_stats(path)
+    return path
+
+
+def profile_task_start(task_id: str, **kwargs) -> None:
+    """
+    task_prerun signal handler: starts profiling a sampled Celery task.
+    """
+    if should_profile():
+        profile = start_profile()
+        if profile is not None:
+            _task_profiles[task_id] = profile
+
+
+def profile_task_end(task_id: str, task, **kwargs) -> None:
+    """
+    task_postrun signal handler: dumps the profile of a sampled Celery task.
+    """
+    profile = _task_profiles.pop(task_id, None)
+    if profile is not None:
+        path = save_profile(profile, task.name)
+        logger.info(f"Profiled task {task.name}[{task_id}]: {path}")
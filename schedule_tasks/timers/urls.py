@@ -1,14 +1,38 @@
 # timers/urls.py
+from django.conf import settings
 from django.urls import path
 
-from . import views  # Ensure this import is present
+from . import async_views, views  # Ensure this import is present
+
+if settings.TIMERS_ASYNC_API:
+    create_timer_view = async_views.create_timer
+    timer_detail_view = async_views.timer_detail
+else:
+    create_timer_view = views.TimerView.as_view()
+    timer_detail_view = views.TimerDetailView.as_view()
 
 urlpatterns = [
     path("ui_timer", views.test_timer_form, name="test_timer_form"),
-    path("timer", views.TimerView.as_view(), name="create_timer"),
+    path("metrics", views.metrics, name="metrics"),
+    path("timer", create_timer_view, name="create_timer"),
+    path(
+        "timers/batch",
+        views.TimerBatchView.as_view(),
+        name="create_timers_batch",
+    ),
+    path(
+        "timers/events",
+        async_views.timer_events,
+        name="timer_events",
+    ),
+    path(
+        "timers/status",
+        views.TimerStatusBatchView.as_view(),
+        name="timer_status_batch",
+    ),
     path(
         "timer/<uuid:timer_id>",
-        views.TimerDetailView.as_view(),
+        timer_detail_view,
         name="timer_detail",
     ),
 ]
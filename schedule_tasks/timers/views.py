@@ -2,7 +2,11 @@
 # timers/views.py
 # Import necessary modules and classes from Django REST framework, Django models, serializers, timezone utilities, and Celery tasks.
 import logging
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
 
+from django.conf import settings
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render
 from django.utils.timezone import now
@@ -12,20 +16,62 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .admission import AdmissionDecision, admit, assign_client
+from .fastpath import FastPathMixin, validate_timer
+from .metrics import render_metrics
 from .models import Timer
-from .serializers import TimerSerializer
-from .tasks import fire_webhook
+from .scheduling import (TimerNotPending, cancel_timer, create_timers,
+                         reschedule_timer)
+from .serializers import TimerDurationSerializer
+from .state_cache import (cache_timer_state, cache_timer_states,
+                          evict_timer_state, get_timer_state, get_timer_states)
+from .timing import stage
 
 # Set up basic logging configuration
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class TimerView(APIView):
+def get_time_left(scheduled_time: datetime, is_fired: bool) -> int:
+    """
+    Calculates the time left until the scheduled_time by subtracting the current time (now()) from the scheduled_time.
+    Uses max() to ensure the time left is not negative, and returns 0 once the timer has fired.
+
+    Args:
+        scheduled_time (datetime): The time when the timer is scheduled to fire.
+        is_fired (bool): Indicates whether the timer's webhook has been fired.
+
+    Returns:
+        int: The number of whole seconds left until the timer expires.
+    """
+    if is_fired:
+        return 0
+    return int(max((scheduled_time - now()).total_seconds(), 0))
+
+
+def admission_rejected(decision: AdmissionDecision) -> Response:
+    """
+    Builds the response to a timer creation request refused by admission control.
+
+    Args:
+        decision (AdmissionDecision): The refusal, see timers.admission.admit.
+
+    Returns:
+        Response: The error message, with status 429 or 503 and a Retry-After header.
+    """
+    return Response(
+        {"error": decision.error},
+        status=decision.status_code,
+        headers={"Retry-After": decision.retry_after_header},
+    )
+
+
+class TimerView(FastPathMixin, APIView):
     """
     Handles the creation of timers and scheduling with Celery.
     Validates the incoming request data using TimerSerializer.
-    Saves the timer object and schedules the webhook firing using Celery.
+    Saves the timer object and schedules the webhook firing using Celery, directly or through
+    the transactional outbox (see timers.scheduling.create_timers).
 
     Implements a “set timer” endpoint: /timer
     - Receives a JSON object containing hours, minutes, seconds, and a web url.
@@ -40,7 +86,8 @@ class TimerView(APIView):
         Handles the creation of a timer.
         Implements a “set timer” endpoint: /timer
 
-        Uses TimerSerializer to validate and save the timer data.
+        Uses TimerSerializer to validate the timer data (or, with TIMERS_FAST_PATH, the
+        lightweight TimerPayload validator, see timers.fastpath) and saves the timer.
 
         Args:
             request: The HTTP request object containing the timer data.
@@ -49,6 +96,9 @@ class TimerView(APIView):
             Response: A JSON response containing the id of the created timer and
                       the amount of time left until the timer expires. If the request
                       data is invalid, returns a JSON response containing the errors.
+                      Status 429 if the client exceeded its rate limit, status 503 if the
+                      timer backlog is too large (see timers.admission), both with a
+                      Retry-After header.
 
         Sample Example:
           POST request: http://localhost:8000/timer with following data
@@ -66,48 +116,214 @@ class TimerView(APIView):
             }
 
         """
-        serializer = TimerSerializer(data=request.data)
-        if serializer.is_valid():
-            timer = serializer.save()
-            # Using assert isinstance for runtime checking
-            assert isinstance(timer, Timer), "Expected a Timer instance"
-            self.schedule_webhook(timer)
-
-            # Calculate the time left until the scheduled_time by subtracting the current time (now()) from the scheduled_time. Use max() to ensure the time left is not negative.
-            time_left = (
-                int(max((timer.scheduled_time - now()).total_seconds(), 0))
-                if not timer.is_fired
-                else 0
-            )
-            logger.info(
-                f"timer:{timer} \nSerializer:{serializer} \n data:{request.data} \n time_left:{time_left}"
-            )
+        with stage("admit"):
+            decision = admit(request)
+        if not decision.allowed:
+            return admission_rejected(decision)
+        with stage("validate"):
+            timer, errors = validate_timer(request.data)
+        if timer is not None:
+            assign_client([timer], request)
+            create_timers([timer])
+            with stage("cache"):
+                cache_timer_state(
+                    timer.id, timer.scheduled_time, timer.is_fired
+                )
+
+            time_left = get_time_left(timer.scheduled_time, timer.is_fired)
+            logger.info(f"Timer created: {timer.id}, time_left: {time_left}")
             return Response(
                 {"id": timer.id, "time_left": time_left},
                 status=status.HTTP_201_CREATED,
             )
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
-    def schedule_webhook(self, timer: Timer) -> None:
-        """
-        Schedules the webhook firing using Celery.
 
-        Calculates the delay in seconds from the current time to the scheduled time
-        and schedules the webhook firing using Celery.
+class TimerBatchView(FastPathMixin, APIView):
+    """
+    Handles the creation of many timers in a single request.
+    Validates every item with TimerSerializer, inserts the valid timers with one bulk_create
+    and schedules all of them over a single broker producer.
+
+    Implements a "set timers" endpoint: /timers/batch
+    - Receives a JSON list of objects containing hours, minutes, seconds, and a web url.
+    - Returns a JSON object with one result per item, in the order of the request:
+      either the id and the amount of seconds left, or the validation errors of that item.
+    """
+
+    def post(self, request: Request) -> Response:
+        """
+        Handles the creation of a batch of timers.
+        Implements a "set timers" endpoint: /timers/batch
 
         Args:
-            timer: The timer object containing the scheduled time and other relevant information.
+            request: The HTTP request object containing the list of timers.
 
         Returns:
-            None
+            Response: A JSON response with a "results" list. Returns status 201 if at least
+                      one timer was created, and status 400 if none of the items were valid
+                      or the request body is not a list of at most TIMERS_BATCH_MAX_SIZE items.
+                      Status 429 or 503 as for /timer; every item counts against the rate
+                      limit of the client.
+
+        Sample Example:
+          POST request: http://localhost:8000/timers/batch with following data
+            [
+            {"hours": 0, "minutes": 1, "seconds": 0, "url": "https://example.com"},
+            {"hours": -1, "minutes": 1, "seconds": 0, "url": "https://example.com"}
+            ]
+
+        Expected Sample Response:
+            {
+            "results": [
+                {"id": "766cb2bb-5854-4b39-aea6-7343e9916b13", "time_left": 59},
+                {"errors": {"hours": ["Ensure this value is greater than or equal to 0."]}}
+            ]
+            }
         """
-        delay = max((timer.scheduled_time - now()).total_seconds(), 0)
-        fire_webhook.apply_async((str(timer.id),), countdown=delay)
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {"error": "Expected a list of timers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > settings.TIMERS_BATCH_MAX_SIZE:
+            return Response(
+                {
+                    "error": f"A batch may contain at most {settings.TIMERS_BATCH_MAX_SIZE} timers."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with stage("admit"):
+            decision = admit(request, cost=len(items))
+        if not decision.allowed:
+            return admission_rejected(decision)
+
+        results: list = [None] * len(items)
+        timers = []
+        positions = []
+        with stage("validate"):
+            for index, item in enumerate(items):
+                timer, errors = validate_timer(item)
+                if timer is not None:
+                    timers.append(timer)
+                    positions.append(index)
+                else:
+                    results[index] = {"errors": errors}
+
+        assign_client(timers, request)
+        create_timers(timers)
+        with stage("cache"):
+            cache_timer_states(timers)
+
+        for index, timer in zip(positions, timers):
+            results[index] = {
+                "id": timer.id,
+                "time_left": get_time_left(
+                    timer.scheduled_time, timer.is_fired
+                ),
+            }
+        logger.info(f"Batch created {len(timers)} of {len(items)} timer(s).")
+        return Response(
+            {"results": results},
+            status=(
+                status.HTTP_201_CREATED
+                if timers
+                else status.HTTP_400_BAD_REQUEST
+            ),
+        )
+
+
+def parse_timer_id(value: Any) -> Optional[UUID]:
+    """
+    Parses a timer id of a batch status lookup.
+
+    Args:
+        value (Any): The item of the request body.
 
+    Returns:
+        Optional[UUID]: The id, or None if the item is not a UUID string (as with the
+        /timer/{timer_uuid} URL, such ids are reported as not found).
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        return UUID(value)
+    except ValueError:
+        return None
 
-class TimerDetailView(APIView):
+
+class TimerStatusBatchView(FastPathMixin, APIView):
+    """
+    Handles querying the status of many timers in a single request.
+    The states are read through the timer state cache with one multi-get, and the cache misses
+    with a single id__in query (see timers.state_cache.get_timer_states).
+
+    Implements a "get timers" endpoint: /timers/status
+    - Receives a JSON list of timer ids.
+    - Returns a JSON object with one result per id, in the order of the request, in the format
+      of GET /timer/{timer_uuid}: the id and the amount of seconds left, or the id and an
+      error for the timers that are not found.
     """
-    Handles querying a timer's status.
+
+    def post(self, request: Request) -> Response:
+        """
+        Handles the status lookup of a batch of timers.
+        Implements a "get timers" endpoint: /timers/status
+
+        Args:
+            request: The HTTP request object containing the list of timer ids.
+
+        Returns:
+            Response: A JSON response with a "results" list. Returns status 400 if the request
+                      body is not a list of at most TIMERS_BATCH_MAX_SIZE ids.
+
+        Sample Example:
+          POST request: http://localhost:8000/timers/status with following data
+            ["766cb2bb-5854-4b39-aea6-7343e9916b13", "not-a-timer"]
+
+        Expected Sample Response:
+            {
+            "results": [
+                {"id": "766cb2bb-5854-4b39-aea6-7343e9916b13", "time_left": 59},
+                {"id": "not-a-timer", "error": "Timer not found"}
+            ]
+            }
+        """
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {"error": "Expected a list of timer ids."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > settings.TIMERS_BATCH_MAX_SIZE:
+            return Response(
+                {
+                    "error": f"A batch may contain at most {settings.TIMERS_BATCH_MAX_SIZE} timers."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        timer_ids = [parse_timer_id(item) for item in items]
+        states = get_timer_states(
+            timer_id for timer_id in timer_ids if timer_id is not None
+        )
+        results = []
+        for item, timer_id in zip(items, timer_ids):
+            state = states.get(timer_id) if timer_id is not None else None
+            if state is None:
+                results.append({"id": item, "error": "Timer not found"})
+            else:
+                results.append(
+                    {"id": timer_id, "time_left": get_time_left(*state)}
+                )
+        return Response({"results": results})
+
+
+class TimerDetailView(FastPathMixin, APIView):
+    """
+    Handles querying a timer's status, cancelling and rescheduling it.
     Retrieves the timer object by ID and returns the time left until it fires, along with its fired status.
 
     Implement a “get timer” endpoint: /timer/{timer_uuid}
@@ -115,6 +331,9 @@ class TimerDetailView(APIView):
     - Receives the timer id in the URL, as the resource uuid.
     - Returns a JSON object with the amount of seconds left until the timer expires.
     - If the timer already expired, returns 0.
+
+    DELETE /timer/{timer_uuid} cancels a pending timer and PATCH /timer/{timer_uuid} moves it
+    to a new duration from now (see timers.scheduling.cancel_timer and reschedule_timer).
     """
 
     def get(self, request: Request, timer_id: str) -> Response:
@@ -123,6 +342,8 @@ class TimerDetailView(APIView):
         Implement a “get timer” endpoint: /timer/{timer_uuid}
 
         Calculates the time left until the timer fires (if it hasn't already fired).
+        The (scheduled_time, is_fired) state is read through the timer state cache, so
+        repeated polling of a timer is answered without a database query.
 
         Args:
             request: Request, timer_id: str) -> Response:
@@ -148,19 +369,113 @@ class TimerDetailView(APIView):
             logger.info(
                 f"#### timer_id:{timer_id}, type_timer_id:{type(timer_id)}"
             )
-            timer = Timer.objects.get(id=timer_id)
-            logger.info(f"## GET timer:{timer}")
-            time_left = (
-                int(max((timer.scheduled_time - now()).total_seconds(), 0))
-                if not timer.is_fired
-                else 0
-            )
-            return Response({"id": timer.id, "time_left": time_left})
+            state = get_timer_state(timer_id)
+            if state is None:
+                raise Timer.DoesNotExist
+            scheduled_time, is_fired = state
+            logger.info(f"## GET timer:{timer_id} - Fired_status: {is_fired}")
+            time_left = get_time_left(scheduled_time, is_fired)
+            return Response({"id": timer_id, "time_left": time_left})
         except Timer.DoesNotExist:
             return Response({"error": "Timer not found"}, status=404)
         except ValidationError as e:
             return Response({"error": str(e)}, status=400)
 
+    def delete(self, request: Request, timer_id: str) -> Response:
+        """
+        Cancels a pending timer: its webhook will not be fired.
+        Implements a "cancel timer" endpoint: DELETE /timer/{timer_uuid}
+
+        Args:
+            request: The HTTP request object.
+            timer_id: The ID of the timer to be cancelled.
+
+        Returns:
+            Response: An empty response with status 204. Status 404 if the timer is not found
+                      or already cancelled, status 409 if it has already fired or is being
+                      delivered.
+        """
+        try:
+            with stage("db"):
+                cancel_timer(timer_id)
+        except Timer.DoesNotExist:
+            return Response({"error": "Timer not found"}, status=404)
+        except TimerNotPending as e:
+            return Response({"error": str(e)}, status=409)
+        with stage("cache"):
+            evict_timer_state(timer_id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def patch(self, request: Request, timer_id: str) -> Response:
+        """
+        Reschedules a pending timer to fire after a new duration, counted from now.
+        Implements a "reschedule timer" endpoint: PATCH /timer/{timer_uuid}
+
+        Args:
+            request: The HTTP request object containing hours, minutes and seconds.
+            timer_id: The ID of the timer to be rescheduled.
+
+        Returns:
+            Response: A JSON response containing the timer's ID and the new time left.
+                      Status 400 with the errors if the duration is invalid, status 404 if the
+                      timer is not found or cancelled, status 409 if it has already fired or
+                      is being delivered.
+
+        Sample Example:
+          PATCH request: http://localhost:8000/timer/766cb2bb-5854-4b39-aea6-7343e9916b13 with
+            {"hours": 0, "minutes": 5, "seconds": 0}
+
+        Expected Sample Response:
+            {
+            "id": "766cb2bb-5854-4b39-aea6-7343e9916b13",
+            "time_left": 299
+            }
+        """
+        with stage("validate"):
+            serializer = TimerDurationSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(
+                    serializer.errors, status=status.HTTP_400_BAD_REQUEST
+                )
+        try:
+            with stage("db"):
+                timer = reschedule_timer(timer_id, serializer.total_seconds())
+        except Timer.DoesNotExist:
+            return Response({"error": "Timer not found"}, status=404)
+        except TimerNotPending as e:
+            return Response({"error": str(e)}, status=409)
+        with stage("cache"):
+            cache_timer_state(timer.id, timer.scheduled_time, timer.is_fired)
+        return Response(
+            {
+                "id": timer.id,
+                "time_left": get_time_left(
+                    timer.scheduled_time, timer.is_fired
+                ),
+            }
+        )
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """
+    Exposes the service metrics in the Prometheus text format: /metrics
+
+    The counters and histograms are kept in the shared cache, so every replica of the web
+    service and of the Celery worker contributes to the same totals and any web replica can
+    be scraped. The pending and overdue gauges are counted in the database (on a read
+    replica when TIMERS_READ_REPLICAS is set) on every scrape.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The metrics.
+    """
+    return HttpResponse(
+        render_metrics(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
 
 # Testing purpose
 def test_timer_form(request: HttpRequest) -> HttpResponse:
@@ -0,0 +1,153 @@
+# timers/wheel.py
+# Hierarchical timing wheel used by the timer dispatcher.
+import math
+from typing import Any, Hashable, List, Tuple
+
+
+class HierarchicalTimingWheel:
+    """
+    Hierarchical timing wheel holding items until their expiry time.
+
+    The wheel is made of `levels` rings of 2**slot_bits slots. A slot of level 0 spans one tick,
+    a slot of level n spans 2**(slot_bits * n) ticks. An item is placed in the lowest level whose
+    range covers its remaining delay, and is moved down ("cascaded") one level at a time as the
+    wheel turns. Inserting an item and expiring it are O(1); each item is cascaded at most
+    `levels - 1` times.
+
+    Items expire on the first tick boundary at or after their expiry time, so they are never
+    handed out early and at most one tick late.
+
+    Attributes:
+        tick_seconds (float): The duration of one tick of the lowest level.
+    """
+
+    def __init__(
+        self,
+        tick_seconds: float,
+        start: float,
+        slot_bits: int = 6,
+        levels: int = 4,
+    ) -> None:
+        """
+        Creates an empty wheel positioned at the tick containing start.
+
+        Args:
+            tick_seconds (float): The duration of one tick of the lowest level.
+            start (float): The current time, as a Unix timestamp.
+            slot_bits (int): log2 of the number of slots per level.
+            levels (int): The number of levels of the wheel.
+        """
+        self.tick_seconds = tick_seconds
+        self._bits = slot_bits
+        self._mask = (1 << slot_bits) - 1
+        self._levels = levels
+        self._slots: List[List[List[Tuple[int, Any]]]] = [
+            [[] for _ in range(1 << slot_bits)] for _ in range(levels)
+        ]
+        self._current_tick = int(start // tick_seconds)
+        self._size = 0
+
+    def __len__(self) -> int:
+        """
+        Returns the number of items waiting in the wheel.
+        """
+        return self._size
+
+    def insert(self, item: Hashable, expires_at: float) -> None:
+        """
+        Adds an item to the wheel. Items that are already due expire on the next tick.
+
+        Args:
+            item (Hashable): The item to hand out once it expires.
+            expires_at (float): The expiry time, as a Unix timestamp.
+
+        Returns:
+            None
+        """
+        expires_tick = max(
+            math.ceil(expires_at / self.tick_seconds), self._current_tick + 1
+        )
+        self._place(item, expires_tick)
+        self._size += 1
+
+    def advance_to(self, current_time: float) -> List[Any]:
+        """
+        Turns the wheel up to current_time and returns the items that expired on the way.
+
+        Args:
+            current_time (float): The current time, as a Unix timestamp.
+
+        Returns:
+            List[Any]: The expired items, in expiry order.
+        """
+        target_tick = int(current_time // self.tick_seconds)
+        if self._size == 0:
+            # Nothing to expire, so the wheel can jump straight to the target tick
+            self._current_tick = max(self._current_tick, target_tick)
+            return []
+
+        expired: List[Any] = []
+        while self._current_tick < target_tick and self._size:
+            expired.extend(self._step())
+        self._current_tick = max(self._current_tick, target_tick)
+        return expired
+
+    def _place(self, item: Any, expires_tick: int) -> None:
+        """
+        Puts an item in the slot matching its remaining delay.
+
+        Args:
+            item (Any): The item to place.
+            expires_tick (int): The tick at which the item expires.
+
+        Returns:
+            None
+        """
+        delta = expires_tick - self._current_tick
+        for level in range(self._levels):
+            if delta < 1 << (self._bits * (level + 1)):
+                index = (expires_tick >> (self._bits * level)) & self._mask
+                self._slots[level][index].append((expires_tick, item))
+                return
+
+        # Beyond the range of the wheel: park the item in the top-level slot that is visited
+        # last during the current rotation; it is placed again when that slot cascades.
+        top = self._levels - 1
+        index = (
+            (self._current_tick >> (self._bits * top)) + self._mask
+        ) & self._mask
+        self._slots[top][index].append((expires_tick, item))
+
+    def _step(self) -> List[Any]:
+        """
+        Advances the wheel by one tick, cascading higher-level slots when lower levels wrap.
+
+        Returns:
+            List[Any]: The items expiring on the new tick.
+        """
+        self._current_tick += 1
+        tick = self._current_tick
+        for level in range(1, self._levels):
+            if tick & ((1 << (self._bits * level)) - 1):
+                break
+            index = (tick >> (self._bits * level)) & self._mask
+            bucket = self._slots[level][index]
+            if bucket:
+                self._slots[level][index] = []
+                for expires_tick, item in bucket:
+                    self._place(item, expires_tick)
+
+        index = tick & self._mask
+        bucket = self._slots[0][index]
+        if not bucket:
+            return []
+        self._slots[0][index] = []
+        expired = []
+        for expires_tick, item in bucket:
+            if expires_tick <= tick:
+                expired.append(item)
+            else:
+                # Parked beyond the range of a single-level wheel
+                self._place(item, expires_tick)
+        self._size -= len(expired)
+        return expired